@@ -14,9 +14,17 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL_NAME: str = "gpt-4-turbo-preview"
     
+    # Embedding Settings: "openai" or "hashing" (offline, deterministic)
+    EMBEDDING_PROVIDER: str = "openai"
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    HASHING_EMBEDDING_DIMENSIONS: int = 384
+    HASHING_EMBEDDING_NGRAMS: int = 2
+    HASHING_EMBEDDING_SEED: int = 0
+    
     # Vector Store Settings
     VECTOR_STORE_PATH: str = "data/vector_store"
     CHROMA_PERSIST_DIRECTORY: str = "data/chroma"
+    KEYWORD_INDEX_PATH: str = "data/keyword_index"
     
     # Graph Settings
     NEO4J_URI: str = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -29,6 +37,18 @@ class Settings(BaseSettings):
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     
+    # Near-duplicate chunks from different sources (MinHash LSH), dropped before embedding
+    NEAR_DUP_ENABLED: bool = True
+    NEAR_DUP_INDEX_PATH: str = "data/near_duplicates.sqlite"
+    NEAR_DUP_THRESHOLD: float = 0.8
+    NEAR_DUP_NUM_PERM: int = 128
+    NEAR_DUP_BANDS: int = 16
+    
+    # Query-embedding cache; semantic reuse is off unless a threshold is set
+    QUERY_EMBEDDING_CACHE_SIZE: int = 4096
+    SEMANTIC_CACHE_THRESHOLD: Optional[float] = None
+    SEMANTIC_CACHE_WINDOW: int = 512
+    
     # Logging Settings
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/app.log"
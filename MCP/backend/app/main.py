@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from loguru import logger
+import logging
 import sys
 import os
 from datetime import datetime
@@ -24,6 +25,15 @@ logger.add(
     level="DEBUG"
 )
 
+class _InterceptHandler(logging.Handler):
+    """Forward standard-library records (the shared rag_common package logs that way) to loguru."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logger.opt(depth=6, exception=record.exc_info).log(record.levelname, record.getMessage())
+
+logging.getLogger("rag_common").setLevel(logging.INFO)
+logging.getLogger("rag_common").addHandler(_InterceptHandler())
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Create necessary directories
@@ -1,16 +1,27 @@
+import hashlib
 from typing import List, Dict, Any
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
 from loguru import logger
+from rag_common.chunker import OffsetChunker
+from rag_common.near_duplicates import DedupePlan, NearDuplicateIndex
 from ..core.config import settings
 
 class DocumentProcessor:
     def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.text_splitter = OffsetChunker(
             chunk_size=settings.CHUNK_SIZE,
             chunk_overlap=settings.CHUNK_OVERLAP,
-            length_function=len,
         )
+        self.near_duplicates = None
+        # Dedupe decisions waiting for their chunks to reach the vector store
+        self._pending_plans: List[DedupePlan] = []
+        if settings.NEAR_DUP_ENABLED:
+            self.near_duplicates = NearDuplicateIndex(
+                settings.NEAR_DUP_INDEX_PATH,
+                threshold=settings.NEAR_DUP_THRESHOLD,
+                num_perm=settings.NEAR_DUP_NUM_PERM,
+                bands=settings.NEAR_DUP_BANDS,
+            )
         logger.info("DocumentProcessor initialized with chunk size {} and overlap {}", 
                    settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
 
@@ -28,11 +39,58 @@ class DocumentProcessor:
             logger.info(f"Processing {len(documents)} documents")
             chunks = self.text_splitter.split_documents(documents)
             logger.info(f"Created {len(chunks)} chunks from {len(documents)} documents")
+            if self.near_duplicates is not None:
+                chunks = self.drop_near_duplicates(chunks)
             return chunks
         except Exception as e:
             logger.error(f"Error processing documents: {str(e)}")
             raise
 
+    def drop_near_duplicates(self, chunks: List[Document]) -> List[Document]:
+        """
+        Drop chunks that nearly duplicate a previously processed chunk of another source
+        
+        Each chunk is stamped with a ``chunk_key``; the sources merged into a kept
+        chunk are available from ``self.near_duplicates.sources(chunk_key)``.
+        Nothing is persisted until ``record_added`` confirms which chunks were stored.
+        
+        Args:
+            chunks (List[Document]): Chunks to filter
+            
+        Returns:
+            List[Document]: The chunks to embed
+        """
+        keys, groups = [], []
+        for chunk in chunks:
+            origin = str(chunk.metadata.get("source") or chunk.metadata.get("title") or "")
+            key = hashlib.sha1(f"{origin}\n{chunk.page_content}".encode("utf-8")).hexdigest()
+            chunk.metadata["chunk_key"] = key
+            keys.append(key)
+            # Chunks without a known origin are only compared against other documents.
+            groups.append(origin or key)
+        plan = self.near_duplicates.plan(chunks, keys, groups)
+        self._pending_plans.append(plan)
+        logger.info(f"Kept {len(plan.keep)} of {len(chunks)} chunks after near-duplicate removal")
+        return [chunks[i] for i in plan.keep]
+
+    def record_added(self, chunks: List[Document]):
+        """
+        Persist near-duplicate signatures once chunks are in the vector store
+        
+        Only the given chunks are indexed; pending chunks that were not stored
+        (e.g. because the add failed) are forgotten, so they cannot later be
+        mistaken for copies of something that was never indexed.
+        
+        Args:
+            chunks (List[Document]): The chunks that were added; empty after a failed add
+        """
+        if self.near_duplicates is None:
+            return
+        stored = [chunk.metadata["chunk_key"] for chunk in chunks if "chunk_key" in chunk.metadata]
+        plans, self._pending_plans = self._pending_plans, []
+        for plan in plans:
+            self.near_duplicates.apply(plan, stored=stored)
+
     def add_metadata(self, documents: List[Document], metadata: Dict[str, Any]) -> List[Document]:
         """
         Add metadata to a list of documents
@@ -0,0 +1,19 @@
+from langchain.embeddings.base import Embeddings
+from rag_common.hashing_embeddings import HashingEmbeddings
+from ..core.config import settings
+
+__all__ = ["HashingEmbeddings", "embeddings_from_settings"]
+
+def embeddings_from_settings() -> Embeddings:
+    """The embedding backend selected by ``settings.EMBEDDING_PROVIDER``."""
+    if settings.EMBEDDING_PROVIDER == "openai":
+        from langchain.embeddings import OpenAIEmbeddings
+
+        return OpenAIEmbeddings(openai_api_key=settings.OPENAI_API_KEY, model=settings.EMBEDDING_MODEL)
+    if settings.EMBEDDING_PROVIDER == "hashing":
+        return HashingEmbeddings(
+            dimensions=settings.HASHING_EMBEDDING_DIMENSIONS,
+            ngrams=settings.HASHING_EMBEDDING_NGRAMS,
+            seed=settings.HASHING_EMBEDDING_SEED,
+        )
+    raise ValueError(f"Unknown embedding provider: {settings.EMBEDDING_PROVIDER!r} (expected 'openai' or 'hashing')")
@@ -19,6 +19,25 @@ class RAGPipeline:
         )
         logger.info("RAGPipeline initialized")
 
+    def add_documents(self, documents: List[Document]) -> int:
+        """
+        Chunk documents, drop near-duplicates and add the rest to the vector store
+        
+        Args:
+            documents (List[Document]): Documents to ingest
+            
+        Returns:
+            int: Number of chunks added
+        """
+        chunks = self.document_processor.process_documents(documents)
+        try:
+            self.vector_store.add_documents(chunks)
+        except Exception:
+            self.document_processor.record_added([])
+            raise
+        self.document_processor.record_added(chunks)
+        return len(chunks)
+
     async def process_query(self, query: str, max_sections: int = settings.MAX_SECTIONS) -> Dict[str, Any]:
         """
         Process a query through the RAG pipeline
@@ -1,19 +1,27 @@
 from typing import List, Dict, Any
 from langchain.vectorstores import Chroma
-from langchain.embeddings import OpenAIEmbeddings
 from langchain.docstore.document import Document
 from loguru import logger
 import os
+from .embedding_providers import embeddings_from_settings
+from rag_common.keyword_index import BM25Index
+from rag_common.query_cache import QueryEmbeddingCache
 from ..core.config import settings
 
 class VectorStoreManager:
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings(
-            openai_api_key=settings.OPENAI_API_KEY,
-            model="text-embedding-3-small"
-        )
+        self.embeddings = embeddings_from_settings()
         self.vector_store = None
+        self.keyword_index = None
+        # Bumped whenever documents are added so reused results never go stale
+        self.version = 0
+        self.query_cache = QueryEmbeddingCache(
+            max_entries=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            semantic_threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            semantic_window=settings.SEMANTIC_CACHE_WINDOW
+        )
         self._initialize_vector_store()
+        self._initialize_keyword_index()
         logger.info("VectorStoreManager initialized")
 
     def _initialize_vector_store(self):
@@ -35,6 +43,15 @@ class VectorStoreManager:
             logger.error(f"Error initializing vector store: {str(e)}")
             raise
 
+    def _initialize_keyword_index(self):
+        """Load the BM25 index kept alongside the vector store, or start an empty one"""
+        try:
+            self.keyword_index = BM25Index.load(settings.KEYWORD_INDEX_PATH)
+            logger.info("Loaded keyword index with {} chunks", len(self.keyword_index))
+        except FileNotFoundError:
+            logger.info("Creating new keyword index")
+            self.keyword_index = BM25Index()
+
     def add_documents(self, documents: List[Document]):
         """
         Add documents to the vector store
@@ -44,8 +61,11 @@ class VectorStoreManager:
         """
         try:
             logger.info(f"Adding {len(documents)} documents to vector store")
-            self.vector_store.add_documents(documents)
+            ids = self.vector_store.add_documents(documents)
             self.vector_store.persist()
+            self.keyword_index.add(ids, [doc.page_content for doc in documents])
+            self.keyword_index.save(settings.KEYWORD_INDEX_PATH)
+            self.version += 1
             logger.info("Documents added and persisted successfully")
         except Exception as e:
             logger.error(f"Error adding documents to vector store: {str(e)}")
@@ -64,13 +84,46 @@ class VectorStoreManager:
         """
         try:
             logger.info(f"Performing similarity search for query: {query}")
-            results = self.vector_store.similarity_search(query, k=k)
+            vector = self.query_cache.embed(query, self.embeddings.embed_query)
+            results = self.query_cache.similar_results(vector, k, self.version)
+            if results is None:
+                results = self.vector_store.similarity_search_by_vector(vector, k=k)
+                self.query_cache.remember_results(vector, k, self.version, results)
             logger.info(f"Found {len(results)} similar documents")
             return results
         except Exception as e:
             logger.error(f"Error performing similarity search: {str(e)}")
             raise
 
+    def keyword_search(self, query: str, k: int = settings.MAX_DOCS) -> List[Document]:
+        """
+        Perform BM25 keyword search over chunk text
+        
+        Args:
+            query (str): Query string
+            k (int): Number of results to return
+            
+        Returns:
+            List[Document]: List of matching documents, best match first
+        """
+        try:
+            logger.info(f"Performing keyword search for query: {query}")
+            hits = self.keyword_index.search(query, k=k)
+            if not hits:
+                return []
+            ids = [doc_id for doc_id, _ in hits]
+            found = self.vector_store.get(ids=ids)
+            by_id = {
+                doc_id: Document(page_content=text, metadata=metadata or {})
+                for doc_id, text, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+            }
+            results = [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+            logger.info(f"Found {len(results)} keyword matches")
+            return results
+        except Exception as e:
+            logger.error(f"Error performing keyword search: {str(e)}")
+            raise
+
     def hybrid_search(self, query: str, k: int = settings.MAX_DOCS) -> Dict[str, List[Document]]:
         """
         Perform hybrid search combining similarity and keyword search
@@ -85,10 +138,10 @@ class VectorStoreManager:
         try:
             logger.info(f"Performing hybrid search for query: {query}")
             similarity_results = self.similarity_search(query, k=k)
-            # Add keyword search results here if needed
+            keyword_results = self.keyword_search(query, k=k)
             results = {
                 "similarity": similarity_results,
-                "keyword": []  # Implement keyword search if needed
+                "keyword": keyword_results
             }
             logger.info(f"Hybrid search completed with {len(similarity_results)} results")
             return results
@@ -0,0 +1,117 @@
+"""Embedding throughput: sequential batches vs the concurrent embedding executor.
+
+Starts a local OpenAI-compatible ``/v1/embeddings`` stand-in that answers
+after ``--latency`` seconds plus ``--per-token-us`` per input token, and
+throttles (429 with ``Retry-After``) every ``--throttle-every``-th request.
+The same corpus is then embedded two ways and tokens/sec reported:
+
+* ``sequential`` - one request after another, 1000 texts each, as the
+  previous ``OpenAIEmbeddings`` setup did;
+* ``executor``   - ``EmbeddingExecutor`` with token-packed batches and
+  ``--concurrency`` requests in flight.
+
+Point ``--base-url`` at a real endpoint to measure that instead.
+
+    PYTHONPATH=src python benchmarks/bench_embedding.py --texts 20000 --concurrency 8
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from storage.embedding_executor import EmbeddingExecutor
+
+WORDS = "retrieval graph embedding citation transformer sparse dense attention benchmark model".split()
+
+def stand_in(latency: float, per_token_us: float, throttle_every: int, dims: int) -> ThreadingHTTPServer:
+    counter = {"n": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                counter["n"] += 1
+                throttled = throttle_every and counter["n"] % throttle_every == 0
+            tokens = sum(len(text) // 4 + 1 for text in body["input"])
+            if throttled:
+                self.send_response(429)
+                self.send_header("Retry-After", "0.2")
+                payload = b'{"error": {"message": "rate limited"}}'
+            else:
+                time.sleep(latency + tokens * per_token_us / 1e6)
+                payload = json.dumps({
+                    "object": "list",
+                    "model": body["model"],
+                    "data": [{"object": "embedding", "index": i, "embedding": [0.1] * dims} for i in range(len(body["input"]))],
+                    "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                }).encode()
+                self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_sequential(executor: EmbeddingExecutor, texts: list) -> None:
+    prepared, counts = executor._prepare(texts)
+    for start in range(0, len(prepared), 1000):
+        executor._request(prepared[start:start + 1000], sum(counts[start:start + 1000]))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=150, help="words per text")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-tokens", type=int, default=50_000)
+    parser.add_argument("--latency", type=float, default=0.15, help="stand-in seconds per request")
+    parser.add_argument("--per-token-us", type=float, default=2.0)
+    parser.add_argument("--throttle-every", type=int, default=7)
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--api-key", default="bench")
+    parser.add_argument("--model", default="text-embedding-3-small")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = stand_in(args.latency, args.per_token_us, args.throttle_every, args.dims)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    rng = random.Random(7)
+    texts = [" ".join(rng.choices(WORDS, k=args.words)) for _ in range(args.texts)]
+    print(f"{args.texts} texts x {args.words} words against {base_url}")
+    for mode in ("sequential", "executor"):
+        executor = EmbeddingExecutor(
+            model=args.model,
+            api_key=args.api_key,
+            base_url=base_url,
+            max_concurrency=1 if mode == "sequential" else args.concurrency,
+            batch_tokens=args.batch_tokens,
+            tokens_per_minute=10**9,
+        )
+        start = time.perf_counter()
+        if mode == "sequential":
+            run_sequential(executor, texts)
+        else:
+            executor.embed_documents(texts)
+        elapsed = time.perf_counter() - start
+        stats = executor.stats()
+        print(
+            f"{mode:<10} {elapsed:>8.2f}s  requests={stats['requests']:<5} retries={stats['retries']:<3} "
+            f"tokens/s={stats['tokens'] / elapsed:>10.0f}"
+        )
+        executor.close()
+    if server is not None:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
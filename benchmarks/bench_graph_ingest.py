@@ -0,0 +1,130 @@
+"""Graph ingest throughput: per-row MERGE statements vs batched UNWIND writes.
+
+By default runs against a fake driver that charges a fixed round trip per
+statement plus a small per-row cost, which is enough to show where the time
+goes. Pass ``--uri`` to measure against a real Neo4j instance instead.
+
+    PYTHONPATH=src python benchmarks/bench_graph_ingest.py --papers 20000 --workers 4
+    PYTHONPATH=src python benchmarks/bench_graph_ingest.py --uri bolt://localhost:7687
+"""
+import argparse
+import time
+from unittest.mock import patch
+from common.models import GraphNode, GraphRelationship, GraphDocument
+from storage.graph_manager import Neo4jGraphStore
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, statement, parameters=None, **params):
+        rows = len((parameters or params).get("rows", [None]))
+        self.driver.statements += 1
+        self.driver.rows += rows
+        time.sleep(self.driver.round_trip_s + rows * self.driver.per_row_s)
+        return self
+
+    def consume(self):
+        return None
+
+    def execute_write(self, fn):
+        return fn(self)
+
+class FakeDriver:
+    """Records statements and simulates network round trips."""
+
+    def __init__(self, round_trip_s: float, per_row_s: float):
+        self.round_trip_s = round_trip_s
+        self.per_row_s = per_row_s
+        self.statements = 0
+        self.rows = 0
+
+    def session(self):
+        return FakeSession(self)
+
+    def close(self):
+        pass
+
+def synthetic_graph(papers: int, authors: int, citations: int) -> list:
+    docs = []
+    for i in range(papers):
+        paper = GraphNode(id=f"paper_{i}", type="Paper", properties={"title": f"Paper {i}"})
+        nodes, rels = [paper], []
+        for j in range(2):
+            author_id = f"author_{(i * 7 + j) % authors}"
+            nodes.append(GraphNode(id=author_id, type="Author", properties={"name": author_id}))
+            rels.append(GraphRelationship(source=paper.id, target=author_id, type="WRITTEN_BY", properties={}))
+        for j in range(1, min(i, citations) + 1):
+            rels.append(GraphRelationship(source=paper.id, target=f"paper_{i - j}", type="CITES", properties={}))
+        docs.append(GraphDocument(nodes=nodes, relationships=rels))
+    return docs
+
+def per_row_ingest(store: Neo4jGraphStore, graph_docs: list) -> None:
+    """The previous ingest loop: one auto-commit statement per node and relationship."""
+    with store.driver.session() as session:
+        for doc in graph_docs:
+            for node in doc.nodes:
+                session.run(
+                    f"MERGE (n:{node.type} {{id: $id}}) SET n += $properties",
+                    id=node.id, properties=node.properties,
+                )
+            for rel in doc.relationships:
+                source_label, target_label = store.schema.endpoints(rel.type)
+                session.run(
+                    f"MATCH (source:{source_label} {{id: $source}}) MERGE (target:{target_label} {{id: $target}}) "
+                    f"MERGE (source)-[r:{rel.type}]->(target) SET r += $properties",
+                    source=rel.source, target=rel.target, properties=rel.properties,
+                )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=5_000)
+    parser.add_argument("--authors", type=int, default=2_000)
+    parser.add_argument("--citations", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--round-trip-ms", type=float, default=0.5)
+    parser.add_argument("--per-row-us", type=float, default=5.0)
+    parser.add_argument("--uri")
+    parser.add_argument("--user", default="neo4j")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--skip-per-row", action="store_true")
+    args = parser.parse_args()
+
+    graph_docs = synthetic_graph(args.papers, args.authors, args.citations)
+    n_rels = sum(len(doc.relationships) for doc in graph_docs)
+    print(f"{args.papers} papers, {n_rels} relationships, batch={args.batch_size}, workers={args.workers}")
+
+    def make_store() -> Neo4jGraphStore:
+        if args.uri:
+            return Neo4jGraphStore(args.uri, args.user, args.password)
+        driver = FakeDriver(args.round_trip_ms / 1000, args.per_row_us / 1e6)
+        with patch("storage.graph_manager.GraphDatabase.driver", return_value=driver):
+            return Neo4jGraphStore("bolt://fake", args.user, args.password)
+
+    if not args.skip_per_row:
+        store = make_store()
+        start = time.perf_counter()
+        per_row_ingest(store, graph_docs)
+        elapsed = time.perf_counter() - start
+        statements = getattr(store.driver, "statements", "-")
+        print(f"per-row   {elapsed:>8.2f}s  statements={statements}")
+        store.close()
+
+    store = make_store()
+    stats = store.ingest(graph_docs, batch_size=args.batch_size, workers=args.workers)
+    statements = getattr(store.driver, "statements", "-")
+    print(
+        f"unwind    {stats['seconds']:>8.2f}s  statements={statements}  "
+        f"nodes/s={stats['nodes_per_sec']:.0f}  rels/s={stats['rels_per_sec']:.0f}"
+    )
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Graph keyword lookup latency: CONTAINS scan vs the full-text index.
+
+Needs a running Neo4j. Loads ``--nodes`` synthetic Paper nodes through the
+normal batched ingest (skip with ``--skip-load`` on re-runs), then times the
+old ``CONTAINS`` predicate, parameterized here so quoting cannot skew it,
+against ``fulltext_search`` for the same queries.
+
+    PYTHONPATH=src python benchmarks/bench_graph_search.py --uri bolt://localhost:7687 --nodes 1000000
+"""
+import argparse
+import random
+import statistics
+import time
+from common.models import GraphNode, GraphDocument
+from storage.graph_manager import Neo4jGraphStore
+
+WORDS = (
+    "graph neural network retrieval augmented generation transformer attention sparse dense "
+    "embedding contrastive diffusion reinforcement learning policy reward language model "
+    "citation knowledge distillation quantization pruning benchmark evaluation multimodal "
+    "vision speech protein molecule causal inference bayesian optimization federated privacy"
+).split()
+
+SCAN_QUERY = """
+MATCH (n:Paper)
+WHERE n.title CONTAINS $query OR n.content CONTAINS $query
+RETURN n
+LIMIT $k
+"""
+
+def synthetic_papers(n: int, rng: random.Random) -> list:
+    nodes = [
+        GraphNode(
+            id=f"bench_paper_{i}",
+            type="Paper",
+            properties={
+                "title": " ".join(rng.choices(WORDS, k=8)),
+                "content": " ".join(rng.choices(WORDS, k=60)),
+            },
+        )
+        for i in range(n)
+    ]
+    return [GraphDocument(nodes=nodes, relationships=[])]
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+    return f"p50={statistics.median(samples):8.1f}ms  p95={p95:8.1f}ms"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uri", required=True)
+    parser.add_argument("--user", default="neo4j")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--skip-load", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    store = Neo4jGraphStore(args.uri, args.user, args.password)
+    if not args.skip_load:
+        stats = store.ingest(synthetic_papers(args.nodes, rng), batch_size=args.batch_size)
+        print(f"loaded {stats['nodes']} nodes in {stats['seconds']:.1f}s")
+        # Full-text indexes are populated asynchronously after writes.
+        store.cypher("CALL db.awaitIndexes(3600)")
+
+    queries = [" ".join(rng.sample(WORDS, 2)) for _ in range(args.queries)]
+    for name, run in (
+        ("contains", lambda q: store.cypher(SCAN_QUERY, {"query": q, "k": args.k})),
+        ("fulltext", lambda q: store.fulltext_search(q, k=args.k)),
+    ):
+        run(queries[0])  # warm up plan and page cache
+        samples = []
+        for query in queries:
+            start = time.perf_counter()
+            run(query)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<10} {percentiles(samples)}")
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Startup time and memory of pickled vs memory-mapped vector store loading.
+
+Builds a synthetic FAISS store, saves it in both on-disk formats and then
+starts ``--workers`` processes per mode that load it concurrently, the way
+several uvicorn workers would. Each worker reports its load time and memory
+(RSS, plus PSS where the kernel exposes it, which splits shared pages
+between the processes mapping them).
+
+    PYTHONPATH=src python benchmarks/bench_index_load.py --vectors 200000 --dim 768
+"""
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+import faiss
+from storage.mmap_store import save_mmap, load_mmap
+
+def _memory_kb() -> dict:
+    stats = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                stats[key] = int(value.split()[0])
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    stats["Pss"] = int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return stats
+
+def _worker(mode: str, path: str, dim: int, barrier, results) -> None:
+    baseline = _memory_kb()
+    embeddings = FakeEmbeddings(size=dim)
+    start = time.perf_counter()
+    if mode == "pickle":
+        store = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+    else:
+        store = load_mmap(Path(path), embeddings)
+    load_s = time.perf_counter() - start
+    query = np.random.default_rng(0).random(dim, dtype=np.float32).tolist()
+    store.similarity_search_by_vector(query, k=10)
+    first_query_s = time.perf_counter() - start - load_s
+    # Hold every worker alive together so shared pages are counted as shared.
+    barrier.wait()
+    memory = _memory_kb()
+    results.put({
+        "load_s": load_s,
+        "first_query_s": first_query_s,
+        **{k: memory[k] - baseline.get(k, 0) for k in memory},
+    })
+    barrier.wait()
+
+def build_store(path: Path, vectors: int, dim: int) -> None:
+    rng = np.random.default_rng(42)
+    index = faiss.IndexFlatL2(dim)
+    for start in range(0, vectors, 50_000):
+        index.add(rng.random((min(50_000, vectors - start), dim), dtype=np.float32))
+    text = "lorem ipsum " * 80
+    docs = {str(i): Document(page_content=f"{i} {text}", metadata={"source": f"paper_{i // 40}.pdf", "page": i % 40})
+            for i in range(vectors)}
+    store = FAISS(FakeEmbeddings(size=dim), index, InMemoryDocstore(docs), {i: str(i) for i in range(vectors)})
+    store.save_local(str(path / "pickle"))
+    save_mmap(store, path / "mmap")
+
+def run_mode(mode: str, path: Path, dim: int, workers: int) -> list:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, str(path / mode), dim, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    out = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return out
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp)
+        print(f"Building synthetic store: {args.vectors} x {args.dim}")
+        build_store(path, args.vectors, args.dim)
+        print(f"{'mode':<8} {'load s':>8} {'1st query s':>12} {'RSS MB':>8} {'anon MB':>8} {'PSS MB':>8}")
+        for mode in ("pickle", "mmap"):
+            rows = run_mode(mode, path, args.dim, args.workers)
+            mean = lambda key: sum(r.get(key, 0) for r in rows) / len(rows)
+            total_pss = sum(r.get("Pss", 0) for r in rows) / 1024
+            print(f"{mode:<8} {mean('load_s'):>8.3f} {mean('first_query_s'):>12.4f} "
+                  f"{mean('VmRSS') / 1024:>8.1f} {mean('RssAnon') / 1024:>8.1f} {mean('Pss') / 1024:>8.1f}"
+                  f"   (total PSS over {len(rows)} workers: {total_pss:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
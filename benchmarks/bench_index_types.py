@@ -0,0 +1,81 @@
+"""Recall@k, QPS and memory of each configurable FAISS index type.
+
+Uses synthetic clustered vectors (embeddings are far from uniform, so a
+Gaussian mixture is a fairer stand-in than uniform noise) and measures every
+index type against exact flat search. With ``--source hashing`` the vectors
+are instead local ``HashingEmbeddings`` of synthetic topical text (no
+network), queried with perturbed copies of corpus texts.
+
+    PYTHONPATH=src python benchmarks/bench_index_types.py --vectors 500000 --dim 768
+    PYTHONPATH=src python benchmarks/bench_index_types.py --source hashing --vectors 2000000 --dim 384
+"""
+import argparse
+import random
+import time
+import faiss
+import numpy as np
+from rag_common.hashing_embeddings import HashingEmbeddings
+from storage.index_factory import IndexConfig, build_index
+
+def synthetic_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    return centers[labels] + 0.3 * rng.standard_normal((n, dim), dtype=np.float32)
+
+def hashed_vectors(n: int, dim: int, queries: int, seed: int = 7) -> tuple:
+    """Embed ``n`` synthetic texts (each drawn from one of ~n/1000 topics) and ``queries`` edited copies."""
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(20_000)]
+    topics = [rng.sample(vocabulary, 60) for _ in range(max(16, n // 1000))]
+    texts = [" ".join(rng.choices(rng.choice(topics), k=80)) for _ in range(n)]
+    probes = [" ".join(rng.sample(text.split(), 60)) for text in rng.sample(texts, queries)]
+    embeddings = HashingEmbeddings(dimensions=dim)
+    start = time.perf_counter()
+    data = embeddings.embed_array(texts)
+    print(f"embedded {n} texts in {time.perf_counter() - start:.1f}s")
+    return data, embeddings.embed_array(probes)
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--pq-m", type=int, default=32)
+    parser.add_argument("--source", choices=("gaussian", "hashing"), default="gaussian")
+    args = parser.parse_args()
+
+    if args.source == "hashing":
+        data, queries = hashed_vectors(args.vectors, args.dim, args.queries)
+    else:
+        rng = np.random.default_rng(7)
+        data = synthetic_vectors(args.vectors, args.dim, clusters=max(16, args.vectors // 1000), rng=rng)
+        queries = data[rng.choice(args.vectors, size=args.queries, replace=False)]
+        queries = queries + 0.05 * rng.standard_normal(queries.shape, dtype=np.float32)
+
+    base = dict(ivf_nlist=args.nlist, ivf_nprobe=args.nprobe, hnsw_ef_search=args.ef_search, pq_m=args.pq_m)
+    truth = None
+    print(f"{args.vectors} x {args.dim}, {args.queries} queries, k={args.k}")
+    print(f"{'index':<10} {'build s':>8} {'recall@k':>9} {'QPS':>10} {'memory MB':>10}")
+    for index_type in ("flat", "hnsw", "ivf_flat", "ivf_pq", "sq8"):
+        start = time.perf_counter()
+        index = build_index(data, IndexConfig(index_type=index_type, **base))
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, found = index.search(queries, args.k)
+        qps = args.queries / (time.perf_counter() - start)
+        if truth is None:
+            truth = found
+        memory_mb = faiss.serialize_index(index).nbytes / 1024 ** 2
+        print(f"{index_type:<10} {build_s:>8.1f} {recall_at_k(found, truth):>9.3f} {qps:>10.0f} {memory_mb:>10.1f}")
+
+if __name__ == "__main__":
+    main()
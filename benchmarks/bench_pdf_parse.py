@@ -0,0 +1,108 @@
+"""PDF parsing throughput: gather-over-threads vs the bounded parse engine.
+
+Writes ``--files`` synthetic PDFs of ``--pages`` text pages each (plain PDF
+1.4 with Helvetica text, no extra dependencies), then parses the corpus
+three ways and reports pages/sec:
+
+* ``gather``  - the previous approach, one ``asyncio.to_thread`` per file
+  awaited together with ``asyncio.gather``;
+* ``thread``  - ``PDFParseEngine`` over a thread pool;
+* ``process`` - ``PDFParseEngine`` over a process pool.
+
+Parsing needs PyMuPDF installed.
+
+    PYTHONPATH=src python benchmarks/bench_pdf_parse.py --files 400 --pages 12 --workers 8
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+from loaders.pdf_parser import PDFParseEngine, parse_pdf_file
+
+WORDS = (
+    "retrieval augmented generation graph neural network transformer attention sparse dense "
+    "embedding contrastive diffusion reinforcement learning policy language model citation "
+    "knowledge distillation quantization benchmark evaluation multimodal inference optimization"
+).split()
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def synthetic_pdf(pages: int, lines_per_page: int, rng: random.Random) -> bytes:
+    """A minimal multi-page PDF with one text stream per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        lines = [" ".join(rng.choices(WORDS, k=12)) for _ in range(lines_per_page)]
+        body = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        stream = body.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), pages
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def write_corpus(directory: Path, files: int, pages: int, lines: int) -> list:
+    rng = random.Random(7)
+    paths = []
+    for i in range(files):
+        path = directory / f"paper_{i:05d}.pdf"
+        path.write_bytes(synthetic_pdf(pages, lines, rng))
+        paths.append(path)
+    return paths
+
+async def run_gather(paths: list) -> int:
+    results = await asyncio.gather(*(asyncio.to_thread(parse_pdf_file, str(p)) for p in paths))
+    return sum(docs[0].metadata.get("total_pages", len(docs)) for docs in results if docs)
+
+async def run_engine(paths: list, executor: str, workers: int, max_in_flight: int) -> int:
+    pages = 0
+    with PDFParseEngine(executor=executor, workers=workers, max_in_flight=max_in_flight) as engine:
+        async for result in engine.parse(paths):
+            if not result.ok:
+                raise RuntimeError(f"{result.path}: {result.error}")
+            pages += result.pages
+    return pages
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--lines", type=int, default=50, help="text lines per page")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-in-flight", type=int, default=None)
+    parser.add_argument("--modes", default="gather,thread,process")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_corpus(Path(tmp), args.files, args.pages, args.lines)
+        print(f"{args.files} PDFs x {args.pages} pages, workers={args.workers}")
+        for mode in args.modes.split(","):
+            start = time.perf_counter()
+            if mode == "gather":
+                pages = asyncio.run(run_gather(paths))
+            else:
+                pages = asyncio.run(run_engine(paths, mode, args.workers, args.max_in_flight))
+            elapsed = time.perf_counter() - start
+            print(f"{mode:<8} {elapsed:>8.2f}s  pages={pages}  pages/s={pages / elapsed:>9.1f}")
+
+if __name__ == "__main__":
+    main()
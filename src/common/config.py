@@ -1,20 +1,115 @@
 from pydantic import BaseSettings, Field
 from pathlib import Path
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str = Field(..., env="OPENAI_API_KEY")
     llm_model: str = "gpt-4o-mini"
+    # "openai" (any OpenAI-compatible API) or "hashing" (offline, deterministic; for benchmarks
+    # and air-gapped installs). An index is only searchable with the provider that built it.
+    embedding_provider: str = "openai"
     embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: Optional[int] = None  # model default
+    embedding_base_url: Optional[str] = None  # any OpenAI-compatible endpoint, e.g. a local stand-in
+    embedding_max_concurrency: int = 4  # embedding requests in flight
+    embedding_tokens_per_minute: int = 1_000_000
+    embedding_batch_tokens: int = 50_000  # tokens packed into one request
+    embedding_max_retries: int = 6
+    embedding_timeout_s: float = 60.0
+    hashing_embedding_dimensions: int = 384
+    hashing_embedding_ngrams: int = 2  # word n-grams up to this length
+    hashing_embedding_seed: int = 0
+
+    # Embedding cache
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: Path = Path("./cache/embeddings.sqlite")
+    embedding_cache_max_bytes: int = 2 * 1024 ** 3
 
     # Vector store
     vector_path: Path = Path("./vector_store")
+    ingest_manifest_path: Path = Path("./data/ingest_manifest.json")
     vector_rebuild: bool = False
+    vector_mmap: bool = True  # memory-mapped, read-only index + SQLite docstore
+
+    # Vector index type: flat | hnsw | ivf_flat | ivf_pq | sq8
+    vector_index_type: str = "flat"
+    vector_train_sample: int = 100_000
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    ivf_nlist: int = 4096
+    ivf_nprobe: int = 16
+    pq_m: int = 64
+    pq_nbits: int = 8
+
+    # Keyword (BM25) index, stored next to the vector index
+    keyword_index_enabled: bool = True
+    bm25_k1: float = 1.5
+    bm25_b: float = 0.75
+
+    # Near-duplicate chunks of different papers (MinHash LSH), dropped before embedding
+    near_dup_enabled: bool = True
+    near_dup_threshold: float = 0.8  # estimated Jaccard similarity of word 3-gram sets
+    near_dup_num_perm: int = 128
+    near_dup_bands: int = 16  # 8 rows per band: candidates from ~0.7 similarity
+
+    # Retrieval fan-out and fusion
+    vector_timeout_s: float = 2.0
+    keyword_timeout_s: float = 0.5
+    graph_timeout_s: float = 2.0
+    retrieval_fusion: str = "rrf"  # rrf | weighted
+    rrf_k: int = 60
+    fusion_weights: Dict[str, float] = {"vector": 1.0, "keyword": 1.0, "graph": 0.5}
+
+    # Query-embedding cache; semantic reuse is off unless a threshold is set
+    query_embedding_cache_size: int = 4096
+    semantic_cache_threshold: Optional[float] = None  # e.g. 0.97 cosine
+    semantic_cache_window: int = 512
+
+    # Query-result cache
+    query_cache_enabled: bool = True
+    query_cache_max_entries: int = 2048
+    query_cache_max_bytes: int = 256 * 1024 ** 2
+    query_cache_ttl_s: float = 900.0
 
     # Neo4j
     neo4j_uri: str = "neo4j://localhost:7687"
     neo4j_user: str = "neo4j"
     neo4j_password: str = "password"
+    graph_backend: str = "neo4j"  # neo4j | embedded (in-process CSR arrays, no server)
+    graph_embedded_path: Path = Path("./graph_store")
+    graph_apply_schema: bool = True  # create constraints/indexes on connect
+    graph_fulltext_index: str = "paper_text"
+    graph_fulltext_analyzer: str = "english"  # see CALL db.index.fulltext.listAvailableAnalyzers()
+    graph_expand_hops: int = 2
+    graph_expand_per_seed: int = 25  # neighbors kept per seed paper
+    graph_expand_limit: int = 20  # neighbors returned after merging seeds
+    graph_neighborhood_cache_size: int = 4096  # per-seed neighborhoods (LRU)
+    centrality_path: Path = Path("./data/centrality")
+    citation_graph_path: Path = Path("./data/citation_graph")
+    graph_strategy: str = "expand"  # expand (1..N hop neighborhoods) | ppr (personalized PageRank)
+    ppr_alpha: float = 0.15  # restart probability
+    ppr_max_iter: int = 10
+    ppr_budget_ms: float = 5.0
+    ppr_epsilon: float = 1e-5  # mass below this is pruned to keep walks local
+    centrality_weight: float = 0.15  # share of the final score taken by the citation prior
+    graph_batch_size: int = 1000  # rows per UNWIND transaction
+    graph_writer_workers: int = 4  # parallel writer sessions
+
+    # PDF parsing
+    pdf_parse_executor: str = "process"  # process | thread
+    pdf_parse_workers: Optional[int] = None  # defaults to the CPU count
+    pdf_parse_max_in_flight: Optional[int] = None  # files queued or parsing; defaults to 2x workers
+    pdf_parse_start_method: str = "spawn"  # fork is unsafe once driver/client threads are running
+    parse_cache_enabled: bool = True
+    parse_cache_path: Path = Path("./cache/parse_cache.sqlite")
+
+    # Streaming ingest pipeline
+    ingest_queue_size: int = 64  # papers buffered between stages
+    ingest_chunk_workers: int = 2
+    ingest_embed_workers: int = 4
+    ingest_checkpoint_chunks: int = 20_000  # save index, graph batch and manifest every N chunks
 
     # Chunking
     chunk_size: int = 2000
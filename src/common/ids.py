@@ -0,0 +1,79 @@
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, Optional
+
+__all__ = [
+    "normalize_title",
+    "normalize_author",
+    "parse_arxiv_id",
+    "paper_id",
+    "reference_id",
+    "author_id",
+    "content_digest",
+    "chunk_id",
+]
+
+# New-style (2401.01234) and old-style (cs/0112017) identifiers, with an
+# optional version suffix that is dropped so every revision maps to one paper.
+_ARXIV_RE = re.compile(r"(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?", re.IGNORECASE)
+
+def _sha(value: str) -> str:
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:16]
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+def normalize_title(title: str) -> str:
+    """Lower-case, accent- and punctuation-free title with collapsed whitespace."""
+    return _fold(title)
+
+def normalize_author(name: str) -> str:
+    """Canonical author name; "Doe, Jane" and "Jane Doe" map to the same key."""
+    if "," in name:
+        last, _, first = name.partition(",")
+        name = f"{first} {last}"
+    return _fold(name)
+
+def parse_arxiv_id(value: str) -> Optional[str]:
+    """Extract a version-less arXiv id from an id, abs/pdf URL or filename."""
+    if not value:
+        return None
+    match = _ARXIV_RE.search(value)
+    return match.group(1).lower() if match else None
+
+def paper_id(metadata: Dict[str, Any], text: str = "") -> str:
+    """Stable paper id shared by the vector and graph stores.
+
+    Prefers the arXiv id, then the normalized title, then the source path,
+    and only falls back to the text itself for anonymous documents.
+    """
+    arxiv_id = parse_arxiv_id(str(metadata.get("arxiv_id") or metadata.get("id") or ""))
+    if arxiv_id:
+        return f"paper_{_sha('arxiv:' + arxiv_id)}"
+    title = normalize_title(str(metadata.get("title") or ""))
+    if title:
+        return f"paper_{_sha('title:' + title)}"
+    source = str(metadata.get("source") or "")
+    if source:
+        return f"paper_{_sha('source:' + source)}"
+    return f"paper_{_sha('text:' + text)}"
+
+def reference_id(reference: str) -> str:
+    """Paper id for a citation given as an arXiv id or a title."""
+    if _ARXIV_RE.fullmatch(reference.strip()):
+        return paper_id({"arxiv_id": reference})
+    return paper_id({"title": reference})
+
+def author_id(name: str) -> str:
+    return f"author_{_sha(normalize_author(name))}"
+
+def content_digest(text: str) -> str:
+    """Fingerprint of a paper's text, used to detect changed re-ingests."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def chunk_id(paper: str, digest: str, index: int) -> str:
+    """Docstore id of the ``index``-th chunk of one version of a paper."""
+    return f"{paper}:{digest[:12]}:{index}"
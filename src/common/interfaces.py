@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 class Document(ABC):
@@ -37,6 +37,10 @@ class VectorStore(ABC):
     @abstractmethod
     def search(self, query: str, k: int = 5) -> List[Document]:
         pass
+    
+    def search_many(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """Search several queries; stores override this to batch the work."""
+        return [self.search(query, k=k) for query in queries]
 
 class GraphStore(ABC):
     """Interface for graph stores."""
@@ -53,6 +57,27 @@ class GraphStore(ABC):
     @abstractmethod
     def query(self, query: str) -> List[Dict[str, Any]]:
         pass
+    
+    @abstractmethod
+    def fulltext_search(self, text: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Scored keyword lookup over node text; records carry ``n`` and ``score``."""
+        pass
+    
+    @abstractmethod
+    def expand(self, seed_ids: List[str], max_hops: int = 2, per_seed: int = 25) -> Dict[str, List[Dict[str, Any]]]:
+        """Neighborhood of each seed paper: ``{seed: [{id, title, published, hops}]}``."""
+        pass
+    
+    @abstractmethod
+    def citation_edges(self) -> Tuple[List[str], List[Optional[str]], Any, Any]:
+        """Paper ids and titles plus CITES edges as (src, dst) index arrays into them."""
+        pass
+    
+    def commit(self) -> None:
+        """Persist buffered writes; stores that write through need not override this."""
+    
+    def close(self) -> None:
+        """Release connections held by the store."""
 
 class Retriever(ABC):
     """Interface for retrievers."""
@@ -9,4 +9,8 @@ handler.setFormatter(logging.Formatter(
     fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S"
 ))
-logger.addHandler(handler)
\ No newline at end of file
+logger.addHandler(handler)
+
+# The shared rag_common modules log under their own names; show them alongside ours.
+logging.getLogger("rag_common").setLevel(logging.INFO)
+logging.getLogger("rag_common").addHandler(handler)
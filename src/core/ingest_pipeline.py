@@ -0,0 +1,233 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterable, Awaitable, Callable, Dict, List, Optional, Set
+import numpy as np
+from langchain_core.documents import Document
+from common.config import settings
+from common.ids import paper_id, content_digest
+from common.interfaces import GraphStore
+from common.logger import logger
+from common.models import PDFDocument
+from rag_common.near_duplicates import DedupePlan
+from storage.ingest_manifest import IngestManifest
+from storage.vector_store_manager import VectorStoreManager
+
+__all__ = ["IngestPipeline", "PaperBatch"]
+
+# Index types that must be trained before the first vector can be added.
+_TRAINED_INDEX_TYPES = ("ivf_flat", "ivf_pq", "sq8")
+
+_DONE = object()
+
+@dataclass
+class PaperBatch:
+    """One paper moving through the pipeline, enriched stage by stage."""
+    paper_id: str
+    pages: List[Document]
+    digest: str = ""
+    stale: List[str] = field(default_factory=list)
+    chunk_ids: List[str] = field(default_factory=list)  # every chunk of the paper
+    chunks: List[Document] = field(default_factory=list)  # those still to be written
+    ids: List[str] = field(default_factory=list)
+    vectors: Optional[np.ndarray] = None
+    dedupe_plan: Optional[DedupePlan] = None  # recorded once the batch is checkpointed
+
+class IngestPipeline:
+    """Streaming ingest: load -> chunk -> dedupe -> embed -> index + graph.
+
+    Stages run concurrently and are connected by bounded queues, so at most
+    ``queue_size`` papers wait between any two stages. Memory stays flat in
+    corpus size, and parsing, embedding and index writes overlap. Chunking
+    and embedding run in worker threads (``chunk_workers``/``embed_workers``
+    each). A single writer adds vectors to the index and papers to the
+    graph. Every ``checkpoint_chunks`` chunks it saves the index, writes
+    the graph batch and records the papers in the manifest. Papers are only
+    marked ingested once their chunks are on disk, so an interrupted run
+    resumes where the last checkpoint left off.
+    """
+
+    def __init__(
+        self,
+        vsm: VectorStoreManager,
+        gm: GraphStore,
+        manifest: IngestManifest,
+        chunk_workers: Optional[int] = None,
+        embed_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        checkpoint_chunks: Optional[int] = None,
+    ):
+        self.vsm = vsm
+        self.gm = gm
+        self.manifest = manifest
+        self.chunk_workers = chunk_workers or settings.ingest_chunk_workers
+        self.embed_workers = embed_workers or settings.ingest_embed_workers
+        self.queue_size = queue_size or settings.ingest_queue_size
+        self.checkpoint_chunks = checkpoint_chunks or settings.ingest_checkpoint_chunks
+        # Every paper id seen in the input, ingested or skipped as unchanged.
+        self.seen: Set[str] = set()
+        self.stats: Dict[str, float] = {}
+        # Dedupe plans of papers between the dedupe stage and their checkpoint.
+        self._planned: List[DedupePlan] = []
+
+    async def run(self, documents: AsyncIterable[Document]) -> Dict[str, float]:
+        """Ingest ``documents`` (pages, grouped per paper in arrival order)."""
+        self.stats = {"papers": 0, "unchanged": 0, "chunks": 0, "duplicates": 0, "near_duplicates": 0, "checkpoints": 0}
+        self._indexed = await asyncio.to_thread(self.vsm.indexed_ids)
+        self._planned = []
+        start = time.perf_counter()
+        papers, chunked, unique, embedded = (asyncio.Queue(self.queue_size) for _ in range(4))
+        stages = [
+            self._load(documents, papers),
+            self._stage(self._chunk, papers, chunked, self.chunk_workers),
+            self._stage(self._dedupe, chunked, unique, 1),
+            self._stage(self._embed, unique, embedded, self.embed_workers),
+            self._write(embedded),
+        ]
+        tasks = [asyncio.create_task(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        seconds = time.perf_counter() - start
+        self.stats["seconds"] = seconds
+        self.stats["chunks_per_sec"] = self.stats["chunks"] / max(seconds, 1e-9)
+        logger.info(
+            f"Ingested {self.stats['papers']} papers ({self.stats['chunks']} chunks, "
+            f"{self.stats['duplicates']} duplicate and {self.stats['near_duplicates']} near-duplicate chunks, "
+            f"{self.stats['unchanged']} unchanged papers) "
+            f"in {seconds:.1f}s, {self.stats['checkpoints']} checkpoints"
+        )
+        return self.stats
+
+    @staticmethod
+    async def _stage(fn: Callable[[PaperBatch], Awaitable[Optional[PaperBatch]]],
+                     inbox: asyncio.Queue, outbox: asyncio.Queue, workers: int) -> None:
+        """Run ``workers`` copies of ``fn`` from ``inbox`` to ``outbox``; ``None`` results are dropped."""
+        async def worker() -> None:
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    # Let sibling workers see the end of input too.
+                    await inbox.put(_DONE)
+                    return
+                result = await fn(item)
+                if result is not None:
+                    await outbox.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        await outbox.put(_DONE)
+
+    async def _load(self, documents: AsyncIterable[Document], outbox: asyncio.Queue) -> None:
+        """Group consecutive pages into papers and skip papers unchanged since the last ingest."""
+        current: Optional[PaperBatch] = None
+
+        async def emit(paper: PaperBatch) -> None:
+            if paper.paper_id in self.seen:
+                # Another copy of a paper already queued in this run (e.g. a mirror).
+                return
+            self.seen.add(paper.paper_id)
+            paper.digest = content_digest("\n\n".join(page.page_content for page in paper.pages))
+            if self.manifest.is_current(paper.paper_id, paper.digest):
+                self.stats["unchanged"] += 1
+                return
+            for page in paper.pages:
+                page.metadata["paper_digest"] = paper.digest
+            paper.stale = self.manifest.chunk_ids(paper.paper_id)
+            await outbox.put(paper)
+
+        async for doc in documents:
+            pid = doc.metadata.setdefault("paper_id", paper_id(doc.metadata, doc.page_content))
+            if current is not None and current.paper_id == pid:
+                current.pages.append(doc)
+                continue
+            if current is not None:
+                await emit(current)
+            current = PaperBatch(pid, [doc])
+        if current is not None:
+            await emit(current)
+        await outbox.put(_DONE)
+
+    async def _chunk(self, paper: PaperBatch) -> PaperBatch:
+        paper.chunks, paper.ids = await asyncio.to_thread(self.vsm.prepare, paper.pages)
+        paper.chunk_ids = list(paper.ids)
+        return paper
+
+    async def _dedupe(self, paper: PaperBatch) -> PaperBatch:
+        """Drop chunks whose deterministic id is already indexed, then near-duplicates.
+
+        Near-duplicates are also matched against chunks of papers still on
+        their way to a checkpoint; nothing is recorded until it succeeds.
+        """
+        keep = [i for i, cid in enumerate(paper.ids) if cid not in self._indexed]
+        self.stats["duplicates"] += len(paper.ids) - len(keep)
+        chunks = [paper.chunks[i] for i in keep]
+        ids = [paper.ids[i] for i in keep]
+        paper.chunks, paper.ids, paper.dedupe_plan = await asyncio.to_thread(
+            self.vsm.drop_near_duplicates, chunks, ids, list(self._planned)
+        )
+        if paper.dedupe_plan is not None:
+            self._planned.append(paper.dedupe_plan)
+        self.stats["near_duplicates"] += len(ids) - len(paper.ids)
+        return paper
+
+    async def _embed(self, paper: PaperBatch) -> PaperBatch:
+        if paper.chunks:
+            paper.vectors = await asyncio.to_thread(self.vsm.embed, paper.chunks)
+        return paper
+
+    async def _write(self, inbox: asyncio.Queue) -> None:
+        """Single writer: add vectors and stage graph documents, checkpointing periodically."""
+        pending: List[PaperBatch] = []
+        pending_chunks = 0
+        # Trained index types need a representative sample before the first build.
+        min_first_build = settings.vector_train_sample if (
+            self.vsm.store is None and settings.vector_index_type in _TRAINED_INDEX_TYPES
+        ) else 0
+        while True:
+            paper = await inbox.get()
+            if paper is _DONE:
+                break
+            pending.append(paper)
+            pending_chunks += len(paper.ids)
+            if pending_chunks >= max(self.checkpoint_chunks, min_first_build):
+                await asyncio.to_thread(self._checkpoint, pending)
+                pending, pending_chunks, min_first_build = [], 0, 0
+        if pending:
+            await asyncio.to_thread(self._checkpoint, pending)
+
+    def _checkpoint(self, papers: List[PaperBatch]) -> None:
+        """Write a batch of papers to the index and graph, then record them as ingested."""
+        ids = [cid for p in papers for cid in p.ids]
+        replace = [cid for p in papers for cid in p.stale]
+        if ids or (replace and self.vsm.store is not None):
+            chunks = [c for p in papers for c in p.chunks]
+            vectors = np.concatenate([p.vectors for p in papers if p.ids]) if ids else None
+            self.vsm.add_embedded(chunks, ids, vectors, replace=replace)
+        paper_docs = [
+            PDFDocument(_content="\n\n".join(page.page_content for page in p.pages), _metadata=p.pages[0].metadata)
+            for p in papers
+        ]
+        self.gm.ingest(self.gm.transform(paper_docs, allowed_nodes=[], allowed_relationships=[]))
+        self.gm.commit()
+        if self.vsm.store is not None:
+            self.vsm.commit()
+        # Only now are the chunks stored, so only now may later copies be matched against them.
+        self._indexed.update(ids)
+        plans = [p.dedupe_plan for p in papers if p.dedupe_plan is not None]
+        self.vsm.record_near_duplicates(plans, ids)
+        for plan in plans:
+            # In place and by identity: the dedupe stage keeps appending meanwhile.
+            del self._planned[next(i for i, queued in enumerate(self._planned) if queued is plan)]
+        for p in papers:
+            self.manifest.record(p.paper_id, p.digest, p.chunk_ids)
+        # After recording, so a paper of this batch that was just orphaned is still retried.
+        for pid in self.vsm.take_orphaned_papers():
+            self.manifest.forget(pid)
+        self.manifest.save()
+        self.stats["papers"] += len(papers)
+        self.stats["chunks"] += sum(len(p.ids) for p in papers)
+        self.stats["checkpoints"] += 1
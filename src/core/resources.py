@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from langchain_openai import ChatOpenAI
+from storage.vector_store_manager import VectorStoreManager
+from storage.graph_manager import create_graph_store
+from storage.centrality import CentralityTable
+from storage.citation_graph import CitationGraph
+from retrieval.retriever import KnowledgeRetriever
+from generation.generator import LongAnswerGenerator
+from common.config import settings
+from common.interfaces import GraphStore
+from common.logger import logger
+
+__all__ = ["ResourceRegistry"]
+
+@dataclass
+class ResourceRegistry:
+    """App-scoped resources shared by every request.
+
+    Built once in the server lifespan so the FAISS index, the Neo4j driver
+    and the LLM clients are loaded a single time per process instead of
+    once per ``/generate`` call.
+    """
+    vsm: VectorStoreManager
+    gm: GraphStore
+    retriever: KnowledgeRetriever
+    outline_llm: ChatOpenAI
+    generator: LongAnswerGenerator
+
+    @classmethod
+    def create(cls) -> "ResourceRegistry":
+        """Load the vector store and open all clients."""
+        vsm = VectorStoreManager()
+        try:
+            vsm.load()
+        except FileNotFoundError:
+            logger.info("No vector store on disk; it will be built on first ingest")
+        gm = create_graph_store()
+        centrality = None
+        try:
+            centrality = CentralityTable.load(settings.centrality_path)
+        except FileNotFoundError:
+            logger.info("No centrality scores on disk; ranking without citation boosts")
+        citation_graph = None
+        try:
+            citation_graph = CitationGraph.load(settings.citation_graph_path)
+        except FileNotFoundError:
+            logger.info("No citation graph on disk; graph retrieval uses neighborhood expansion")
+        return cls(
+            vsm=vsm,
+            gm=gm,
+            retriever=KnowledgeRetriever(vsm, gm, centrality=centrality, citation_graph=citation_graph),
+            outline_llm=ChatOpenAI(model_name=settings.llm_model, temperature=0.3, api_key=settings.openai_api_key),
+            generator=LongAnswerGenerator(),
+        )
+
+    @property
+    def vector_store_ready(self) -> bool:
+        return self.vsm.store is not None
+
+    def close(self) -> None:
+        """Release network clients held by the registry."""
+        self.gm.close()
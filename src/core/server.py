@@ -1,7 +1,9 @@
+import asyncio
 from fastapi import FastAPI, HTTPException
 from contextlib import asynccontextmanager
 from pydantic import BaseModel
 from ..graph.graph_builder import build_rag_graph
+from .resources import ResourceRegistry
 from ..common.logger import logger
 from ..common.config import settings
 import uvicorn
@@ -13,11 +15,13 @@ class RAGRequest(BaseModel):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize graph once at startup
+    # Initialize graph and shared resources once at startup
     app.state.rag_graph = build_rag_graph()
+    app.state.resources = await asyncio.to_thread(ResourceRegistry.create)
     logger.info("RAG graph initialized")
     yield
     # Cleanup resources
+    app.state.resources.close()
     logger.info("Shutting down RAG system")
 
 app = FastAPI(
@@ -32,7 +36,8 @@ async def process_query(request: RAGRequest):
         state = {
             "query": request.query,
             "max_sections": request.max_sections,
-            "max_docs": request.max_docs
+            "max_docs": request.max_docs,
+            "resources": app.state.resources
         }
         
         # Execute the LangGraph pipeline
@@ -55,6 +60,17 @@ async def process_query(request: RAGRequest):
         logger.error(f"Pipeline failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics")
+async def metrics():
+    resources = app.state.resources
+    cache = resources.retriever.cache
+    embedding_cache = resources.vsm.embedding_cache
+    return {
+        "query_cache": cache.stats() if cache is not None else None,
+        "embedding_cache": embedding_cache.stats() if embedding_cache is not None else None,
+        "index_version": resources.vsm.version,
+    }
+
 if __name__ == "__main__":
     uvicorn.run(
         app="server:app",
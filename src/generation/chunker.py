@@ -1,11 +1,11 @@
 from typing import List
-from langchainCore.documents import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from rag_common.chunker import OffsetChunker
 from common.config import settings
 
-__all__ = ["chunk_text"]
+__all__ = ["OffsetChunker", "chunker_from_settings", "chunk_text"]
+
+def chunker_from_settings() -> OffsetChunker:
+    return OffsetChunker(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
 
 def chunk_text(text: str) -> List[str]:
-    splitter = RecursiveCharacterTextSplitter(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
-    docs = splitter.create_documents([text])
-    return [d.page_content for d in docs]
\ No newline at end of file
+    return chunker_from_settings().split_text(text)
@@ -1,45 +1,99 @@
 # nodes.py
 import asyncio
 from pathlib import Path
-from typing import Dict, Any
-from loaders.pdf_loader import process_pdf_directory
+from typing import Dict, Any, Set
+from langchain_core.documents import Document
+from loaders.pdf_loader import iter_pdf_directory
+from loaders.pdf_parser import PDFParseEngine
+from loaders.parse_cache import ParseCache
 from loaders.arxiv_loader import load_arxiv_documents
-from storage.vector_store_manager import VectorStoreManager
-from storage.graph_manager import GraphManager
-from retrieval.retriever import KnowledgeRetriever
-from generation.generator import LongAnswerGenerator
-from common.logger import logger
 from common.config import settings
+from common.ids import paper_id
+from common.logger import logger
+from storage.ingest_manifest import IngestManifest
+from core.ingest_pipeline import IngestPipeline
+from storage.centrality import CentralityTable
+from storage.citation_graph import CitationGraph
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 
+# Managers, LLM clients and the generator live in the app-scoped
+# ResourceRegistry (core/resources.py) passed in as state["resources"];
+# nodes only borrow them.
 async def initialize_managers(state: Dict[str, Any]) -> Dict[str, Any]:
-    state["vsm"] = VectorStoreManager()
-    state["gm"] = GraphManager()
+    resources = state["resources"]
+    state["vsm"] = resources.vsm
+    state["gm"] = resources.gm
     return state
 
 async def check_vector_store(state: Dict[str, Any]) -> Dict[str, Any]:
-    try:
-        state["vsm"].load()
-        state["vector_store_exists"] = True
-    except FileNotFoundError:
-        state["vector_store_exists"] = False
+    # The index is loaded once at startup; never re-read it per request.
+    state["vector_store_exists"] = state["resources"].vector_store_ready
     return state
 
 def decide_ingestion_path(state: Dict[str, Any]) -> str:
     return "ingest_corpus" if not state.get("vector_store_exists") else "retrieve_documents"
 
+def _retire_deleted_files(parse_cache: ParseCache, pdf_dir: Path, present: Set[str],
+                          manifest: IngestManifest, vsm) -> None:
+    """Drop the chunks of papers whose PDF was deleted since the last run.
+
+    Papers still present from another file (e.g. a mirror copy) are kept.
+    Graph nodes stay, since other papers may still cite them.
+    """
+    deleted = parse_cache.deleted(pdf_dir)
+    if not deleted:
+        return
+    gone = {paper_id(doc.metadata, doc.page_content) for _, documents in deleted for doc in documents} - present
+    stale = [cid for pid in gone for cid in manifest.chunk_ids(pid)]
+    if stale:
+        vsm.remove(stale)
+    for pid in gone | vsm.take_orphaned_papers():
+        manifest.forget(pid)
+    manifest.save()
+    parse_cache.forget([path for path, _ in deleted])
+    logger.info(f"Retired {len(gone)} papers ({len(stale)} chunks) whose PDFs were deleted")
+
+def _refresh_citation_models(gm, retriever) -> None:
+    """Re-score centrality over the full graph (PageRank warm-started) and rebuild the PPR graph from one export."""
+    ids, titles, src, dst = gm.citation_edges()
+    previous = retriever.centrality
+    centrality = previous.update(ids, src, dst) if previous is not None else CentralityTable.compute(ids, src, dst)
+    citation_graph = CitationGraph.from_edges(ids, titles, src, dst)
+    centrality.save(settings.centrality_path)
+    citation_graph.save(settings.citation_graph_path)
+    retriever.centrality = centrality
+    retriever.citation_graph = citation_graph
+
 # nodes/retrieval_nodes.py
 async def ingest_corpus(state: Dict[str, Any]) -> Dict[str, Any]:
-    pdf_docs = await process_pdf_directory(Path("./data/pdfs"))
-    arxiv_docs = await load_arxiv_documents(state["query"], max_docs=5)
-    docs = pdf_docs + arxiv_docs
-    # ... rest of ingestion logic ...
+    resources = state["resources"]
+    pdf_dir = Path("./data/pdfs")
+    manifest = IngestManifest(settings.ingest_manifest_path)
+    # Unchanged PDFs are served from the parse cache instead of being re-parsed.
+    parse_cache = ParseCache.from_settings()
+    arxiv = asyncio.create_task(load_arxiv_documents(state["query"], max_docs=5))
+
+    async def corpus():
+        with PDFParseEngine(cache=parse_cache) as engine:
+            async for doc in iter_pdf_directory(pdf_dir, engine, skip_errors=True):
+                yield doc
+        for d in await arxiv:
+            yield Document(page_content=d.content, metadata=dict(d.metadata))
+
+    # Parsing, chunking, embedding and index/graph writes overlap in a
+    # bounded streaming pipeline; unchanged papers are skipped via the manifest.
+    pipeline = IngestPipeline(resources.vsm, resources.gm, manifest)
+    stats = await pipeline.run(corpus())
+    if parse_cache is not None:
+        await asyncio.to_thread(_retire_deleted_files, parse_cache, pdf_dir, pipeline.seen, manifest, resources.vsm)
+    if stats["papers"]:
+        await asyncio.to_thread(_refresh_citation_models, resources.gm, resources.retriever)
+    state["vector_store_exists"] = resources.vector_store_ready
     return state
 
 async def retrieve_documents(state: Dict[str, Any]) -> Dict[str, Any]:
-    retriever = KnowledgeRetriever(state["vsm"], state["gm"])
+    retriever = state["resources"].retriever
     hybrid = retriever.hybrid(state["query"], k=8)
     state["docs"] = hybrid["vector"]
     return state
@@ -60,7 +114,7 @@ async def generate_outline(state: Dict[str, Any]) -> Dict[str, Any]:
     
     prompt = PromptTemplate.from_template(prompt_template)
     chain = LLMChain(
-        llm=ChatOpenAI(model_name=settings.llm_model, temperature=0.3),
+        llm=state["resources"].outline_llm,
         prompt=prompt
     )
     outline = await chain.arun(
@@ -71,7 +125,7 @@ async def generate_outline(state: Dict[str, Any]) -> Dict[str, Any]:
     return state
 
 async def generate_answer(state: Dict[str, Any]) -> Dict[str, Any]:
-    generator = LongAnswerGenerator()
+    generator = state["resources"].generator
     answer = await generator.agenerate(
         state["query"],
         state["sections"],
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from common.config import settings
+from common.logger import logger
+
+__all__ = ["ParseCache", "file_digest"]
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of the file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Metadata naming the parsed file; rewritten when cached text is served for another path.
+_PATH_KEYS = ("source", "file_path")
+
+def _encode(documents: List[Document]) -> bytes:
+    pages = [{"text": doc.page_content, "metadata": doc.metadata} for doc in documents]
+    return zlib.compress(json.dumps(pages, default=str).encode("utf-8"), 6)
+
+def _decode(blob: bytes, path: Optional[Path] = None) -> List[Document]:
+    """Decoded documents; with ``path``, their path metadata is pointed at that file."""
+    documents = [Document(page_content=page["text"], metadata=page["metadata"]) for page in json.loads(zlib.decompress(blob))]
+    if path is not None:
+        for doc in documents:
+            for key in _PATH_KEYS:
+                if key in doc.metadata:
+                    doc.metadata[key] = str(path)
+    return documents
+
+class ParseCache:
+    """Persistent cache of extracted PDF text, keyed by file fingerprint.
+
+    An entry is keyed by (path, size, mtime, content hash, parser version).
+    A file whose size and mtime are unchanged is a hit without being read;
+    if they changed, its content hash is compared instead, so a touched but
+    identical file is still a hit and so is a copy of a cached file under a
+    new path (its documents then name the new path). Each parser version has
+    its own entry per file, so e.g. page-mode and single-mode parses of the
+    same file coexist. Page text and metadata are stored as zlib-compressed
+    JSON in SQLite.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Digests computed by a miss in get(), reused by the put() that follows it.
+        self._pending: Dict[str, Tuple[int, int, str]] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Tables from before entries were keyed per parser are dropped; their text is re-parsed on demand.
+        primary_key = {name for _, name, _, _, _, pk in self._conn.execute("PRAGMA table_info(parsed)") if pk}
+        if primary_key and primary_key != {"path", "parser"}:
+            self._conn.execute("DROP TABLE parsed")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parsed (
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                parser TEXT NOT NULL,
+                pages BLOB NOT NULL,
+                parsed_at REAL NOT NULL,
+                PRIMARY KEY (path, parser)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_parsed_digest ON parsed(digest, parser)")
+        self._conn.commit()
+
+    @classmethod
+    def from_settings(cls) -> Optional["ParseCache"]:
+        return cls(settings.parse_cache_path) if settings.parse_cache_enabled else None
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def get(self, path: Path, parser: str) -> Optional[List[Document]]:
+        """Cached documents for ``path`` as parsed by ``parser``, or None."""
+        key = self._key(path)
+        try:
+            stat = Path(path).stat()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest, pages FROM parsed WHERE path = ? AND parser = ?", (key, parser)
+            ).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            self.hits += 1
+            return _decode(row[3])
+
+        digest = file_digest(path)
+        with self._lock:
+            origin = key
+            if row is not None and row[2] == digest:
+                found = row[3]
+            else:
+                match = self._conn.execute(
+                    "SELECT path, pages FROM parsed WHERE digest = ? AND parser = ? LIMIT 1", (digest, parser)
+                ).fetchone()
+                origin, found = match if match else (key, None)
+            if found is None:
+                self._pending[key] = (stat.st_size, stat.st_mtime_ns, digest)
+                self.misses += 1
+                return None
+            # Same bytes under a new mtime or path: refresh the fingerprint.
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, stat.st_size, stat.st_mtime_ns, digest, parser, found, time.time()),
+            )
+            self._conn.commit()
+            self.hits += 1
+        # A copy under another path must not report the original file as its source.
+        return _decode(found, path if origin != key else None)
+
+    def put(self, path: Path, parser: str, documents: List[Document]) -> None:
+        key = self._key(path)
+        try:
+            stat = Path(path).stat()
+        except FileNotFoundError:
+            return
+        pending = self._pending.pop(key, None)
+        if pending is not None and pending[:2] == (stat.st_size, stat.st_mtime_ns):
+            digest = pending[2]
+        else:
+            digest = file_digest(path)
+        blob = _encode(documents)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, stat.st_size, stat.st_mtime_ns, digest, parser, blob, time.time()),
+            )
+            self._conn.commit()
+
+    def discard(self, path: Path) -> None:
+        """Drop the state a missed ``get`` kept for ``path`` when no ``put`` will follow (e.g. the parse failed)."""
+        self._pending.pop(self._key(path), None)
+
+    def deleted(self, directory: Path, pattern: str = "*.pdf") -> List[Tuple[Path, List[Document]]]:
+        """Cached files under ``directory`` matching ``pattern`` that no longer exist.
+
+        Their last parsed documents are returned so callers can derive the
+        paper ids whose chunks should be retired.
+        """
+        root = self._key(directory)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, MAX(pages) FROM parsed WHERE path LIKE ? ESCAPE '\\' GROUP BY path",
+                (root.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "/%",),
+            ).fetchall()
+        gone = []
+        for key, blob in rows:
+            path = Path(key)
+            if path.parent == Path(root) and path.match(pattern) and not path.exists():
+                gone.append((path, _decode(blob)))
+        if gone:
+            logger.info(f"{len(gone)} cached files under {directory} were deleted")
+        return gone
+
+    def forget(self, paths: List[Path]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM parsed WHERE path = ?", [(self._key(p),) for p in paths])
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(pages)), 0) FROM parsed").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,14 +1,14 @@
 import asyncio
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from langchain_core.documents import Document
-from langchain_community.document_loaders.parsers import PyMuPDFParser
 from common.logger import logger
-from langchain.document_loaders import PDFLoader
+from loaders.pdf_parser import PDFParseEngine, ParseReport, parse_pdf_file
 from common.interfaces import DocumentLoader
 from common.models import PDFDocument
 
-__all__ = ["process_pdf_directory"]
+__all__ = ["process_pdf_directory", "iter_pdf_directory", "PDFDocumentLoader"]
 
 async def parse_pdf(
     file_path: Path,
@@ -18,63 +18,104 @@ async def parse_pdf(
 ) -> List[Document]:
     """Parse a single PDF into a list of Documents (async)."""
     logger.info(f"Parsing PDF: {file_path}")
+    return await asyncio.to_thread(parse_pdf_file, str(file_path), password, mode, pages_delimiter)
 
-    def _blocking_parse():
-        blob = Document.Blob.from_path(file_path)
-        parser = PyMuPDFParser(password=password, mode=mode, pages_delimiter=pages_delimiter)
-        return list(parser.lazy_parse(blob))
+async def iter_pdf_directory(directory: Path, engine: Optional[PDFParseEngine] = None,
+                             skip_errors: bool = False) -> AsyncIterator[Document]:
+    """Yield each PDF's documents as soon as that file is parsed.
 
-    return await asyncio.to_thread(_blocking_parse)
+    Files go through a ``PDFParseEngine`` (a process pool by default) with a
+    bounded number in flight, so only a window of parsed files is held in
+    memory at a time. Raises on the first file that fails to parse unless
+    ``skip_errors`` is set, in which case failures are logged and skipped.
+    """
+    pdf_files = sorted(directory.glob("*.pdf"))
+    owned = engine is None
+    engine = engine or PDFParseEngine()
+    report = ParseReport()
+    start = time.perf_counter()
+    try:
+        async for result in engine.parse(pdf_files):
+            report.record(result)
+            if not result.ok:
+                if skip_errors:
+                    continue
+                raise Exception(f"Error parsing PDF {result.path}: {result.error}")
+            for doc in result.documents:
+                yield doc
+    finally:
+        if owned:
+            engine.close()
+    report.seconds = time.perf_counter() - start
+    logger.info(
+        f"Parsed {len(report.parsed)} PDFs / {report.pages} pages in {report.seconds:.1f}s "
+        f"({report.pages_per_sec:.1f} pages/s, {report.cached} from cache, {len(report.failed)} failed)"
+    )
 
-async def process_pdf_directory(directory: Path) -> List[Document]:
-    pdf_files = list(directory.glob("*.pdf"))
-    tasks = [parse_pdf(fp) for fp in pdf_files]
-    results = await asyncio.gather(*tasks)
-    return [d for sub in results for d in sub]
+async def process_pdf_directory(directory: Path, engine: Optional[PDFParseEngine] = None) -> List[Document]:
+    return [doc async for doc in iter_pdf_directory(directory, engine)]
 
 class PDFDocumentLoader(DocumentLoader):
-    """Concrete implementation of DocumentLoader for PDF files."""
-    
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    """Concrete implementation of DocumentLoader for PDF files.
+
+    Parsing goes through the same ``PDFParseEngine`` as the ingest path, so
+    directory loads run off the event loop with bounded concurrency. Files
+    that fail are collected in the returned report (``report`` holds the most
+recent one) rather than failing the load.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, engine: Optional[PDFParseEngine] = None):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-    
+        self.engine = engine
+        self.report: Optional[ParseReport] = None
+
     async def load(self, source: Path) -> List[PDFDocument]:
         """Load documents from a PDF file or directory."""
+        documents, _ = await self.load_with_report(source)
+        return documents
+
+    async def load_with_report(self, source: Path) -> Tuple[List[PDFDocument], ParseReport]:
+        """Like ``load`` but also return the per-file report of this call."""
         if source.is_file():
             return await self._load_single_pdf(source)
         elif source.is_dir():
             return await self._load_pdf_directory(source)
         else:
             raise ValueError(f"Invalid source path: {source}")
-    
-    async def _load_single_pdf(self, pdf_path: Path) -> List[PDFDocument]:
+
+    async def _load_single_pdf(self, pdf_path: Path) -> Tuple[List[PDFDocument], ParseReport]:
         """Load a single PDF file."""
+        documents, report = await self._load_paths([pdf_path])
+        if not report.ok:
+            raise Exception(f"Error loading PDF {pdf_path}: {report.failed[pdf_path]}")
+        return documents, report
+
+    async def _load_pdf_directory(self, directory: Path) -> Tuple[List[PDFDocument], ParseReport]:
+        """Load all PDF files from a directory, skipping (and reporting) files that fail."""
+        documents, report = await self._load_paths(sorted(directory.glob("*.pdf")))
+        if not report.ok:
+            logger.warning(f"Skipped {len(report.failed)} of {len(report.failed) + len(report.parsed)} PDFs in {directory}")
+        return documents, report
+
+    async def _load_paths(self, paths: Sequence[Path]) -> Tuple[List[PDFDocument], ParseReport]:
+        engine = self.engine or PDFParseEngine(mode="page")
+        report = ParseReport()
+        documents = []
+        start = time.perf_counter()
         try:
-            loader = PDFLoader(str(pdf_path))
-            raw_docs = loader.load()
-            
-            return [
-                PDFDocument(
-                    _content=doc.page_content,
-                    _metadata={**doc.metadata, 'source': str(pdf_path)}
+            async for result in engine.parse(paths):
+                report.record(result)
+                documents.extend(
+                    PDFDocument(
+                        _content=doc.page_content,
+                        _metadata={**doc.metadata, 'source': str(result.path)}
+                    )
+                    for doc in result.documents
                 )
-                for doc in raw_docs
-            ]
-        except Exception as e:
-            raise Exception(f"Error loading PDF {pdf_path}: {str(e)}")
-    
-    async def _load_pdf_directory(self, directory: Path) -> List[PDFDocument]:
-        """Load all PDF files from a directory."""
-        pdf_files = list(directory.glob("*.pdf"))
-        all_docs = []
-        
-        for pdf_file in pdf_files:
-            try:
-                docs = await self._load_single_pdf(pdf_file)
-                all_docs.extend(docs)
-            except Exception as e:
-                print(f"Warning: Skipping {pdf_file} due to error: {str(e)}")
-                continue
-        
-        return all_docs
\ No newline at end of file
+        finally:
+            if self.engine is None:
+                await asyncio.to_thread(engine.close)
+        report.seconds = time.perf_counter() - start
+        self.report = report
+        return documents, report
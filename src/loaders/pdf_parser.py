@@ -0,0 +1,237 @@
+import asyncio
+import importlib.metadata
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from langchain_core.documents import Document
+from langchain_core.documents.base import Blob
+from common.config import settings
+from loaders.parse_cache import ParseCache
+from common.logger import logger
+
+__all__ = ["PDFParseEngine", "ParsedPDF", "ParseReport", "parse_pdf_file", "PARSER_VERSION"]
+
+# Bump when parse_pdf_file's output changes; invalidates cached parses.
+PARSER_VERSION = 1
+
+def parse_pdf_file(
+    file_path: str,
+    password: Optional[str] = None,
+    mode: str = "single",
+    pages_delimiter: str = "\n\n",
+) -> List[Document]:
+    """Parse one PDF with PyMuPDF. Module-level so worker processes can unpickle it."""
+    from langchain_community.document_loaders.parsers import PyMuPDFParser
+
+    parser = PyMuPDFParser(password=password, mode=mode, pages_delimiter=pages_delimiter)
+    return list(parser.lazy_parse(Blob.from_path(file_path)))
+
+def _parser_version(parse: Callable[..., List[Document]], kwargs: Dict[str, Any]) -> str:
+    """Identifies the extractor and its options, so cached text is only reused for identical parses."""
+    if parse is parse_pdf_file:
+        try:
+            library = importlib.metadata.version("pymupdf")
+        except importlib.metadata.PackageNotFoundError:
+            library = "unknown"
+        name = f"pymupdf-{library}/v{PARSER_VERSION}"
+    else:
+        name = f"{parse.__module__}.{getattr(parse, '__qualname__', type(parse).__qualname__)}"
+    options = ",".join(f"{key}={value!r}" for key, value in sorted(kwargs.items()))
+    return f"{name}({options})"
+
+@dataclass
+class ParsedPDF:
+    """Outcome of parsing one file: its documents, or the error that stopped it."""
+    path: Path
+    documents: List[Document] = field(default_factory=list)
+    error: Optional[str] = None
+    seconds: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def pages(self) -> int:
+        if not self.documents:
+            return 0
+        # "single" mode returns one document per file carrying the page count.
+        return self.documents[0].metadata.get("total_pages") or len(self.documents)
+
+@dataclass
+class ParseReport:
+    """Summary of a parse run: which files parsed, which failed and why."""
+    parsed: List[Path] = field(default_factory=list)
+    failed: Dict[Path, str] = field(default_factory=dict)
+    cached: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+
+    def record(self, result: ParsedPDF) -> None:
+        if result.ok:
+            self.parsed.append(result.path)
+            self.cached += result.cached
+            self.pages += result.pages
+        else:
+            self.failed[result.path] = result.error
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / max(self.seconds, 1e-9)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "parsed": len(self.parsed),
+            "cached": self.cached,
+            "failed": [{"path": str(path), "error": error} for path, error in self.failed.items()],
+            "pages": self.pages,
+            "seconds": self.seconds,
+            "pages_per_sec": self.pages_per_sec,
+        }
+
+def _parse_job(parse: Callable[..., List[Document]], path: Path, kwargs: Dict[str, Any]) -> ParsedPDF:
+    start = time.perf_counter()
+    try:
+        documents = parse(str(path), **kwargs)
+    except Exception as e:
+        return ParsedPDF(path, error=f"{type(e).__name__}: {str(e)}", seconds=time.perf_counter() - start)
+    return ParsedPDF(path, documents, seconds=time.perf_counter() - start)
+
+class PDFParseEngine:
+    """Parses PDFs off the event loop with a bounded number of files in flight.
+
+    Text extraction is CPU-bound and holds the GIL, so by default files are
+    parsed in a process pool. At most ``max_in_flight`` files are queued or
+    being parsed at any time and results are yielded as each file finishes,
+    so memory is bounded by the window rather than by the corpus. A file that
+    fails (or crashes its worker) is reported in its ``ParsedPDF`` instead of
+    aborting the run. With a ``ParseCache``, unchanged files are served from
+    the cache and never reach the pool.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        parse: Callable[..., List[Document]] = parse_pdf_file,
+        cache: Optional[ParseCache] = None,
+        **parse_kwargs: Any,
+    ):
+        self.executor = executor or settings.pdf_parse_executor
+        if self.executor not in ("process", "thread"):
+            raise ValueError(f"Unknown PDF parse executor: {self.executor!r} (expected 'process' or 'thread')")
+        self.workers = workers or settings.pdf_parse_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or settings.pdf_parse_max_in_flight or 2 * self.workers
+        self.parse_fn = parse
+        self.parse_kwargs = parse_kwargs
+        self.cache = cache
+        self.parser_version = _parser_version(parse, parse_kwargs)
+        self._pool: Optional[Executor] = None
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            if self.executor == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(settings.pdf_parse_start_method),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf-parse")
+        return self._pool
+
+    async def parse(self, paths: Iterable[Path]) -> AsyncIterator[ParsedPDF]:
+        """Yield a ``ParsedPDF`` per path, in completion order."""
+        loop = asyncio.get_running_loop()
+        queue = iter(paths)
+        pending: Dict[asyncio.Future, Tuple[Path, Executor]] = {}
+        retried = set()
+        exhausted = False
+
+        def submit(path: Path) -> None:
+            pool = self._executor()
+            future = loop.run_in_executor(pool, _parse_job, self.parse_fn, Path(path), self.parse_kwargs)
+            pending[future] = (Path(path), pool)
+
+        async def fill() -> List[ParsedPDF]:
+            """Top up the in-flight window; cache hits are returned instead of submitted."""
+            nonlocal exhausted
+            hits = []
+            while not exhausted and len(pending) + len(hits) < self.max_in_flight:
+                path = next(queue, None)
+                if path is None:
+                    exhausted = True
+                    break
+                if self.cache is not None:
+                    documents = await asyncio.to_thread(self.cache.get, path, self.parser_version)
+                    if documents is not None:
+                        hits.append(ParsedPDF(Path(path), documents, cached=True))
+                        continue
+                submit(path)
+            return hits
+
+        try:
+            while True:
+                results = await fill()
+                if pending and not results:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        path, pool = pending.pop(future)
+                        try:
+                            results.append(future.result())
+                        except BrokenProcessPool:
+                            # A worker died (e.g. a native crash on a malformed file) and took
+                            # the pool with it. Retry each affected file once on a fresh pool.
+                            if self._pool is pool:
+                                pool.shutdown(wait=False, cancel_futures=True)
+                                self._pool = None
+                            if path in retried:
+                                results.append(ParsedPDF(path, error="BrokenProcessPool: parser worker crashed"))
+                            else:
+                                retried.add(path)
+                                submit(path)
+                    if self.cache is not None:
+                        await asyncio.to_thread(self._store, results)
+                    # Refill before handing results out so workers stay busy while the caller consumes.
+                    results.extend(await fill())
+                if not results:
+                    if not pending:
+                        break
+                    continue
+                for result in results:
+                    if not result.ok:
+                        logger.warning(f"Failed to parse {result.path}: {result.error}")
+                    yield result
+        finally:
+            for future, (path, _) in pending.items():
+                future.cancel()
+                if self.cache is not None:
+                    self.cache.discard(path)
+
+    def _store(self, results: List[ParsedPDF]) -> None:
+        for result in results:
+            if result.ok:
+                self.cache.put(result.path, self.parser_version, result.documents)
+            else:
+                self.cache.discard(result.path)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "PDFParseEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,25 +1,31 @@
 import asyncio
-from loaders.pdf_loader import process_pdf_directory
+from pathlib import Path
+from langchain_core.documents import Document
+from loaders.pdf_loader import iter_pdf_directory
 from loaders.arxiv_loader import load_arxiv_documents
 from storage.vector_store_manager import VectorStoreManager
-from storage.graph_manager import GraphManager
+from storage.graph_manager import create_graph_store
+from storage.ingest_manifest import IngestManifest
+from core.ingest_pipeline import IngestPipeline
 from retrieval.retriever import KnowledgeRetriever
 from generation.generator import LongAnswerGenerator
+from common.interfaces import GraphStore
+from common.config import settings
 from common.logger import logger
 
-async def ingest_corpus(vsm: VectorStoreManager, gm: GraphManager):
-    # Example ingest: PDFs + arXiv
-    pdf_docs = await process_pdf_directory(Path("./data/pdfs"))
-    arxiv_docs = await load_arxiv_documents("retrieval augmented generation", max_docs=5)
-    docs = pdf_docs + arxiv_docs
+async def ingest_corpus(vsm: VectorStoreManager, gm: GraphStore):
+    # Example ingest: PDFs + arXiv, streamed through the staged pipeline
+    async def corpus():
+        async for doc in iter_pdf_directory(Path("./data/pdfs"), skip_errors=True):
+            yield doc
+        for d in await load_arxiv_documents("retrieval augmented generation", max_docs=5):
+            yield Document(page_content=d.content, metadata=dict(d.metadata))
 
-    vsm.build(docs)
-    graph_docs = gm.transform(docs, allowed_nodes=["Paper"], allowed_relationships=[("Paper", "CITES", "Paper")])
-    gm.ingest(graph_docs)
+    await IngestPipeline(vsm, gm, IngestManifest(settings.ingest_manifest_path)).run(corpus())
 
 async def run_pipeline():
     vsm = VectorStoreManager()
-    gm = GraphManager()
+    gm = create_graph_store()
 
     # Ingest if no vector store present
     try:
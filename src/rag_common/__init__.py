@@ -0,0 +1,6 @@
+"""Retrieval building blocks shared by the pipeline and the MCP backend.
+
+Nothing here reads application settings or configures logging; both apps
+construct these classes from their own configuration. Installable on its
+own (``pip install src/rag_common``), which is how the MCP image gets it.
+"""
@@ -0,0 +1,119 @@
+import logging
+from collections import deque
+from typing import Iterable, List, Optional, Sequence, Tuple
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["OffsetChunker"]
+
+Span = Tuple[int, int]
+
+class OffsetChunker:
+    """Single-pass replacement for ``RecursiveCharacterTextSplitter``.
+
+    Produces the same chunks as LangChain's splitter with its defaults
+    (``length_function=len``, separators kept at the start of the piece they
+    precede, chunks stripped of surrounding whitespace), but works on
+    ``(start, end)`` offsets into the source text. Pieces are found with
+    ``str.find`` and merged by length arithmetic, so no intermediate strings
+    are built; ``spans`` returns offsets only and ``split_text`` slices each
+    chunk once. ``split_documents`` gives each chunk a shallow copy of its
+    document's metadata: per-chunk fields (e.g. chunk ids) stay separate,
+    nested values are shared rather than deep-copied.
+    """
+
+    def __init__(self, chunk_size: int = 4000, chunk_overlap: int = 200, separators: Optional[Sequence[str]] = None):
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), should be smaller.")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators or ["\n\n", "\n", " ", ""])
+
+    def spans(self, text: str) -> List[Span]:
+        """Offsets of every chunk of ``text``, in order."""
+        out: List[Span] = []
+        self._split(text, 0, len(text), self.separators, out)
+        return out
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.spans(text)]
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        chunks = []
+        for doc in documents:
+            text, metadata = doc.page_content, doc.metadata
+            chunks.extend(Document(page_content=text[start:end], metadata=dict(metadata)) for start, end in self.spans(text))
+        return chunks
+
+    def _split(self, text: str, start: int, end: int, separators: List[str], out: List[Span]) -> None:
+        # The first separator present in this span splits it; later ones split oversized pieces.
+        separator, finer = separators[-1], []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator, finer = candidate, separators[i + 1:]
+                break
+
+        good: List[Span] = []
+        for piece_start, piece_end in self._pieces(text, start, end, separator):
+            if piece_end - piece_start < self.chunk_size:
+                good.append((piece_start, piece_end))
+                continue
+            if good:
+                self._merge(text, good, out)
+                good = []
+            if finer:
+                self._split(text, piece_start, piece_end, finer, out)
+            else:
+                # Unsplittable and too long: kept whole (and unstripped), as LangChain does.
+                out.append((piece_start, piece_end))
+        if good:
+            self._merge(text, good, out)
+
+    @staticmethod
+    def _pieces(text: str, start: int, end: int, separator: str) -> List[Span]:
+        """Split ``[start, end)`` before each occurrence of ``separator``; empty pieces dropped."""
+        if not separator:
+            return [(i, i + 1) for i in range(start, end)]
+        pieces = []
+        previous = start
+        found = text.find(separator, start, end)
+        while found != -1:
+            if found > previous:
+                pieces.append((previous, found))
+            previous = found
+            found = text.find(separator, found + len(separator), end)
+        if end > previous:
+            pieces.append((previous, end))
+        return pieces
+
+    def _merge(self, text: str, pieces: List[Span], out: List[Span]) -> None:
+        """Greedily pack adjacent pieces into chunks, carrying up to ``chunk_overlap`` into the next."""
+        current: deque = deque()
+        total = 0
+        for piece in pieces:
+            length = piece[1] - piece[0]
+            if total + length > self.chunk_size:
+                if total > self.chunk_size:
+                    logger.warning(f"Created a chunk of size {total}, which is longer than the specified {self.chunk_size}")
+                if current:
+                    self._emit(text, current[0][0], current[-1][1], out)
+                    while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                        dropped = current.popleft()
+                        total -= dropped[1] - dropped[0]
+            current.append(piece)
+            total += length
+        if current:
+            self._emit(text, current[0][0], current[-1][1], out)
+
+    @staticmethod
+    def _emit(text: str, start: int, end: int, out: List[Span]) -> None:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            out.append((start, end))
@@ -0,0 +1,110 @@
+import hashlib
+import re
+from typing import Iterator, List, Sequence, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+__all__ = ["HashingEmbeddings"]
+
+_TOKEN = re.compile(r"\w+")
+# Odd 64-bit constant used to combine consecutive token hashes into n-gram hashes.
+_NGRAM_PRIME = np.uint64(0x9E3779B97F4A7C15)
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, so bucket and sign bits of a hash are independent."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+class _Vocabulary(dict):
+    """token -> 64-bit hash, computed on first sight and memoised."""
+
+    def __init__(self, seed: int, max_size: int):
+        super().__init__()
+        self.salt = seed.to_bytes(8, "little", signed=False)
+        self.max_size = max_size
+
+    def __missing__(self, token: str) -> int:
+        if len(self) >= self.max_size:
+            self.clear()
+        value = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8, salt=self.salt).digest(), "little")
+        self[token] = value
+        return value
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic offline embeddings from signed feature hashing.
+
+    Each lower-cased word n-gram (up to ``ngrams`` words) is hashed to one
+    of ``dimensions`` buckets with a random sign, which is a sparse random
+    projection of the n-gram count vector. Counts are damped to
+    ``sign(x) * log(1 + |x|)`` and rows are L2-normalised, so inner-product
+    and cosine search behave as with API embeddings. No fitting, no network:
+    the same text always maps to the same vector for a given ``dimensions``,
+    ``ngrams`` and ``seed``. Texts are processed ``batch_size`` at a time
+    with NumPy; only tokenisation is per-text Python.
+    """
+
+    def __init__(self, dimensions: int = 384, ngrams: int = 2, seed: int = 0,
+                 batch_size: int = 4096, vocabulary_size: int = 2_000_000):
+        if dimensions <= 0 or ngrams <= 0:
+            raise ValueError("dimensions and ngrams must be positive")
+        self.dimensions = dimensions
+        self.ngrams = ngrams
+        self.seed = seed
+        self.batch_size = batch_size
+        self.model = f"hashing-d{dimensions}-n{ngrams}-s{seed}"
+        self._vocabulary = _Vocabulary(seed, vocabulary_size)
+
+    def embed_array(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` into a ``(len(texts), dimensions)`` float32 array."""
+        out = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            out[start:start + self.batch_size] = self._embed_batch(texts[start:start + self.batch_size])
+        return out
+
+    def _embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        lookup = self._vocabulary.__getitem__
+        hashes: List[int] = []
+        lengths = np.empty(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            lengths[i] = len(tokens)
+            hashes.extend(map(lookup, tokens))
+
+        unigrams = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        features, feature_rows = [unigrams], [rows]
+        ngram = unigrams
+        for n in range(2, self.ngrams + 1):
+            # n-gram hash = combine((n-1)-gram starting at i, token i+n-1), within one text only.
+            if len(ngram) < 2:
+                break
+            ngram = ngram[:-1] * _NGRAM_PRIME ^ unigrams[n - 1:]
+            ngram_rows = rows[:len(ngram)]
+            same_text = ngram_rows == rows[n - 1:]
+            features.append(ngram[same_text])
+            feature_rows.append(ngram_rows[same_text])
+
+        h = _mix(np.concatenate(features))
+        buckets = (h % np.uint64(self.dimensions)).astype(np.int64)
+        signs = np.where(h >> np.uint64(63), -1.0, 1.0)
+        flat_index = np.concatenate(feature_rows) * self.dimensions + buckets
+        counts = np.bincount(flat_index, weights=signs, minlength=len(texts) * self.dimensions)
+        vectors = (np.sign(counts) * np.log1p(np.abs(counts))).reshape(len(texts), self.dimensions)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors.astype(np.float32)
+
+    def iter_embeddings(self, texts: Sequence[str]) -> Iterator[Tuple[List[int], np.ndarray]]:
+        """Yield ``(positions, vectors)`` one batch at a time."""
+        for start in range(0, len(texts), self.batch_size):
+            end = min(start + self.batch_size, len(texts))
+            yield list(range(start, end)), self._embed_batch(texts[start:end])
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_batch([text])[0].tolist()
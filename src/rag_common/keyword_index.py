@@ -0,0 +1,294 @@
+import json
+import logging
+import math
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["BM25Index", "tokenize"]
+
+# Keep identifiers such as "2401.01234", "gpt-4o" or "llama-2-7b" whole, and
+# index their alphanumeric parts as well so partial mentions still match.
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[._\-/][a-z0-9]+)*")
+_PART_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(_PART_RE.findall(token))
+    return tokens
+
+class _Segment:
+    """Immutable postings block in CSR layout, sorted by term id.
+
+    ``terms[i]`` owns ``doc_ids[offsets[i]:offsets[i + 1]]`` and the matching
+    slice of ``tfs``.
+    """
+
+    def __init__(self, terms: np.ndarray, offsets: np.ndarray, doc_ids: np.ndarray, tfs: np.ndarray):
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.first_doc = int(doc_ids.min()) if len(doc_ids) else 0
+        self.last_doc = int(doc_ids.max()) if len(doc_ids) else -1
+
+    @classmethod
+    def from_pairs(cls, term_ids: np.ndarray, doc_ids: np.ndarray, tfs: np.ndarray) -> "_Segment":
+        order = np.lexsort((doc_ids, term_ids))
+        term_ids, doc_ids, tfs = term_ids[order], doc_ids[order], tfs[order]
+        terms, starts = np.unique(term_ids, return_index=True)
+        offsets = np.append(starts, len(term_ids)).astype(np.int64)
+        return cls(terms.astype(np.int32), offsets, doc_ids.astype(np.int32), tfs.astype(np.float32))
+
+    @classmethod
+    def merge(cls, segments: Sequence["_Segment"]) -> "_Segment":
+        term_ids = np.concatenate([np.repeat(s.terms, np.diff(s.offsets)) for s in segments])
+        doc_ids = np.concatenate([s.doc_ids for s in segments])
+        tfs = np.concatenate([s.tfs for s in segments])
+        return cls.from_pairs(term_ids, doc_ids, tfs)
+
+    def postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        i = np.searchsorted(self.terms, term_id)
+        if i == len(self.terms) or self.terms[i] != term_id:
+            return self.doc_ids[:0], self.tfs[:0]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.doc_ids[start:end], self.tfs[start:end]
+
+class BM25Index:
+    """Incrementally updatable inverted index with vectorized BM25 scoring.
+
+    Each ``add`` call appends a new postings segment; segments are merged once
+    there are more than ``max_segments`` of them so lookups stay cheap.
+    Documents are addressed by the same ids as the vector store's docstore;
+    adding an id that is already indexed replaces its document. Removed
+    documents stop counting towards df and the average length at once, and
+    their postings are dropped when more than ``compact_ratio`` of the docs
+    are removed, and on ``save``.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, max_segments: int = 8, compact_ratio: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.max_segments = max_segments
+        self.compact_ratio = compact_ratio
+        self.vocab: Dict[str, int] = {}
+        self.doc_keys: List[str] = []
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.df = np.zeros(0, dtype=np.int64)
+        self.segments: List[_Segment] = []
+        # Removed docs stay in the postings until the next compaction.
+        self.deleted: Set[int] = set()
+        self._live: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._total_len = 0
+        self._scratch = np.zeros(0, dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def add(self, ids: Sequence[str], texts: Iterable[str]) -> None:
+        """Index new documents, replacing any already indexed under the same id."""
+        texts = list(texts)
+        if len(texts) != len(ids):
+            raise ValueError("ids and texts must have the same length")
+        if not texts:
+            return
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        tfs: List[int] = []
+        lengths: List[int] = []
+        with self._lock:
+            self._retire([self._live[key] for key in ids if key in self._live])
+            base = len(self.doc_keys)
+            for offset, text in enumerate(texts):
+                tokens = tokenize(text)
+                lengths.append(len(tokens))
+                counts: Dict[int, int] = {}
+                for token in tokens:
+                    term_id = self.vocab.setdefault(token, len(self.vocab))
+                    counts[term_id] = counts.get(term_id, 0) + 1
+                term_ids.extend(counts.keys())
+                tfs.extend(counts.values())
+                doc_ids.extend([base + offset] * len(counts))
+
+            self.doc_keys.extend(ids)
+            self.doc_len = np.concatenate([self.doc_len, np.asarray(lengths, dtype=np.float32)])
+            self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+            self._total_len += sum(lengths)
+            terms = np.asarray(term_ids, dtype=np.int64)
+            if len(self.vocab) > len(self.df):
+                self.df = np.concatenate([self.df, np.zeros(len(self.vocab) - len(self.df), dtype=np.int64)])
+            self.df += np.bincount(terms, minlength=len(self.df))
+            self.segments.append(_Segment.from_pairs(terms, np.asarray(doc_ids), np.asarray(tfs)))
+            if len(self.segments) > self.max_segments:
+                self.segments = [_Segment.merge(self.segments)]
+            self._live.update((key, base + offset) for offset, key in enumerate(ids))
+            # An id repeated within one call keeps its last text.
+            self._retire([base + offset for offset, key in enumerate(ids) if self._live[key] != base + offset])
+            self._maybe_compact()
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """Drop documents from the index; returns how many were found."""
+        with self._lock:
+            found = [self._live.pop(key) for key in set(ids) if key in self._live]
+            self._retire(found)
+            self._maybe_compact()
+        return len(found)
+
+    def _retire(self, docs: Sequence[int]) -> None:
+        """Take ``docs`` out of the statistics; their postings go at the next compaction."""
+        docs = np.asarray(sorted(set(docs) - self.deleted), dtype=np.int64)
+        if not len(docs):
+            return
+        self.deleted.update(docs.tolist())
+        self._alive[docs] = False
+        self._total_len -= int(self.doc_len[docs].sum())
+        for segment in self.segments:
+            # Each segment holds a contiguous range of docs, so most are skipped outright.
+            if not len(segment.doc_ids) or docs[-1] < segment.first_doc or docs[0] > segment.last_doc:
+                continue
+            mask = np.isin(segment.doc_ids, docs)
+            if mask.any():
+                terms = np.repeat(segment.terms, np.diff(segment.offsets))[mask]
+                self.df -= np.bincount(terms, minlength=len(self.df))
+
+    def _maybe_compact(self) -> None:
+        if len(self.deleted) > self.compact_ratio * len(self.doc_keys):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the postings without removed docs and renumber docs and terms densely."""
+        if not self.deleted:
+            return
+        keep = self._alive
+        doc_map = np.cumsum(keep) - 1
+        term_keep = self.df > 0
+        term_map = np.cumsum(term_keep) - 1
+        empty = np.zeros(0, dtype=np.int64)
+        term_ids, doc_ids, tfs = [empty], [empty], [empty]
+        for segment in self.segments:
+            terms = np.repeat(segment.terms, np.diff(segment.offsets))
+            mask = keep[segment.doc_ids]
+            term_ids.append(term_map[terms[mask]])
+            doc_ids.append(doc_map[segment.doc_ids[mask]])
+            tfs.append(segment.tfs[mask])
+        self.segments = [_Segment.from_pairs(np.concatenate(term_ids), np.concatenate(doc_ids), np.concatenate(tfs))]
+        self.doc_keys = [key for key, alive in zip(self.doc_keys, keep) if alive]
+        self.doc_len = self.doc_len[keep]
+        self._alive = np.ones(len(self.doc_keys), dtype=bool)
+        self._live = {key: doc for doc, key in enumerate(self.doc_keys)}
+        self.df = self.df[term_keep]
+        self.vocab = {term: int(term_map[i]) for term, i in self.vocab.items() if term_keep[i]}
+        logger.debug(f"Compacted keyword index: dropped {len(self.deleted)} removed docs")
+        self.deleted = set()
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Return the top-k ``(doc id, BM25 score)`` pairs."""
+        with self._lock:
+            n_docs = len(self._live)
+            term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+            if not n_docs or not term_ids:
+                return []
+            avgdl = self._total_len / n_docs or 1.0
+            if len(self._scratch) < len(self.doc_keys):
+                self._scratch = np.zeros(len(self.doc_keys), dtype=np.float32)
+            scores = self._scratch
+            touched: List[np.ndarray] = []
+            # Doc ids are unique within one posting list, so plain fancy-index
+            # accumulation is safe and avoids sorting the candidate set.
+            for term_id in term_ids:
+                df = self.df[term_id]
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for segment in self.segments:
+                    docs, tf = segment.postings(term_id)
+                    if not len(docs):
+                        continue
+                    norm = self.k1 * (1.0 - self.b + self.b * self.doc_len[docs] / avgdl)
+                    scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+                    touched.append(docs)
+            if not touched:
+                return []
+            candidates = np.concatenate(touched)
+            if len(candidates) > len(self.doc_keys) // 2:
+                # Very common terms: ranking the dense score array is cheaper.
+                candidates = np.arange(len(self.doc_keys))
+            values = np.where(self._alive[candidates], scores[candidates], 0.0)
+            # A doc appears once per matching term, so over-fetch before dedup.
+            fetch = min(len(candidates), k * len(term_ids))
+            top = np.argpartition(-values, fetch - 1)[:fetch]
+            top = top[np.argsort(-values[top], kind="stable")]
+            results: List[Tuple[str, float]] = []
+            seen = set()
+            for i in top:
+                doc = int(candidates[i])
+                if doc in seen or values[i] <= 0.0:
+                    continue
+                seen.add(doc)
+                results.append((self.doc_keys[doc], float(values[i])))
+                if len(results) == k:
+                    break
+            scores[candidates] = 0.0
+            return results
+
+    def save(self, path: Path) -> None:
+        """Persist as one compacted segment plus vocabulary and doc ids."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._compact()
+            if len(self.segments) > 1:
+                self.segments = [_Segment.merge(self.segments)]
+            empty = np.zeros(0, dtype=np.int64)
+            segment = self.segments[0] if self.segments else _Segment.from_pairs(empty, empty, empty)
+            np.savez(
+                path / "postings.npz",
+                terms=segment.terms,
+                offsets=segment.offsets,
+                doc_ids=segment.doc_ids,
+                tfs=segment.tfs,
+                doc_len=self.doc_len,
+                df=self.df,
+            )
+            with open(path / "meta.json", "w") as f:
+                json.dump({
+                    "k1": self.k1,
+                    "b": self.b,
+                    "vocab": self.vocab,
+                    "doc_keys": self.doc_keys,
+                }, f)
+        logger.info(f"Saved keyword index ({len(self.doc_keys)} docs, {len(self.vocab)} terms) to {path}")
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        path = Path(path)
+        if not (path / "meta.json").exists():
+            raise FileNotFoundError(path)
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+        data = np.load(path / "postings.npz")
+        index = cls(k1=meta["k1"], b=meta["b"])
+        index.vocab = meta["vocab"]
+        index.doc_keys = meta["doc_keys"]
+        index.doc_len = data["doc_len"]
+        index._alive = np.ones(len(index.doc_keys), dtype=bool)
+        index._total_len = int(index.doc_len.sum())
+        index.df = data["df"]
+        if len(data["doc_ids"]):
+            index.segments = [_Segment(data["terms"], data["offsets"], data["doc_ids"], data["tfs"])]
+        index._live = {key: doc for doc, key in enumerate(index.doc_keys)}
+        # Indexes saved before compaction on save still carry removed and replaced docs.
+        stale = set(meta.get("deleted", [])) | {doc for doc, key in enumerate(index.doc_keys) if index._live[key] != doc}
+        if stale:
+            index._live = {key: doc for key, doc in index._live.items() if doc not in stale}
+            index._retire(sorted(stale))
+            index._compact()
+        return index
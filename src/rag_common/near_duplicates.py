@@ -0,0 +1,244 @@
+import logging
+import re
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["NearDuplicateIndex", "DedupePlan"]
+
+_TOKEN = re.compile(r"\w+")
+
+@dataclass
+class DedupePlan:
+    """Outcome of ``NearDuplicateIndex.plan``, persisted by ``apply``."""
+    keep: List[int] = field(default_factory=list)
+    # (chunk_id, group, signature bytes, band buckets) of each kept chunk
+    kept: List[Tuple[str, str, bytes, List[int]]] = field(default_factory=list)
+    # (chunk_id, canonical_id, group, source, similarity) of each dropped chunk
+    merged: List[Tuple[str, str, str, Optional[str], float]] = field(default_factory=list)
+
+class NearDuplicateIndex:
+    """Persistent MinHash LSH index for dropping near-duplicate chunks before embedding.
+
+    Each chunk gets a ``num_perm``-value MinHash signature over its word
+    ``shingle_size``-grams. The signature is split into ``bands`` bands, and
+    the chunks sharing any band bucket are candidates. A candidate whose
+    estimated Jaccard similarity reaches ``threshold`` makes the new chunk a
+    duplicate. Chunks of the same ``group`` (e.g. one paper) are never merged
+    with each other. Signatures, band buckets and provenance (which dropped
+    chunk merged into which kept one, and from where) are stored in SQLite.
+    """
+
+    def __init__(self, path: Path, threshold: float = 0.8, num_perm: int = 128,
+                 bands: int = 16, shingle_size: int = 3, seed: int = 1, batch_size: int = 128):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.batch_size = batch_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family: h(x) = (a * x + b) mod 2^64 >> 32, with odd a.
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 2 ** 63, size=num_perm // bands, dtype=np.uint64) | np.uint64(1)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                chunk_id TEXT PRIMARY KEY,
+                grp TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                bucket INTEGER NOT NULL,
+                chunk_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_bands_bucket ON bands(bucket);
+            CREATE INDEX IF NOT EXISTS idx_bands_chunk ON bands(chunk_id);
+            CREATE TABLE IF NOT EXISTS merged (
+                chunk_id TEXT PRIMARY KEY,
+                canonical_id TEXT NOT NULL,
+                grp TEXT NOT NULL,
+                source TEXT,
+                similarity REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_merged_canonical ON merged(canonical_id);
+            """
+        )
+        self._conn.commit()
+
+    def _shingles(self, text: str) -> List[int]:
+        words = _TOKEN.findall(text.lower())
+        n = min(self.shingle_size, len(words))
+        return [zlib.crc32(" ".join(words[i:i + n]).encode("utf-8")) for i in range(len(words) - n + 1)] if n else []
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """``(len(texts), num_perm)`` uint32 MinHash signatures; all-max for texts without words.
+
+        Texts are hashed ``batch_size`` at a time, so peak memory is bounded
+        by the batch rather than by the number of texts.
+        """
+        out = np.full((len(texts), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for start in range(0, len(texts), self.batch_size):
+            self._sign_batch(texts[start:start + self.batch_size], out[start:start + self.batch_size])
+        return out
+
+    def _sign_batch(self, texts: Sequence[str], out: np.ndarray) -> None:
+        shingles = [self._shingles(text) for text in texts]
+        counts = np.fromiter((len(s) for s in shingles), dtype=np.int64, count=len(texts))
+        nonempty = counts > 0
+        if not nonempty.any():
+            return
+        values = np.fromiter((h for s in shingles for h in s), dtype=np.uint64, count=int(counts.sum()))
+        hashed = ((values[:, None] * self._a + self._b) >> np.uint64(32)).astype(np.uint32)
+        starts = np.concatenate(([0], np.cumsum(counts[nonempty])[:-1]))
+        out[nonempty] = np.minimum.reduceat(hashed, starts, axis=0)
+
+    def _buckets(self, signature: np.ndarray) -> List[int]:
+        rows = signature.astype(np.uint64).reshape(self.bands, -1)
+        keys = (rows * self._band_mix).sum(axis=1) ^ np.arange(self.bands, dtype=np.uint64)
+        # SQLite integers are signed 64-bit.
+        return keys.view(np.int64).tolist()
+
+    def dedupe(self, chunks: Sequence[Document], ids: Sequence[str], groups: Sequence[str]) -> List[int]:
+        """Positions of ``chunks`` to keep; the rest are recorded as merged into an earlier chunk.
+
+        Kept chunks are added to the index right away, so later chunks (in
+        this call or later ones) are compared against them too.
+        """
+        plan = self.plan(chunks, ids, groups)
+        self.apply(plan)
+        return plan.keep
+
+    def plan(self, chunks: Sequence[Document], ids: Sequence[str], groups: Sequence[str],
+             pending_plans: Sequence[DedupePlan] = ()) -> DedupePlan:
+        """Decide which chunks to keep without writing anything; see ``apply``.
+
+        Chunks kept by ``pending_plans`` (planned but not applied yet, e.g.
+        still waiting to be stored) are matched against as well.
+        """
+        signatures = self.signatures([chunk.page_content for chunk in chunks])
+        plan = DedupePlan()
+        # Chunks kept earlier in this call or by pending plans, by band bucket.
+        pending: Dict[int, List[Tuple[str, str, np.ndarray]]] = {}
+        for earlier in pending_plans:
+            for cid, group, signature, buckets in earlier.kept:
+                for bucket in buckets:
+                    pending.setdefault(bucket, []).append((cid, group, np.frombuffer(signature, dtype=np.uint32)))
+        with self._lock:
+            for i, (chunk, cid, group, signature) in enumerate(zip(chunks, ids, groups, signatures)):
+                if not chunk.page_content.strip():
+                    plan.keep.append(i)
+                    continue
+                buckets = self._buckets(signature)
+                candidates = self._candidates(buckets, group)
+                candidates += [
+                    (other, other_signature) for bucket in buckets for other, other_group, other_signature in pending.get(bucket, ())
+                    if other_group != group
+                ]
+                match = self._best_match(candidates, signature)
+                if match is None:
+                    plan.keep.append(i)
+                    plan.kept.append((cid, group, signature.tobytes(), buckets))
+                    for bucket in buckets:
+                        pending.setdefault(bucket, []).append((cid, group, signature))
+                else:
+                    canonical, similarity = match
+                    source = chunk.metadata.get("source") or chunk.metadata.get("title")
+                    plan.merged.append((cid, canonical, group, str(source) if source else None, similarity))
+        return plan
+
+    def apply(self, plan: DedupePlan, stored: Optional[Iterable[str]] = None) -> None:
+        """Persist a plan. With ``stored``, only those kept chunk ids (the ones
+        that actually made it into the vector store) are indexed, and only
+        merges into an indexed chunk are recorded."""
+        stored = None if stored is None else set(stored)
+        kept = [row for row in plan.kept if stored is None or row[0] in stored]
+        with self._lock:
+            for cid, group, signature, buckets in kept:
+                self._conn.execute("INSERT OR REPLACE INTO signatures VALUES (?, ?, ?)", (cid, group, signature))
+                self._conn.execute("DELETE FROM bands WHERE chunk_id = ?", (cid,))
+                self._conn.executemany("INSERT INTO bands VALUES (?, ?)", [(b, cid) for b in buckets])
+            indexed = {cid for cid, _, _, _ in kept}
+            merged = [
+                row for row in plan.merged
+                if row[1] in indexed or self._conn.execute(
+                    "SELECT 1 FROM signatures WHERE chunk_id = ?", (row[1],)
+                ).fetchone()
+            ]
+            self._conn.executemany("INSERT OR REPLACE INTO merged VALUES (?, ?, ?, ?, ?)", merged)
+            self._conn.commit()
+        if merged:
+            logger.info(f"Merged {len(merged)} near-duplicate chunks (Jaccard >= {self.threshold})")
+
+    def _candidates(self, buckets: List[int], group: str) -> List[Tuple[str, np.ndarray]]:
+        rows = self._conn.execute(
+            f"SELECT s.chunk_id, s.signature FROM signatures s WHERE s.grp != ? AND s.chunk_id IN "
+            f"(SELECT chunk_id FROM bands WHERE bucket IN ({','.join('?' * len(buckets))}))",
+            (group, *buckets),
+        ).fetchall()
+        return [(chunk_id, np.frombuffer(blob, dtype=np.uint32)) for chunk_id, blob in rows]
+
+    def _best_match(self, candidates: List[Tuple[str, np.ndarray]], signature: np.ndarray):
+        best = None
+        for chunk_id, other in candidates:
+            similarity = float(np.mean(other == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (chunk_id, similarity)
+        return best
+
+    def sources(self, chunk_id: str) -> List[Dict[str, Any]]:
+        """Provenance of the near-duplicates merged into ``chunk_id``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id, grp, source, similarity FROM merged WHERE canonical_id = ? ORDER BY chunk_id",
+                (chunk_id,),
+            ).fetchall()
+        return [{"chunk_id": cid, "group": group, "source": source, "similarity": sim} for cid, group, source, sim in rows]
+
+    def forget(self, ids: Sequence[str]) -> Set[str]:
+        """Remove chunks from the index.
+
+        Returns the groups whose merged chunks pointed at one of them; their
+        content is no longer represented, so callers should re-ingest them.
+        """
+        params = [(cid,) for cid in ids]
+        with self._lock:
+            orphaned = set()
+            for cid in ids:
+                orphaned.update(group for (group,) in self._conn.execute(
+                    "SELECT grp FROM merged WHERE canonical_id = ?", (cid,)
+                ))
+            self._conn.executemany("DELETE FROM merged WHERE canonical_id = ? OR chunk_id = ?", [(c, c) for (c,) in params])
+            self._conn.executemany("DELETE FROM bands WHERE chunk_id = ?", params)
+            self._conn.executemany("DELETE FROM signatures WHERE chunk_id = ?", params)
+            self._conn.commit()
+        return orphaned
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.executescript("DELETE FROM signatures; DELETE FROM bands; DELETE FROM merged;")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (indexed,), = self._conn.execute("SELECT COUNT(*) FROM signatures")
+            (merged,), = self._conn.execute("SELECT COUNT(*) FROM merged")
+        return {"indexed": indexed, "merged": merged}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+__all__ = ["QueryEmbeddingCache"]
+
+class QueryEmbeddingCache:
+    """Bounded LRU of query embeddings, with optional near-duplicate reuse.
+
+    Exact repeats (after case/whitespace normalization) skip the embedding
+    round trip. When ``semantic_threshold`` is set, the vectors of the last
+    ``semantic_window`` searches are kept in a small normalized matrix; a new
+    query whose cosine similarity to one of them reaches the threshold reuses
+    that search's results, provided ``k`` and the index version match.
+    """
+
+    def __init__(self, max_entries: int = 4096, semantic_threshold: Optional[float] = None, semantic_window: int = 512):
+        self.max_entries = max_entries
+        self.semantic_threshold = semantic_threshold
+        self.semantic_window = semantic_window
+        self.hits = 0
+        self.misses = 0
+        self.semantic_hits = 0
+        self._vectors: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._slots: List[Optional[tuple]] = [None] * semantic_window
+        self._next_slot = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def embed(self, query: str, embed_fn: Callable[[str], List[float]]) -> List[float]:
+        """Return the cached embedding for ``query`` or compute it with ``embed_fn``."""
+        key = self._key(query)
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is not None:
+                self._vectors.move_to_end(key)
+                self.hits += 1
+                return vector
+            self.misses += 1
+        vector = embed_fn(query)
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+        return vector
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic_threshold is not None
+
+    def similar_results(self, vector: List[float], k: int, version: int) -> Optional[Any]:
+        """Results of a recent near-identical search, if one clears the threshold."""
+        if not self.semantic_enabled:
+            return None
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != len(query):
+                return None
+            sims = self._matrix @ query
+            for slot in np.argsort(-sims)[:4]:
+                if sims[slot] < self.semantic_threshold:
+                    break
+                entry = self._slots[slot]
+                if entry is not None and entry[0] == k and entry[1] == version:
+                    self.semantic_hits += 1
+                    return entry[2]
+        return None
+
+    def remember_results(self, vector: List[float], k: int, version: int, results: Any) -> None:
+        """Record a search so later near-duplicates can reuse it."""
+        if not self.semantic_enabled:
+            return
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != len(query):
+                # Unused rows stay zero, so they never clear a positive threshold.
+                self._matrix = np.zeros((self.semantic_window, len(query)), dtype=np.float32)
+                self._slots = [None] * self.semantic_window
+                self._next_slot = 0
+            self._matrix[self._next_slot] = query
+            self._slots[self._next_slot] = (k, version, results)
+            self._next_slot = (self._next_slot + 1) % self.semantic_window
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "semantic_hits": self.semantic_hits,
+                "entries": len(self._vectors),
+            }
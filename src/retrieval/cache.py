@@ -0,0 +1,98 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from langchain_core.documents import Document
+from common.config import settings
+
+__all__ = ["QueryResultCache", "normalize_query"]
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form used in cache keys."""
+    return " ".join(query.lower().split())
+
+def _estimate_size(value: Any) -> int:
+    """Rough byte size of a retrieval result, dominated by document text."""
+    if isinstance(value, Document):
+        return sys.getsizeof(value.page_content) + _estimate_size(value.metadata)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+class QueryResultCache:
+    """LRU + TTL cache for retrieval results with a memory cap.
+
+    Callers put the index version in the key, so results computed against an
+    older index are simply never looked up again and age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 256 * 1024 ** 2, ttl_s: float = 900.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> Optional["QueryResultCache"]:
+        if not settings.query_cache_enabled:
+            return None
+        return cls(settings.query_cache_max_entries, settings.query_cache_max_bytes, settings.query_cache_ttl_s)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (time.monotonic() + self.ttl_s, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
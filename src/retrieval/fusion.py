@@ -0,0 +1,83 @@
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+from langchain_core.documents import Document
+
+__all__ = ["doc_key", "reciprocal_rank_fusion", "weighted_score_fusion", "prior_boost"]
+
+def doc_key(doc: Document) -> str:
+    """Identity used to merge the same chunk returned by several backends.
+
+    ``id`` names a whole paper (e.g. its arXiv id), so it is only used when a
+    hit carries no ``chunk_id``; otherwise chunks of one paper would collapse.
+    """
+    for field in ("chunk_id", "id"):
+        value = doc.metadata.get(field)
+        if value:
+            return str(value)
+    return hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+
+def reciprocal_rank_fusion(
+    ranked: Dict[str, Sequence[Document]],
+    k: int = 60,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Tuple[Document, float]]:
+    """Fuse ranked lists with RRF: ``sum(w_b / (k + rank_b(d)))``.
+
+    Only ranks are used, so backends with incomparable scores (L2 distance,
+    BM25, graph hops) can be mixed without calibration.
+    """
+    weights = weights or {}
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for backend, results in ranked.items():
+        weight = weights.get(backend, 1.0)
+        for rank, doc in enumerate(results, start=1):
+            key = doc_key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+    return sorted(((docs[key], score) for key, score in scores.items()), key=lambda pair: -pair[1])
+
+def weighted_score_fusion(
+    scored: Dict[str, Sequence[Tuple[Document, float]]],
+    weights: Optional[Dict[str, float]] = None,
+    lower_is_better: Sequence[str] = (),
+) -> List[Tuple[Document, float]]:
+    """Fuse scored lists by min-max normalizing each backend and summing.
+
+    Backends named in ``lower_is_better`` (e.g. L2 distances) are inverted
+    before normalization.
+    """
+    weights = weights or {}
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for backend, results in scored.items():
+        if not results:
+            continue
+        values = [-s if backend in lower_is_better else s for _, s in results]
+        low, high = min(values), max(values)
+        weight = weights.get(backend, 1.0)
+        for (doc, _), value in zip(results, values):
+            key = doc_key(doc)
+            docs.setdefault(key, doc)
+            normalized = (value - low) / (high - low) if high > low else 1.0
+            scores[key] = scores.get(key, 0.0) + weight * normalized
+    return sorted(((docs[key], score) for key, score in scores.items()), key=lambda pair: -pair[1])
+
+def prior_boost(
+    scored: Sequence[Tuple[Document, float]],
+    priors: Sequence[float],
+    weight: float,
+) -> List[Tuple[Document, float]]:
+    """Mix a per-document prior in [0, 1] (e.g. citation centrality) into fused scores.
+
+    Scores are scaled by the best one first, so ``weight`` means the same
+    thing whatever fusion produced them: ``(1 - w) * score / max + w * prior``.
+    """
+    if not scored or weight <= 0:
+        return list(scored)
+    top = max(score for _, score in scored) or 1.0
+    boosted = [
+        (doc, (1.0 - weight) * score / top + weight * prior)
+        for (doc, score), prior in zip(scored, priors)
+    ]
+    return sorted(boosted, key=lambda pair: -pair[1])
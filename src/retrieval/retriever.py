@@ -1,43 +1,119 @@
-from typing import List, Dict, Any
+import asyncio
+import time
+from functools import partial
+from typing import List, Dict, Any, Tuple, Callable, Iterable, Optional
 from langchain_core.documents import Document
 from storage.vector_store_manager import VectorStoreManager
-from storage.graph_manager import GraphManager
+from retrieval.cache import QueryResultCache, normalize_query
+from retrieval.fusion import reciprocal_rank_fusion, weighted_score_fusion, prior_boost
+from storage.centrality import CentralityTable
+from storage.citation_graph import CitationGraph
+from common.config import settings
+from common.ids import paper_id
 from common.logger import logger
 from common.interfaces import Retriever, VectorStore, GraphStore
 
+def _paper_ids(docs: Iterable[Document]) -> List[str]:
+    return [doc.metadata.get("paper_id") or paper_id(doc.metadata, doc.page_content) for doc in docs]
+
 class HybridRetriever(Retriever):
-    """Concrete implementation of Retriever using hybrid vector and graph search."""
+    """Concrete implementation of Retriever using hybrid vector, keyword and graph search.
+
+    Backends run concurrently, each under its own timeout, and their results
+    are fused into a single ranked list. A backend that fails or times out
+    contributes nothing instead of failing the whole request.
+    """
     
-    def __init__(self, vector_store: VectorStore, graph_store: GraphStore):
+    def __init__(self, vector_store: VectorStore, graph_store: GraphStore, keyword_store: Optional[Any] = None,
+                 cache: Optional[QueryResultCache] = None, centrality: Optional[CentralityTable] = None):
         self.vector_store = vector_store
         self.graph_store = graph_store
+        # Anything with keyword_search(query, k) -> [(Document, score)], e.g. VectorStoreManager.
+        self.keyword_store = keyword_store
+        self.cache = cache if cache is not None else QueryResultCache.from_settings()
+        # Precomputed per-paper influence; boosting is a dict lookup per hit.
+        self.centrality = centrality
     
-    def retrieve(self, query: str, k: int = 5) -> Dict[str, List[Document]]:
-        """Retrieve relevant documents using hybrid search."""
+    def retrieve(self, query: str, k: int = 5) -> Dict[str, Any]:
+        """Retrieve relevant documents using hybrid search.
+
+        For synchronous callers only: inside a running event loop it raises,
+        since blocking the loop on the fan-out would stall every other
+        coroutine. Async callers use ``aretrieve``.
+        """
         try:
-            # Vector search
-            vector_results = self.vector_store.search(query, k=k)
-            
-            # Graph search
-            graph_query = self._build_graph_query(query)
-            graph_results = self.graph_store.query(graph_query)
-            
-            return {
-                'vector': vector_results,
-                'graph': self._convert_graph_results(graph_results)
-            }
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aretrieve(query, k=k))
+        raise RuntimeError("HybridRetriever.retrieve() called from a running event loop; await aretrieve() instead")
+    
+    async def aretrieve(self, query: str, k: int = 5) -> Dict[str, Any]:
+        """Fan out to all backends concurrently and fuse their rankings."""
+        key = ("hybrid", normalize_query(query), k, getattr(self.vector_store, "version", 0))
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        backends: Dict[str, Tuple[Callable[[], Any], float]] = {
+            'vector': (partial(self.vector_store.search, query, k=k), settings.vector_timeout_s),
+            'graph': (partial(self._graph_search, query, k=k), settings.graph_timeout_s),
+        }
+        if self.keyword_store is not None:
+            backends['keyword'] = (partial(self.keyword_store.keyword_search, query, k=k), settings.keyword_timeout_s)
+        
+        outcomes = await asyncio.gather(*(
+            self._run_backend(name, fn, timeout) for name, (fn, timeout) in backends.items()
+        ))
+        results = {name: hits for name, hits, _, _ in outcomes}
+        latency = {name: ms for name, _, ms, _ in outcomes}
+        errors = {name: error for name, _, _, error in outcomes if error}
+        if len(errors) == len(backends):
+            raise Exception(f"Error in hybrid retrieval: {errors}")
+        
+        # Vector and keyword hits are (Document, score); graph hits are ranked Documents.
+        scored = {
+            name: hits if name != 'graph' else [(doc, 1.0 / rank) for rank, doc in enumerate(hits, start=1)]
+            for name, hits in results.items()
+        }
+        if settings.retrieval_fusion == "weighted":
+            fused = weighted_score_fusion(scored, settings.fusion_weights, lower_is_better=("vector",))
+        else:
+            ranked = {name: [doc for doc, _ in hits] for name, hits in scored.items()}
+            fused = reciprocal_rank_fusion(ranked, k=settings.rrf_k, weights=settings.fusion_weights)
+        if self.centrality is not None:
+            fused = prior_boost(fused, self.centrality.priors(_paper_ids(doc for doc, _ in fused)),
+                                settings.centrality_weight)
+        
+        logger.info("Hybrid retrieval latency: " + ", ".join(f"{n}={ms:.1f}ms" for n, ms in latency.items()))
+        result = {
+            **results,
+            'fused': fused[:k],
+            'latency_ms': latency,
+            'errors': errors,
+        }
+        # Partial results from a timed-out backend are not worth pinning.
+        if self.cache is not None and not errors:
+            self.cache.put(key, result)
+        return result
+    
+    async def _run_backend(self, name: str, fn: Callable[[], Any], timeout: float) -> Tuple[str, List[Any], float, Optional[str]]:
+        """Run one blocking backend off the event loop under its own timeout."""
+        start = time.perf_counter()
+        try:
+            hits = await asyncio.wait_for(asyncio.to_thread(fn), timeout=timeout)
+            error = None
+        except asyncio.TimeoutError:
+            hits, error = [], f"timed out after {timeout}s"
+            logger.warning(f"{name} retrieval timed out after {timeout}s")
         except Exception as e:
-            raise Exception(f"Error in hybrid retrieval: {str(e)}")
+            hits, error = [], str(e)
+            logger.warning(f"{name} retrieval failed: {str(e)}")
+        return name, hits, (time.perf_counter() - start) * 1000, error
     
-    def _build_graph_query(self, query: str) -> str:
-        """Build a Cypher query for graph search."""
-        return f"""
-        MATCH (n:Node)
-        WHERE n.properties.title CONTAINS '{query}'
-           OR n.properties.content CONTAINS '{query}'
-        RETURN n
-        LIMIT 5
-        """
+    def _graph_search(self, query: str, k: int = 5) -> List[Document]:
+        """Full-text index lookup; the query is passed as a parameter, never interpolated."""
+        return self._convert_graph_results(self.graph_store.fulltext_search(query, k=k))
     
     def _convert_graph_results(self, results: List[Dict[str, Any]]) -> List[Document]:
         """Convert graph results to Document format."""
@@ -46,11 +122,12 @@ class HybridRetriever(Retriever):
             node = result.get('n', {})
             if node:
                 doc = Document(
-                    content=node.get('properties', {}).get('content', ''),
+                    page_content=node.get('content', ''),
                     metadata={
-                        'title': node.get('properties', {}).get('title', ''),
-                        'type': node.get('type', ''),
-                        'id': node.get('id', '')
+                        'title': node.get('title', ''),
+                        'type': 'Paper',
+                        'id': node.get('id', ''),
+                        'score': result.get('score')
                     }
                 )
                 documents.append(doc)
@@ -65,27 +142,131 @@ class HybridRetriever(Retriever):
         self.graph_store = graph_store
 
 class KnowledgeRetriever:
-    def __init__(self, vsm: VectorStoreManager, gm: GraphManager):
+    def __init__(self, vsm: VectorStoreManager, gm: GraphStore, cache: Optional[QueryResultCache] = None,
+                 centrality: Optional[CentralityTable] = None, citation_graph: Optional[CitationGraph] = None):
         self.vsm = vsm
         self.gm = gm
+        self.cache = cache if cache is not None else QueryResultCache.from_settings()
+        # Both are swapped for fresh copies after each ingest (see graph.nodes.ingest_corpus).
+        self.centrality = centrality
+        self.citation_graph = citation_graph
+        # Popular papers are seeds for many queries; cache each seed's neighborhood.
+        self.neighborhood_cache = QueryResultCache(
+            max_entries=settings.graph_neighborhood_cache_size,
+            ttl_s=settings.query_cache_ttl_s,
+        )
 
     # --- Vector ---
     def vector_search(self, query: str, k: int = 5) -> List[Document]:
         logger.info(f"Vector search: '{query}' (k={k})")
-        return self.vsm.store.similarity_search(query, k=k)
+        return self.vsm.similarity_search(query, k=k)
+
+    def vector_search_many(self, queries: List[str], k: int = 5) -> List[List[Tuple[Document, float]]]:
+        """Batched vector search, e.g. one query per outline section."""
+        logger.info(f"Vector search for {len(queries)} queries (k={k})")
+        return self.vsm.search_many(queries, k=k)
+
+    # --- Keyword ---
+    def keyword_search(self, query: str, k: int = 5) -> List[Document]:
+        logger.info(f"Keyword search: '{query}' (k={k})")
+        return [doc for doc, _ in self.vsm.keyword_search(query, k=k)]
 
     # --- Graph ---
-    def related_papers(self, title: str) -> List[Dict[str, Any]]:
-        query = (
-            "MATCH (p:Paper {title: $title})-[:CITES|:RELATED_TO*1..2]-(r:Paper) "
-            "RETURN r.title as title, r.year as year LIMIT 10"
+    def related_papers(self, title: str = "", paper_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Papers within two citation/relatedness hops, looked up by id or title.
+
+        Uses only ``GraphStore`` methods, so it works on every graph backend:
+        a title is resolved to its paper through ``fulltext_search``.
+        """
+        if not paper_id:
+            hits = self.gm.fulltext_search(title, k=10)
+            paper_id = next((hit["n"]["id"] for hit in hits if hit["n"].get("title") == title), None)
+            if paper_id is None:
+                return []
+        neighbors = self.gm.expand([paper_id], max_hops=2, per_seed=10).get(paper_id, [])
+        return [{"id": n["id"], "title": n["title"], "published": n["published"]} for n in neighbors]
+
+    def expand(self, seed_ids: List[str]) -> List[Dict[str, Any]]:
+        """Merged neighborhood of several seed papers, fetched in one batched query.
+
+        Each neighbor carries its shortest ``hops`` from any seed and ``seeds``,
+        the number of seeds that reach it; results are ordered by both.
+        """
+        seed_ids = list(dict.fromkeys(seed_ids))
+        def key(seed: str) -> Tuple[Any, ...]:
+            # The vector store version moves with every ingest, so it retires stale neighborhoods.
+            return ("neighborhood", seed, settings.graph_expand_hops, self.vsm.version)
+
+        neighborhoods = {}
+        missing = []
+        for seed in seed_ids:
+            cached = self.neighborhood_cache.get(key(seed))
+            if cached is None:
+                missing.append(seed)
+            else:
+                neighborhoods[seed] = cached
+        if missing:
+            fetched = self.gm.expand(missing, max_hops=settings.graph_expand_hops, per_seed=settings.graph_expand_per_seed)
+            for seed, neighbors in fetched.items():
+                self.neighborhood_cache.put(key(seed), neighbors)
+                neighborhoods[seed] = neighbors
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        for neighbors in neighborhoods.values():
+            for neighbor in neighbors:
+                entry = merged.get(neighbor["id"])
+                if entry is None:
+                    merged[neighbor["id"]] = {**neighbor, "seeds": 1}
+                else:
+                    entry["hops"] = min(entry["hops"], neighbor["hops"])
+                    entry["seeds"] += 1
+        if self.centrality is not None:
+            for neighbor in merged.values():
+                neighbor["centrality"] = self.centrality.prior_of(neighbor["id"])
+        ranked = sorted(merged.values(), key=lambda n: (-n["seeds"], n["hops"], -n.get("centrality", 0.0)))
+        return ranked[:settings.graph_expand_limit]
+
+    def ppr_related(self, seed_ids: List[str]) -> List[Dict[str, Any]]:
+        """Related papers by personalized PageRank from the seeds, within a time budget.
+
+        Higher-ranked vector hits get more restart mass. Unlike the
+        variable-length expansion, cost is bounded by the budget and the
+        pruning threshold rather than by hub degree.
+        """
+        graph = self.citation_graph
+        hits = graph.personalized_pagerank(
+            seed_ids,
+            k=settings.graph_expand_limit,
+            alpha=settings.ppr_alpha,
+            max_iter=settings.ppr_max_iter,
+            budget_ms=settings.ppr_budget_ms,
+            epsilon=settings.ppr_epsilon,
+            seed_weights=[1.0 / rank for rank in range(1, len(seed_ids) + 1)],
         )
-        return self.gm.cypher(query, {"title": title})
+        return [{"id": pid, "title": graph.title(pid), "score": score} for pid, score in hits]
 
     # --- Hybrid ---
     def hybrid(self, query: str, k: int = 5) -> Dict[str, Any]:
+        key = ("knowledge", normalize_query(query), k, self.vsm.version)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
         vector_docs = self.vector_search(query, k=k)
-        related = []
-        if vector_docs:
-            related = self.related_papers(vector_docs[0].metadata.get("title", ""))
-        return {"vector": vector_docs, "graph": related}
\ No newline at end of file
+        keyword_docs = self.keyword_search(query, k=k)
+        seeds = _paper_ids(vector_docs)
+        if self.centrality is not None and vector_docs:
+            # Rank-based scores, so the boost does not depend on the metric.
+            scored = [(doc, 1.0 / (settings.rrf_k + rank)) for rank, doc in enumerate(vector_docs, start=1)]
+            boosted = prior_boost(scored, self.centrality.priors(seeds), settings.centrality_weight)
+            vector_docs = [doc for doc, _ in boosted]
+        if not seeds:
+            related = []
+        elif settings.graph_strategy == "ppr" and self.citation_graph is not None:
+            related = self.ppr_related(seeds)
+        else:
+            related = self.expand(seeds)
+        result = {"vector": vector_docs, "keyword": keyword_docs, "graph": related}
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
\ No newline at end of file
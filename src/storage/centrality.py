@@ -0,0 +1,146 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import scipy.sparse as sp
+from common.logger import logger
+
+__all__ = ["CentralityTable", "pagerank"]
+
+def pagerank(
+    adjacency: sp.csr_matrix,
+    damping: float = 0.85,
+    tol: float = 1e-8,
+    max_iter: int = 100,
+    init: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Power-iteration PageRank over ``adjacency[i, j] = 1`` for ``i -> j``.
+
+    Dangling papers (no outgoing citations) spread their mass uniformly.
+    ``init`` warm-starts the iteration; each iteration still touches every edge.
+    """
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.float64)
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    inv_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    transition = (sp.diags(inv_degree) @ adjacency).T.tocsr()
+    rank = np.full(n, 1.0 / n) if init is None else init / init.sum()
+    for _ in range(max_iter):
+        new = damping * (transition @ rank + rank[dangling].sum() / n) + (1.0 - damping) / n
+        delta = np.abs(new - rank).sum()
+        rank = new
+        if delta < tol:
+            break
+    return rank
+
+def _normalize(values: np.ndarray) -> np.ndarray:
+    """Log-scale to [0, 1]; citation counts are heavy-tailed."""
+    values = np.log1p(np.maximum(values, 0.0))
+    top = values.max() if len(values) else 0.0
+    return (values / top if top > 0 else values).astype(np.float32)
+
+class CentralityTable:
+    """Per-paper influence scores, precomputed so ranking boosts cost a lookup.
+
+    Holds PageRank, co-citation (how often a paper is cited together with
+    others) and bibliographic coupling (how many references it shares with
+    others), each normalized to [0, 1], plus ``prior``, their weighted mix.
+    """
+
+    def __init__(self, ids: Sequence[str], pagerank: np.ndarray, cocitation: np.ndarray, coupling: np.ndarray,
+                 weights: Optional[Dict[str, float]] = None, raw_pagerank: Optional[np.ndarray] = None):
+        self.ids = list(ids)
+        self.index = {paper_id: i for i, paper_id in enumerate(self.ids)}
+        self.weights = weights or {"pagerank": 0.6, "cocitation": 0.2, "coupling": 0.2}
+        self.pagerank = pagerank.astype(np.float32)
+        self.cocitation = cocitation.astype(np.float32)
+        self.coupling = coupling.astype(np.float32)
+        self.prior = (
+            self.weights.get("pagerank", 0.0) * self.pagerank
+            + self.weights.get("cocitation", 0.0) * self.cocitation
+            + self.weights.get("coupling", 0.0) * self.coupling
+        ).astype(np.float32)
+        # Unnormalized PageRank, kept to warm-start the next update.
+        self.raw_pagerank = raw_pagerank if raw_pagerank is not None else np.full(len(self.ids), 1.0 / max(len(self.ids), 1))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def compute(cls, ids: Sequence[str], src: np.ndarray, dst: np.ndarray,
+                weights: Optional[Dict[str, float]] = None, init: Optional[np.ndarray] = None,
+                damping: float = 0.85) -> "CentralityTable":
+        """Scores for papers ``ids`` given citation edges ``ids[src[k]] -> ids[dst[k]]``."""
+        n = len(ids)
+        data = np.ones(len(src), dtype=np.float64)
+        adjacency = sp.csr_matrix((data, (src, dst)), shape=(n, n))
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1.0
+        start = time.perf_counter()
+        raw = pagerank(adjacency, damping=damping, init=init)
+        out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+        in_degree = np.asarray(adjacency.sum(axis=0)).ravel()
+        # Row sums of A^T A and A A^T without forming either product.
+        cocitation = adjacency.T @ np.maximum(out_degree - 1, 0)
+        coupling = adjacency @ np.maximum(in_degree - 1, 0)
+        logger.info(f"Centrality over {n} papers / {adjacency.nnz} citations in {time.perf_counter() - start:.2f}s")
+        return cls(ids, _normalize(raw * n), _normalize(cocitation), _normalize(coupling), weights, raw)
+
+    def update(self, ids: Sequence[str], src: np.ndarray, dst: np.ndarray) -> "CentralityTable":
+        """Rescore the whole grown graph, starting PageRank from these scores.
+
+        Only the solver's starting point carries over: papers already in the
+        table start from their previous rank and new papers from the uniform
+        value, which saves iterations when a small batch arrives. Every
+        iteration, and the co-citation and coupling counts, still cover all
+        papers and citations.
+        """
+        init = np.full(len(ids), 1.0 / max(len(ids), 1))
+        for i, paper_id in enumerate(ids):
+            j = self.index.get(paper_id)
+            if j is not None:
+                init[i] = self.raw_pagerank[j]
+        return CentralityTable.compute(ids, src, dst, self.weights, init=init)
+
+    @classmethod
+    def from_graph(cls, graph_store, previous: Optional["CentralityTable"] = None) -> "CentralityTable":
+        """Batch job: pull the citation graph from a store and (re)score it."""
+        ids, _, src, dst = graph_store.citation_edges()
+        if previous is not None:
+            return previous.update(ids, src, dst)
+        return cls.compute(ids, src, dst)
+
+    def prior_of(self, paper_id: Optional[str]) -> float:
+        i = self.index.get(paper_id) if paper_id else None
+        return float(self.prior[i]) if i is not None else 0.0
+
+    def priors(self, paper_ids: Iterable[Optional[str]]) -> List[float]:
+        return [self.prior_of(paper_id) for paper_id in paper_ids]
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        tmp = path / "scores.tmp.npz"
+        np.savez(tmp, pagerank=self.pagerank, cocitation=self.cocitation, coupling=self.coupling,
+                 raw_pagerank=self.raw_pagerank)
+        os.replace(tmp, path / "scores.npz")
+        tmp = path / "ids.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"ids": self.ids, "weights": self.weights}, f)
+        os.replace(tmp, path / "ids.json")
+        logger.info(f"Saved centrality scores for {len(self.ids)} papers to {path}")
+
+    @classmethod
+    def load(cls, path: Path) -> "CentralityTable":
+        path = Path(path)
+        if not (path / "ids.json").exists():
+            raise FileNotFoundError(path)
+        with open(path / "ids.json") as f:
+            meta = json.load(f)
+        data = np.load(path / "scores.npz")
+        return cls(meta["ids"], data["pagerank"], data["cocitation"], data["coupling"],
+                   meta["weights"], data["raw_pagerank"])
@@ -0,0 +1,287 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from common.interfaces import GraphStore, Document
+from common.models import GraphDocument
+from common.logger import logger
+from storage.graph_documents import documents_to_graph
+from storage.graph_schema import GraphSchema
+from rag_common.keyword_index import BM25Index
+
+__all__ = ["CSRGraphStore"]
+
+# Relationship types followed by neighborhood expansion (Paper <-> Paper).
+EXPANDABLE = ("CITES", "RELATED_TO")
+
+class _CSR:
+    """Undirected adjacency compiled from the edge list; immutable once built."""
+
+    def __init__(self, n_nodes: int, src: np.ndarray, dst: np.ndarray, types: np.ndarray, expandable: np.ndarray):
+        heads = np.concatenate([src, dst])
+        tails = np.concatenate([dst, src])
+        edge_types = np.concatenate([types, types])
+        order = np.argsort(heads, kind="stable")
+        self.indices = tails[order]
+        self.expandable = np.isin(edge_types[order], expandable)
+        self.indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(heads, minlength=n_nodes), out=self.indptr[1:])
+
+    def neighbors(self, frontier: np.ndarray) -> np.ndarray:
+        """Nodes one expandable edge away from any node in ``frontier``."""
+        parts = []
+        for node in frontier:
+            start, end = self.indptr[node], self.indptr[node + 1]
+            parts.append(self.indices[start:end][self.expandable[start:end]])
+        return np.unique(np.concatenate(parts)) if parts else frontier[:0]
+
+class CSRGraphStore(GraphStore):
+    """Embedded graph store over NumPy CSR adjacency arrays.
+
+    Nodes are addressed by dense integers and edges are kept as
+    ``(src, dst, type)`` arrays, compiled into an undirected CSR on the first
+    read after a write. Paper text is indexed with BM25 for
+    ``fulltext_search``. With a ``path``, ``commit`` (and ``close``) write
+    the store there, so it needs no server and survives restarts; ingests
+    only change memory, so a batch of them costs one save.
+    """
+
+    def __init__(self, path: Optional[Path] = None, schema: Optional[GraphSchema] = None):
+        self.path = Path(path) if path else None
+        self.schema = schema or GraphSchema()
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.properties: List[Dict[str, Any]] = []
+        self.label_names: List[str] = []
+        self.node_labels: List[int] = []
+        self.rel_types: List[str] = []
+        self.src = np.zeros(0, dtype=np.int32)
+        self.dst = np.zeros(0, dtype=np.int32)
+        self.types = np.zeros(0, dtype=np.int16)
+        self.text_index = BM25Index()
+        self._csr: Optional[_CSR] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: Path) -> "CSRGraphStore":
+        """Load the store under ``path``, or start an empty one that saves there."""
+        try:
+            return cls.load(path)
+        except FileNotFoundError:
+            logger.info(f"No embedded graph under {path}; starting empty")
+            return cls(path)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.src)
+
+    def transform(self, documents: List[Document],
+                  allowed_nodes: List[str],
+                  allowed_relationships: List[tuple]) -> List[GraphDocument]:
+        return documents_to_graph(documents)
+
+    @staticmethod
+    def _code(names: List[str], name: str) -> int:
+        try:
+            return names.index(name)
+        except ValueError:
+            names.append(name)
+            return len(names) - 1
+
+    def _upsert(self, node_id: str, label: str, properties: Dict[str, Any]) -> int:
+        node = self.index.get(node_id)
+        if node is None:
+            node = len(self.ids)
+            self.index[node_id] = node
+            self.ids.append(node_id)
+            self.properties.append({})
+            self.node_labels.append(self._code(self.label_names, label))
+        # Same semantics as MERGE ... SET n += properties.
+        self.properties[node].update(properties)
+        return node
+
+    def ingest(self, graph_docs: List[GraphDocument], **kwargs) -> Dict[str, float]:
+        """Merge nodes and relationships; extra keyword arguments are accepted for parity with Neo4j."""
+        start = time.perf_counter()
+        with self._lock:
+            texts: Dict[str, str] = {}
+            node_count = 0
+            for doc in graph_docs:
+                for node in doc.nodes:
+                    self._upsert(node.id, node.type, node.properties)
+                    node_count += 1
+                    if node.type == "Paper":
+                        props = self.properties[self.index[node.id]]
+                        texts[node.id] = f"{props.get('title', '')}\n{props.get('content', '')}"
+
+            src, dst, types = [], [], []
+            for doc in graph_docs:
+                for rel in doc.relationships:
+                    source = self.index.get(rel.source)
+                    if source is None:
+                        continue
+                    target = self.index.get(rel.target)
+                    if target is None:
+                        # Citation of a paper that is not ingested yet: keep a stub, like MERGE does.
+                        declared = self.schema.endpoints(rel.type)
+                        if declared is None:
+                            continue
+                        target = self._upsert(rel.target, declared[1], {})
+                    src.append(source)
+                    dst.append(target)
+                    types.append(self._code(self.rel_types, rel.type))
+            before = self.n_edges
+            self._add_edges(np.asarray(src, dtype=np.int32), np.asarray(dst, dtype=np.int32),
+                            np.asarray(types, dtype=np.int16))
+            rel_count = self.n_edges - before
+
+            if texts:
+                # Re-ingested nodes replace their previous text.
+                self.text_index.add(list(texts.keys()), texts.values())
+            self._csr = None
+            self._dirty = True
+        seconds = time.perf_counter() - start
+        stats = {
+            'nodes': node_count,
+            'relationships': rel_count,
+            'seconds': seconds,
+            'nodes_per_sec': node_count / max(seconds, 1e-9),
+            'rels_per_sec': rel_count / max(seconds, 1e-9),
+        }
+        logger.info(f"Ingested {len(graph_docs)} graph documents: {node_count} nodes, {rel_count} new relationships")
+        return stats
+
+    def _add_edges(self, src: np.ndarray, dst: np.ndarray, types: np.ndarray) -> None:
+        """Append edges, dropping duplicates so repeated ingests stay idempotent."""
+        edges = np.stack([
+            np.concatenate([self.src, src]),
+            np.concatenate([self.dst, dst]),
+            np.concatenate([self.types, types]).astype(np.int32),
+        ], axis=1)
+        _, first = np.unique(edges, axis=0, return_index=True)
+        edges = edges[np.sort(first)]
+        self.src = edges[:, 0].astype(np.int32)
+        self.dst = edges[:, 1].astype(np.int32)
+        self.types = edges[:, 2].astype(np.int16)
+
+    def _adjacency(self) -> _CSR:
+        csr = self._csr
+        if csr is None:
+            with self._lock:
+                if self._csr is None:
+                    expandable = [self.rel_types.index(t) for t in EXPANDABLE if t in self.rel_types]
+                    self._csr = _CSR(len(self.ids), self.src, self.dst, self.types, np.asarray(expandable, dtype=np.int16))
+                csr = self._csr
+        return csr
+
+    def expand(self, seed_ids: List[str], max_hops: int = 2, per_seed: int = 25) -> Dict[str, List[Dict[str, Any]]]:
+        """Breadth-first neighborhoods over CITES/RELATED_TO, matching the Neo4j store's output."""
+        csr = self._adjacency()
+        neighborhoods: Dict[str, List[Dict[str, Any]]] = {}
+        for seed in seed_ids:
+            found: List[Tuple[int, int]] = []
+            node = self.index.get(seed)
+            if node is not None:
+                seen = np.asarray([node])
+                frontier = seen
+                for hops in range(1, max_hops + 1):
+                    frontier = csr.neighbors(frontier)
+                    frontier = frontier[~np.isin(frontier, seen)]
+                    if not len(frontier):
+                        break
+                    found.extend((int(n), hops) for n in frontier[:per_seed - len(found)])
+                    if len(found) >= per_seed:
+                        break
+                    seen = np.concatenate([seen, frontier])
+            neighborhoods[seed] = [
+                {
+                    'id': self.ids[n],
+                    'title': self.properties[n].get('title'),
+                    'published': self.properties[n].get('published'),
+                    'hops': hops,
+                }
+                for n, hops in found
+            ]
+        return neighborhoods
+
+    def fulltext_search(self, text: str, k: int = 5) -> List[Dict[str, Any]]:
+        """BM25 over paper titles and content; records mirror the Neo4j store's."""
+        return [
+            {'n': {'id': node_id, **self.properties[self.index[node_id]]}, 'score': score}
+            for node_id, score in self.text_index.search(text, k=k)
+        ]
+
+    def citation_edges(self) -> Tuple[List[str], List[Optional[str]], np.ndarray, np.ndarray]:
+        """Paper ids and CITES edges re-indexed over papers only."""
+        labels = np.asarray(self.node_labels, dtype=np.int16)
+        papers = np.flatnonzero(labels == self.label_names.index("Paper")) if "Paper" in self.label_names else labels[:0]
+        remap = np.full(len(self.ids), -1, dtype=np.int64)
+        remap[papers] = np.arange(len(papers))
+        cites = self.types == self.rel_types.index("CITES") if "CITES" in self.rel_types else np.zeros(self.n_edges, bool)
+        return ([self.ids[i] for i in papers], [self.properties[i].get('title') for i in papers],
+                remap[self.src[cites]], remap[self.dst[cites]])
+
+    def query(self, query: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError("The embedded graph backend does not run Cypher; use expand() or fulltext_search()")
+
+    def commit(self) -> None:
+        """Save to ``path`` if anything was ingested since the last save."""
+        if self.path and self._dirty:
+            self.save(self.path)
+
+    def save(self, path: Path) -> None:
+        """Write adjacency arrays, node table and text index under ``path``."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if path == self.path:
+                self._dirty = False
+            tmp = path / "edges.tmp.npz"
+            np.savez(tmp, src=self.src, dst=self.dst, types=self.types)
+            os.replace(tmp, path / "edges.npz")
+            tmp = path / "nodes.json.tmp"
+            with open(tmp, "w") as f:
+                json.dump({
+                    "ids": self.ids,
+                    "labels": self.label_names,
+                    "node_labels": self.node_labels,
+                    "rel_types": self.rel_types,
+                    "properties": self.properties,
+                }, f)
+            os.replace(tmp, path / "nodes.json")
+            self.text_index.save(path / "text")
+        logger.info(f"Saved embedded graph ({len(self.ids)} nodes, {self.n_edges} edges) to {path}")
+
+    @classmethod
+    def load(cls, path: Path) -> "CSRGraphStore":
+        path = Path(path)
+        if not (path / "nodes.json").exists():
+            raise FileNotFoundError(path)
+        store = cls(path)
+        with open(path / "nodes.json") as f:
+            nodes = json.load(f)
+        store.ids = nodes["ids"]
+        store.index = {node_id: i for i, node_id in enumerate(store.ids)}
+        store.label_names = nodes["labels"]
+        store.node_labels = nodes["node_labels"]
+        store.rel_types = nodes["rel_types"]
+        store.properties = nodes["properties"]
+        edges = np.load(path / "edges.npz")
+        store.src, store.dst, store.types = edges["src"], edges["dst"], edges["types"]
+        try:
+            store.text_index = BM25Index.load(path / "text")
+        except FileNotFoundError:
+            pass
+        logger.info(f"Loaded embedded graph ({len(store.ids)} nodes, {store.n_edges} edges) from {path}")
+        return store
+
+    def close(self) -> None:
+        """Save uncommitted ingests; there is nothing else to release."""
+        self.commit()
@@ -0,0 +1,195 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from common.logger import logger
+from storage.embedding_executor import supports_streaming
+
+__all__ = ["EmbeddingCache", "CachedEmbeddings", "text_digest"]
+
+def text_digest(text: str) -> str:
+    """SHA-256 of the exact chunk text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """Persistent, size-bounded cache of float32 embeddings.
+
+    Entries are keyed by (embedding model, dimensions, sha256 of the text) so
+    byte-identical chunks are only ever embedded once per model. Vectors are
+    stored as raw float32 blobs in SQLite; once the cache grows past
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 2 * 1024 ** 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, dims, digest)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, dims: int, digests: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up vectors by text digest; missing entries come back as None."""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(digests))
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE model = ? AND dims = ? AND digest IN ({placeholders})",
+                    (model, dims, *batch),
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND dims = ? AND digest = ?",
+                    [(now, model, dims, digest) for digest in found],
+                )
+                self._conn.commit()
+            results = [found.get(digest) for digest in digests]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, dims: int, digests: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for the given digests, evicting old entries if needed."""
+        now = time.time()
+        rows = []
+        for digest, vector in zip(digests, vectors):
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((model, dims, digest, blob, now))
+        with self._lock:
+            for model_, dims_, digest, blob, _ in rows:
+                existing = self._conn.execute(
+                    "SELECT LENGTH(vector) FROM embeddings WHERE model = ? AND dims = ? AND digest = ?",
+                    (model_, dims_, digest),
+                ).fetchone()
+                self._bytes += len(blob) - (existing[0] if existing else 0)
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits ``max_bytes``."""
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT model, dims, digest, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                self._bytes = 0
+                return
+            victims = []
+            for model, dims, digest, size in rows:
+                victims.append((model, dims, digest))
+                self._bytes -= size
+                if self._bytes <= self.max_bytes:
+                    break
+            self._conn.executemany("DELETE FROM embeddings WHERE model = ? AND dims = ? AND digest = ?", victims)
+            self.evictions += len(victims)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": self._bytes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends cache misses to the underlying model."""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model: str, dimensions: Optional[int] = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+        # 0 stands for "model default" so the key stays a plain integer.
+        self.dimensions = dimensions or 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        digests = [text_digest(t) for t in texts]
+        cached = self.cache.get_many(self.model, self.dimensions, digests)
+
+        # Embed each distinct missing text once, even if repeated in the batch.
+        missing: Dict[str, str] = {}
+        for digest, text, vector in zip(digests, texts, cached):
+            if vector is None and digest not in missing:
+                missing[digest] = text
+        fresh: Dict[str, List[float]] = {}
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model, self.dimensions, list(fresh.keys()), list(fresh.values()))
+            logger.info(f"Embedded {len(missing)} new chunks ({len(texts) - len(missing)} served from cache)")
+
+        return [
+            vector.tolist() if vector is not None else list(fresh[digest])
+            for digest, vector in zip(digests, cached)
+        ]
+
+    def iter_embeddings(self, texts: Sequence[str]) -> Iterator[Tuple[List[int], np.ndarray]]:
+        """Yield ``(positions, vectors)``: cache hits first, then misses as they are embedded.
+
+        Each batch of misses is written to the cache as soon as it arrives, so
+        an interrupted build keeps everything embedded so far.
+        """
+        digests = [text_digest(t) for t in texts]
+        cached = self.cache.get_many(self.model, self.dimensions, digests)
+        hits = [i for i, vector in enumerate(cached) if vector is not None]
+        if hits:
+            yield hits, np.stack([cached[i] for i in hits])
+
+        missing: Dict[str, List[int]] = {}
+        for i, (digest, vector) in enumerate(zip(digests, cached)):
+            if vector is None:
+                missing.setdefault(digest, []).append(i)
+        if not missing:
+            return
+        order = list(missing)
+        pending = [texts[missing[digest][0]] for digest in order]
+        if supports_streaming(self.embeddings):
+            batches = self.embeddings.iter_embeddings(pending)
+        else:
+            batches = [(list(range(len(pending))), np.asarray(self.embeddings.embed_documents(pending), dtype=np.float32))]
+        for positions, vectors in batches:
+            batch_digests = [order[p] for p in positions]
+            self.cache.put_many(self.model, self.dimensions, batch_digests, vectors)
+            rows = [k for k, digest in enumerate(batch_digests) for _ in missing[digest]]
+            yield [i for digest in batch_digests for i in missing[digest]], vectors[rows]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
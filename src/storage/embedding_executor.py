@@ -0,0 +1,260 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import openai
+from langchain_core.embeddings import Embeddings
+from common.config import settings
+from common.logger import logger
+
+__all__ = ["EmbeddingExecutor", "TokenBudget", "pack_batches", "supports_streaming"]
+
+# Errors worth retrying: throttling, timeouts, dropped connections and server faults.
+_RETRYABLE = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+def _token_counter(model: str) -> Tuple[Callable[[str], int], Optional[Callable[[str, int], str]]]:
+    """Exact counts via tiktoken when its encoding is available, else ~4 chars per token."""
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable ({type(e).__name__}); estimating tokens from text length")
+        return (lambda text: len(text) // 4 + 1), None
+
+    def truncate(text: str, limit: int) -> str:
+        return encoding.decode(encoding.encode_ordinary(text)[:limit])
+
+    return (lambda text: len(encoding.encode_ordinary(text))), truncate
+
+def supports_streaming(embeddings: Embeddings) -> bool:
+    """Whether ``embeddings`` can yield vectors batch by batch via ``iter_embeddings``."""
+    return callable(getattr(type(embeddings), "iter_embeddings", None))
+
+def pack_batches(token_counts: Sequence[int], max_tokens: int, max_inputs: int) -> List[List[int]]:
+    """Greedily group text positions so each batch stays within both limits."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, tokens in enumerate(token_counts):
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+class TokenBudget:
+    """Tokens-per-minute bucket shared by every request of an executor.
+
+    Holds up to one minute of tokens and refills continuously. ``hold``
+    blocks all callers for a while, e.g. when the server asks to retry later.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: int) -> None:
+        tokens = min(float(tokens), self.capacity)
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    self._cond.wait(self.blocked_until - now)
+                elif self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                else:
+                    self._cond.wait((tokens - self.tokens) / self.rate)
+
+    def hold(self, seconds: float) -> None:
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class EmbeddingExecutor(Embeddings):
+    """Batches, budgets and retries embedding requests to an OpenAI-compatible API.
+
+    Texts are packed into requests by token count (``batch_tokens`` and
+    ``batch_inputs`` per request). Up to ``max_concurrency`` requests are in
+    flight across all callers, under a shared ``tokens_per_minute`` budget.
+    A failed request is retried on its own with exponential backoff,
+    honouring ``Retry-After``, so one 429 does not fail a whole build.
+    ``iter_embeddings`` yields vectors batch by batch as requests complete,
+    so callers can write them out incrementally.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        api_key: str,
+        base_url: Optional[str] = None,
+        dimensions: Optional[int] = None,
+        max_concurrency: int = 4,
+        tokens_per_minute: int = 1_000_000,
+        batch_tokens: int = 50_000,
+        batch_inputs: int = 2048,
+        max_input_tokens: int = 8191,
+        max_retries: int = 6,
+        timeout_s: float = 60.0,
+    ):
+        self.model = model
+        self.dimensions = dimensions
+        self.batch_tokens = batch_tokens
+        self.batch_inputs = batch_inputs
+        self.max_input_tokens = max_input_tokens
+        self.max_retries = max_retries
+        # Retries are ours: the SDK's own would bypass the shared budget.
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout_s)
+        self.budget = TokenBudget(tokens_per_minute)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embed")
+        self._count, self._truncate = _token_counter(model)
+        self._lock = threading.Lock()
+        self._stats = {"texts": 0, "tokens": 0, "requests": 0, "retries": 0}
+        self._first_start: Optional[float] = None
+        self._last_end: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls) -> "EmbeddingExecutor":
+        return cls(
+            model=settings.embedding_model,
+            api_key=settings.openai_api_key,
+            base_url=settings.embedding_base_url,
+            dimensions=settings.embedding_dimensions,
+            max_concurrency=settings.embedding_max_concurrency,
+            tokens_per_minute=settings.embedding_tokens_per_minute,
+            batch_tokens=settings.embedding_batch_tokens,
+            max_retries=settings.embedding_max_retries,
+            timeout_s=settings.embedding_timeout_s,
+        )
+
+    def _prepare(self, texts: Sequence[str]) -> Tuple[List[str], List[int]]:
+        prepared, counts = [], []
+        for text in texts:
+            # The API rejects empty strings.
+            text = text or " "
+            tokens = self._count(text)
+            if tokens > self.max_input_tokens:
+                logger.warning(f"Truncating a {tokens}-token input to {self.max_input_tokens} tokens")
+                text = self._truncate(text, self.max_input_tokens) if self._truncate else text[:self.max_input_tokens * 4]
+                tokens = self.max_input_tokens
+            prepared.append(text)
+            counts.append(tokens)
+        return prepared, counts
+
+    def _request(self, texts: List[str], tokens: int) -> np.ndarray:
+        """One embeddings call, retried with backoff on transient errors."""
+        kwargs = {"dimensions": self.dimensions} if self.dimensions else {}
+        attempt = 0
+        while True:
+            self.budget.acquire(tokens)
+            with self._slots:
+                start = time.perf_counter()
+                try:
+                    response = self.client.embeddings.create(
+                        model=self.model, input=texts, encoding_format="float", **kwargs
+                    )
+                except _RETRYABLE as e:
+                    if attempt == self.max_retries:
+                        raise Exception(f"Error embedding batch of {len(texts)} texts: {str(e)}")
+                    error = e
+                else:
+                    break
+            attempt += 1
+            delay = self._retry_after(error) or min(60.0, 2 ** attempt) * (0.5 + random.random())
+            if isinstance(error, openai.RateLimitError):
+                self.budget.hold(delay)
+            with self._lock:
+                self._stats["retries"] += 1
+            logger.warning(f"Embedding request failed ({type(error).__name__}); retry {attempt} in {delay:.1f}s")
+            time.sleep(delay)
+
+        vectors = np.asarray(
+            [item.embedding for item in sorted(response.data, key=lambda item: item.index)], dtype=np.float32
+        )
+        with self._lock:
+            self._stats["texts"] += len(texts)
+            self._stats["tokens"] += response.usage.total_tokens if response.usage else tokens
+            self._stats["requests"] += 1
+            self._first_start = self._first_start or start
+            self._last_end = time.perf_counter()
+        return vectors
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        headers = response.headers
+        try:
+            if "retry-after-ms" in headers:
+                return float(headers["retry-after-ms"]) / 1000.0
+            if "retry-after" in headers:
+                return float(headers["retry-after"])
+        except ValueError:
+            return None
+        return None
+
+    def iter_embeddings(self, texts: Sequence[str]) -> Iterator[Tuple[List[int], np.ndarray]]:
+        """Yield ``(positions, vectors)`` per request, in completion order."""
+        prepared, counts = self._prepare(texts)
+        batches = pack_batches(counts, self.batch_tokens, self.batch_inputs)
+        futures = {
+            self._pool.submit(self._request, [prepared[i] for i in batch], sum(counts[i] for i in batch)): batch
+            for batch in batches
+        }
+        try:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = futures.pop(future)
+                    yield batch, future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        start = time.perf_counter()
+        out: Optional[np.ndarray] = None
+        for positions, vectors in self.iter_embeddings(texts):
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[positions] = vectors
+        elapsed = time.perf_counter() - start
+        logger.info(f"Embedded {len(texts)} texts in {elapsed:.1f}s ({self.stats()['tokens_per_sec']:.0f} tokens/s overall)")
+        return out.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        prepared, counts = self._prepare([text])
+        return self._request(prepared, counts[0])[0].tolist()
+
+    def stats(self) -> Dict[str, float]:
+        """Totals so far, with throughput over the time requests were running."""
+        with self._lock:
+            stats = dict(self._stats)
+            elapsed = (self._last_end - self._first_start) if self._first_start and self._last_end else 0.0
+        stats["seconds"] = elapsed
+        stats["tokens_per_sec"] = stats["tokens"] / elapsed if elapsed > 0 else 0.0
+        return stats
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
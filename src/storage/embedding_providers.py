@@ -0,0 +1,37 @@
+from typing import Callable, Dict, Optional
+from langchain_core.embeddings import Embeddings
+from common.config import settings
+from rag_common.hashing_embeddings import HashingEmbeddings
+
+__all__ = ["HashingEmbeddings", "EMBEDDING_PROVIDERS", "embeddings_from_settings"]
+
+def _openai(model: Optional[str]) -> Embeddings:
+    from storage.embedding_executor import EmbeddingExecutor
+
+    executor = EmbeddingExecutor.from_settings()
+    if model:
+        executor.model = model
+    return executor
+
+def _hashing(model: Optional[str]) -> Embeddings:
+    return HashingEmbeddings(
+        dimensions=settings.hashing_embedding_dimensions,
+        ngrams=settings.hashing_embedding_ngrams,
+        seed=settings.hashing_embedding_seed,
+    )
+
+# Provider name (``settings.embedding_provider``) -> factory taking an optional model override.
+EMBEDDING_PROVIDERS: Dict[str, Callable[[Optional[str]], Embeddings]] = {
+    "openai": _openai,
+    "hashing": _hashing,
+}
+
+def embeddings_from_settings(model: Optional[str] = None) -> Embeddings:
+    """The embedding backend selected by ``settings.embedding_provider``."""
+    try:
+        factory = EMBEDDING_PROVIDERS[settings.embedding_provider]
+    except KeyError:
+        raise ValueError(
+            f"Unknown embedding provider: {settings.embedding_provider!r} (expected one of {sorted(EMBEDDING_PROVIDERS)})"
+        )
+    return factory(model)
@@ -0,0 +1,61 @@
+from typing import List
+from common.interfaces import Document
+from common.models import GraphNode, GraphRelationship, GraphDocument
+from common.ids import paper_id, author_id, reference_id, parse_arxiv_id
+
+__all__ = ["documents_to_graph"]
+
+def documents_to_graph(documents: List[Document]) -> List[GraphDocument]:
+    """Paper, author and citation nodes/relationships shared by all graph stores."""
+    graph_docs = []
+    
+    for doc in documents:
+        nodes = []
+        relationships = []
+        
+        # Create paper node
+        paper_node = GraphNode(
+            id=doc.metadata.get('paper_id') or paper_id(doc.metadata, doc.content),
+            type='Paper',
+            properties={
+                'title': doc.metadata.get('title', ''),
+                'arxiv_id': parse_arxiv_id(str(doc.metadata.get('id') or '')) or '',
+                'content': doc.content,
+                'source': doc.metadata.get('source', ''),
+                'published': doc.metadata.get('published', '')
+            }
+        )
+        nodes.append(paper_node)
+        
+        # Create author nodes and relationships
+        if 'authors' in doc.metadata:
+            for author in doc.metadata['authors']:
+                author_node = GraphNode(
+                    id=author_id(author),
+                    type='Author',
+                    properties={'name': author}
+                )
+                nodes.append(author_node)
+                
+                relationship = GraphRelationship(
+                    source=paper_node.id,
+                    target=author_node.id,
+                    type='WRITTEN_BY',
+                    properties={}
+                )
+                relationships.append(relationship)
+        
+        # Create citation relationships
+        if 'citations' in doc.metadata:
+            for citation in doc.metadata['citations']:
+                relationship = GraphRelationship(
+                    source=paper_node.id,
+                    target=reference_id(citation),
+                    type='CITES',
+                    properties={}
+                )
+                relationships.append(relationship)
+        
+        graph_docs.append(GraphDocument(nodes=nodes, relationships=relationships))
+    
+    return graph_docs
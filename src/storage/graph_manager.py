@@ -1,15 +1,82 @@
-from typing import List, Dict, Any, Optional
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 from neo4j import GraphDatabase
 from common.interfaces import GraphStore, Document
-from common.models import GraphNode, GraphRelationship, GraphDocument
+from common.models import GraphDocument
+from common.config import settings
 from common.logger import logger
+from storage.graph_schema import GraphSchema, quote_identifier
+from storage.graph_documents import documents_to_graph
+from storage.csr_graph import CSRGraphStore
+
+def _node_unwind(label: str) -> str:
+    return f"""
+UNWIND $rows AS row
+MERGE (n:{quote_identifier(label)} {{id: row.id}})
+SET n += row.properties
+"""
+
+def _relationship_unwind(rel_type: str, source_label: str, target_label: str) -> str:
+    # Targets are merged so citations of papers that are not ingested yet
+    # become stubs that a later ingest of that paper fills in.
+    return f"""
+UNWIND $rows AS row
+MATCH (source:{quote_identifier(source_label)} {{id: row.source}})
+MERGE (target:{quote_identifier(target_label)} {{id: row.target}})
+MERGE (source)-[r:{quote_identifier(rel_type)}]->(target)
+SET r += row.properties
+"""
+
+_FULLTEXT_QUERY = """
+CALL db.index.fulltext.queryNodes($index, $query, {limit: $k})
+YIELD node, score
+RETURN node AS n, score
+ORDER BY score DESC
+LIMIT $k
+"""
+
+# One round trip for all seeds; the subquery keeps the per-seed limit and
+# collapses multiple paths to the shortest hop distance.
+_EXPAND_QUERY = """
+UNWIND $seeds AS seed
+CALL {{
+    WITH seed
+    MATCH (p:Paper {{id: seed}})-[rels:CITES|RELATED_TO*1..{max_hops}]-(r:Paper)
+    WHERE r.id <> seed
+    WITH r, min(size(rels)) AS hops
+    RETURN r, hops
+    ORDER BY hops
+    LIMIT $per_seed
+}}
+RETURN seed, r.id AS id, r.title AS title, r.published AS published, hops
+"""
+
+_LUCENE_SPECIAL_RE = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+def escape_lucene(text: str) -> str:
+    """Make free text safe for the Lucene query parser.
+
+    Operators and special characters are escaped and the text is lower-cased
+    so words like AND/OR/NOT are searched for rather than parsed.
+    """
+    return _LUCENE_SPECIAL_RE.sub(r"\\\1", text.lower())
+
+def _batches(rows: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]:
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
 
 class Neo4jGraphStore(GraphStore):
     """Concrete implementation of GraphStore using Neo4j."""
     
-    def __init__(self, uri: str, user: str, password: str):
+    def __init__(self, uri: str, user: str, password: str, schema: Optional[GraphSchema] = None):
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.schema = schema or GraphSchema.from_settings()
         self._verify_connection()
+        if settings.graph_apply_schema:
+            self.schema.apply(self.driver)
     
     def _verify_connection(self) -> None:
         """Verify the connection to the Neo4j database."""
@@ -24,90 +91,86 @@ class Neo4jGraphStore(GraphStore):
                  allowed_nodes: List[str],
                  allowed_relationships: List[tuple]) -> List[GraphDocument]:
         """Transform documents into graph format."""
-        graph_docs = []
+        return documents_to_graph(documents)
+    
+    def ingest(self, graph_docs: List[GraphDocument],
+               batch_size: Optional[int] = None,
+               workers: Optional[int] = None) -> Dict[str, float]:
+        """Ingest graph documents into the database.
+        
+        Nodes are grouped by label and relationships by type and endpoint
+        labels, and written with parameterized ``UNWIND $rows`` statements, one explicit transaction
+        per batch, spread over ``workers`` parallel sessions. All nodes are
+        written before any relationship so endpoints always exist.
+        """
+        batch_size = batch_size or settings.graph_batch_size
+        workers = workers or settings.graph_writer_workers
+        start = time.perf_counter()
+        
+        nodes_by_label: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        labels: Dict[str, str] = {}
+        for doc in graph_docs:
+            for node in doc.nodes:
+                # Later duplicates win, as they would with sequential MERGE + SET.
+                nodes_by_label[node.type][node.id] = {'id': node.id, 'properties': node.properties}
+                labels[node.id] = node.type
         
-        for doc in documents:
-            nodes = []
-            relationships = []
-            
-            # Create paper node
-            paper_node = GraphNode(
-                id=doc.metadata.get('id', str(hash(doc.content))),
-                type='Paper',
-                properties={
-                    'title': doc.metadata.get('title', ''),
-                    'content': doc.content,
-                    'source': doc.metadata.get('source', '')
-                }
-            )
-            nodes.append(paper_node)
-            
-            # Create author nodes and relationships
-            if 'authors' in doc.metadata:
-                for author in doc.metadata['authors']:
-                    author_node = GraphNode(
-                        id=f"author_{hash(author)}",
-                        type='Author',
-                        properties={'name': author}
-                    )
-                    nodes.append(author_node)
-                    
-                    relationship = GraphRelationship(
-                        source=paper_node.id,
-                        target=author_node.id,
-                        type='WRITTEN_BY',
-                        properties={}
-                    )
-                    relationships.append(relationship)
-            
-            # Create citation relationships
-            if 'citations' in doc.metadata:
-                for citation in doc.metadata['citations']:
-                    relationship = GraphRelationship(
-                        source=paper_node.id,
-                        target=citation,
-                        type='CITES',
-                        properties={}
-                    )
-                    relationships.append(relationship)
-            
-            graph_docs.append(GraphDocument(nodes=nodes, relationships=relationships))
+        rels_by_shape: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for doc in graph_docs:
+            for rel in doc.relationships:
+                declared = self.schema.endpoints(rel.type) or (None, None)
+                source_label = labels.get(rel.source) or declared[0]
+                target_label = labels.get(rel.target) or declared[1]
+                if not source_label or not target_label:
+                    logger.warning(f"Skipping {rel.type} relationship with unknown endpoint labels")
+                    continue
+                rels_by_shape[(rel.type, source_label, target_label)].append(
+                    {'source': rel.source, 'target': rel.target, 'properties': rel.properties}
+                )
         
-        return graph_docs
+        node_batches = [
+            (_node_unwind(label), {'rows': batch})
+            for label, rows in nodes_by_label.items()
+            for batch in _batches(list(rows.values()), batch_size)
+        ]
+        rel_batches = [
+            (_relationship_unwind(*shape), {'rows': batch})
+            for shape, rows in rels_by_shape.items()
+            for batch in _batches(rows, batch_size)
+        ]
+        node_count = self._write_batches(node_batches, workers)
+        nodes_done = time.perf_counter()
+        rel_count = self._write_batches(rel_batches, workers)
+        end = time.perf_counter()
+        
+        stats = {
+            'nodes': node_count,
+            'relationships': rel_count,
+            'seconds': end - start,
+            'nodes_per_sec': node_count / max(nodes_done - start, 1e-9),
+            'rels_per_sec': rel_count / max(end - nodes_done, 1e-9),
+        }
+        logger.info(
+            f"Ingested {len(graph_docs)} graph documents: {node_count} nodes "
+            f"({stats['nodes_per_sec']:.0f}/s), {rel_count} relationships ({stats['rels_per_sec']:.0f}/s)"
+        )
+        return stats
     
-    def ingest(self, graph_docs: List[GraphDocument]) -> None:
-        """Ingest graph documents into the database."""
-        with self.driver.session() as session:
-            for doc in graph_docs:
-                # Create nodes
-                for node in doc.nodes:
-                    session.run(
-                        """
-                        MERGE (n:Node {id: $id})
-                        SET n.type = $type,
-                            n.properties = $properties
-                        """,
-                        id=node.id,
-                        type=node.type,
-                        properties=node.properties
-                    )
-                
-                # Create relationships
-                for rel in doc.relationships:
-                    session.run(
-                        """
-                        MATCH (source:Node {id: $source_id})
-                        MATCH (target:Node {id: $target_id})
-                        MERGE (source)-[r:RELATIONSHIP {type: $rel_type}]->(target)
-                        SET r.properties = $properties
-                        """,
-                        source_id=rel.source,
-                        target_id=rel.target,
-                        rel_type=rel.type,
-                        properties=rel.properties
-                    )
+    def _write_batches(self, batches: List[Tuple[str, Dict[str, Any]]], workers: int) -> int:
+        """Run each batch in its own write transaction across parallel sessions."""
+        if not batches:
+            return 0
+        
+        def write(batch: Tuple[str, Dict[str, Any]]) -> int:
+            statement, params = batch
+            with self.driver.session() as session:
+                session.execute_write(lambda tx: tx.run(statement, **params).consume())
+            return len(params['rows'])
         
-        logger.info(f"Ingested {len(graph_docs)} graph documents")
+        if workers <= 1:
+            return sum(write(batch) for batch in batches)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return sum(pool.map(write, batches))
     
     def query(self, query: str) -> List[Dict[str, Any]]:
         """Execute a Cypher query."""
@@ -118,7 +181,67 @@ class Neo4jGraphStore(GraphStore):
         except Exception as e:
             raise Exception(f"Error executing query: {str(e)}")
     
+    def fulltext_search(self, text: str, k: int = 5, index: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Scored full-text lookup; returns records with the node ``n`` and its ``score``."""
+        query = escape_lucene(text)
+        if not query.strip():
+            return []
+        return self.cypher(_FULLTEXT_QUERY, {
+            'index': index or settings.graph_fulltext_index,
+            'query': query,
+            'k': k,
+        })
+    
+    def expand(self, seed_ids: List[str], max_hops: int = 2, per_seed: int = 25) -> Dict[str, List[Dict[str, Any]]]:
+        """Citation/relatedness neighborhoods of several papers in one query.
+        
+        Returns ``{seed id: [{id, title, published, hops}, ...]}`` with an
+        entry (possibly empty) for every seed.
+        """
+        neighborhoods: Dict[str, List[Dict[str, Any]]] = {seed: [] for seed in seed_ids}
+        if not seed_ids:
+            return neighborhoods
+        query = _EXPAND_QUERY.format(max_hops=int(max_hops))
+        for record in self.cypher(query, {'seeds': list(seed_ids), 'per_seed': per_seed}):
+            seed = record.pop('seed')
+            neighborhoods[seed].append(record)
+        return neighborhoods
+    
+    def citation_edges(self) -> Tuple[List[str], List[Optional[str]], np.ndarray, np.ndarray]:
+        """Export papers and CITES edges for batch scoring and in-memory walks."""
+        papers = self.cypher("MATCH (p:Paper) RETURN p.id AS id, p.title AS title")
+        ids = [record['id'] for record in papers]
+        titles = [record['title'] for record in papers]
+        index = {paper: i for i, paper in enumerate(ids)}
+        edges = self.cypher("MATCH (a:Paper)-[:CITES]->(b:Paper) RETURN a.id AS source, b.id AS target")
+        src = np.fromiter((index[e['source']] for e in edges), dtype=np.int64, count=len(edges))
+        dst = np.fromiter((index[e['target']] for e in edges), dtype=np.int64, count=len(edges))
+        return ids, titles, src, dst
+    
+    def cypher(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Execute a parameterized Cypher query."""
+        try:
+            with self.driver.session() as session:
+                result = session.run(query, params or {})
+                return [dict(record) for record in result]
+        except Exception as e:
+            raise Exception(f"Error executing query: {str(e)}")
+    
     def close(self) -> None:
         """Close the database connection."""
         self.driver.close()
-        logger.info("Closed Neo4j connection")
\ No newline at end of file
+        logger.info("Closed Neo4j connection")
+
+class GraphManager(Neo4jGraphStore):
+    """Neo4j graph store configured from application settings."""
+    
+    def __init__(self):
+        super().__init__(settings.neo4j_uri, settings.neo4j_user, settings.neo4j_password)
+
+def create_graph_store() -> GraphStore:
+    """Graph backend selected by ``settings.graph_backend``."""
+    if settings.graph_backend == "embedded":
+        return CSRGraphStore.open(settings.graph_embedded_path)
+    if settings.graph_backend == "neo4j":
+        return GraphManager()
+    raise ValueError(f"Unknown graph backend: {settings.graph_backend!r} (expected 'neo4j' or 'embedded')")
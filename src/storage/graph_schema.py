@@ -0,0 +1,101 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from common.config import settings
+from common.logger import logger
+
+__all__ = ["GraphSchema", "quote_identifier"]
+
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_ANALYZER_RE = re.compile(r"^[a-z0-9_\-]+$")
+
+_SHOW_FULLTEXT = "SHOW FULLTEXT INDEXES YIELD name, options WHERE name = $name RETURN options"
+
+def quote_identifier(name: str) -> str:
+    """Backtick-quote a label or relationship type after validating it.
+
+    Labels and relationship types cannot be query parameters, so they are
+    interpolated into Cypher; only plain identifiers are accepted.
+    """
+    if not _IDENTIFIER_RE.match(name):
+        raise ValueError(f"Invalid graph identifier: {name!r}")
+    return f"`{name}`"
+
+@dataclass
+class GraphSchema:
+    """Labels, typed relationships, constraints and indexes of the graph.
+
+    Every label gets a uniqueness constraint on ``id`` (which also backs
+    ``MERGE`` with an index seek); ``indexes`` adds range indexes on lookup
+    properties. ``relationships`` declares each type's endpoint labels so
+    ingest can match endpoints by label even when they are not in the batch.
+    """
+    labels: Tuple[str, ...] = ("Paper", "Author")
+    relationships: Dict[str, Tuple[str, str]] = field(default_factory=lambda: {
+        "WRITTEN_BY": ("Paper", "Author"),
+        "CITES": ("Paper", "Paper"),
+        "RELATED_TO": ("Paper", "Paper"),
+    })
+    indexes: Dict[str, Tuple[str, ...]] = field(default_factory=lambda: {
+        "Paper": ("title", "arxiv_id"),
+        "Author": ("name",),
+    })
+    fulltext: Dict[str, Tuple[str, Tuple[str, ...]]] = field(default_factory=lambda: {
+        "paper_text": ("Paper", ("title", "content")),
+    })
+    fulltext_analyzer: str = "english"
+
+    @classmethod
+    def from_settings(cls) -> "GraphSchema":
+        return cls(fulltext={settings.graph_fulltext_index: ("Paper", ("title", "content"))},
+                   fulltext_analyzer=settings.graph_fulltext_analyzer)
+
+    def fulltext_statement(self, name: str) -> str:
+        if not _ANALYZER_RE.match(self.fulltext_analyzer):
+            raise ValueError(f"Invalid full-text analyzer: {self.fulltext_analyzer!r}")
+        label, properties = self.fulltext[name]
+        fields = ", ".join(f"n.{quote_identifier(prop)}" for prop in properties)
+        return (
+            f"CREATE FULLTEXT INDEX {quote_identifier(name)} IF NOT EXISTS "
+            f"FOR (n:{quote_identifier(label)}) ON EACH [{fields}] "
+            f"OPTIONS {{indexConfig: {{`fulltext.analyzer`: '{self.fulltext_analyzer}'}}}}"
+        )
+
+    def statements(self) -> List[str]:
+        """Idempotent DDL for all constraints and indexes."""
+        statements = []
+        for label in self.labels:
+            quoted = quote_identifier(label)
+            statements.append(
+                f"CREATE CONSTRAINT {label.lower()}_id IF NOT EXISTS "
+                f"FOR (n:{quoted}) REQUIRE n.id IS UNIQUE"
+            )
+        for label, properties in self.indexes.items():
+            quoted = quote_identifier(label)
+            for prop in properties:
+                statements.append(
+                    f"CREATE INDEX {label.lower()}_{prop} IF NOT EXISTS "
+                    f"FOR (n:{quoted}) ON (n.{quote_identifier(prop)})"
+                )
+        statements.extend(self.fulltext_statement(name) for name in self.fulltext)
+        return statements
+
+    def apply(self, driver) -> None:
+        """Create any missing constraints and indexes.
+
+        ``IF NOT EXISTS`` leaves an existing full-text index untouched, so one
+        built with a different analyzer is dropped first and rebuilt.
+        """
+        with driver.session() as session:
+            for name in self.fulltext:
+                record = session.run(_SHOW_FULLTEXT, name=name).single()
+                current = record["options"].get("indexConfig", {}).get("fulltext.analyzer") if record else None
+                if current and current != self.fulltext_analyzer:
+                    logger.info(f"Rebuilding full-text index {name}: analyzer {current} -> {self.fulltext_analyzer}")
+                    session.run(f"DROP INDEX {quote_identifier(name)} IF EXISTS").consume()
+            for statement in self.statements():
+                session.run(statement).consume()
+        logger.info(f"Graph schema applied ({len(self.labels)} labels, {len(self.relationships)} relationship types)")
+
+    def endpoints(self, rel_type: str) -> Optional[Tuple[str, str]]:
+        return self.relationships.get(rel_type)
@@ -0,0 +1,163 @@
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from common.config import settings
+from common.logger import logger
+from storage.embedding_executor import supports_streaming
+
+__all__ = ["IndexConfig", "INDEX_TYPES", "build_index", "configure_search", "faiss_store_from_texts", "faiss_store_from_vectors"]
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq", "sq8")
+
+# FAISS warns below ~39 training points per IVF centroid.
+_MIN_POINTS_PER_CENTROID = 39
+
+@dataclass
+class IndexConfig:
+    """Which FAISS index to build and how to search it."""
+    index_type: str = "flat"
+    train_sample: int = 100_000
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    ivf_nlist: int = 4096
+    ivf_nprobe: int = 16
+    pq_m: int = 64
+    pq_nbits: int = 8
+
+    @classmethod
+    def from_settings(cls) -> "IndexConfig":
+        return cls(
+            index_type=settings.vector_index_type,
+            train_sample=settings.vector_train_sample,
+            hnsw_m=settings.hnsw_m,
+            hnsw_ef_construction=settings.hnsw_ef_construction,
+            hnsw_ef_search=settings.hnsw_ef_search,
+            ivf_nlist=settings.ivf_nlist,
+            ivf_nprobe=settings.ivf_nprobe,
+            pq_m=settings.pq_m,
+            pq_nbits=settings.pq_nbits,
+        )
+
+def _create_index(dim: int, n_train: int, config: IndexConfig) -> faiss.Index:
+    if config.index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown vector index type '{config.index_type}', expected one of {INDEX_TYPES}")
+
+    if config.index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, config.hnsw_m)
+        index.hnsw.efConstruction = config.hnsw_ef_construction
+        return index
+    if config.index_type == "sq8":
+        return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit)
+    if config.index_type in ("ivf_flat", "ivf_pq"):
+        nlist = min(config.ivf_nlist, max(1, n_train // _MIN_POINTS_PER_CENTROID))
+        if nlist < config.ivf_nlist:
+            logger.warning(f"Only {n_train} training vectors; using nlist={nlist} instead of {config.ivf_nlist}")
+        quantizer = faiss.IndexFlatL2(dim)
+        if config.index_type == "ivf_flat":
+            return faiss.IndexIVFFlat(quantizer, dim, nlist)
+        if dim % config.pq_m != 0:
+            raise ValueError(f"pq_m={config.pq_m} must divide the embedding dimension {dim}")
+        if n_train < 2 ** config.pq_nbits:
+            logger.warning(f"Only {n_train} training vectors; too few for IVF-PQ, falling back to IVF-flat")
+            return faiss.IndexIVFFlat(quantizer, dim, nlist)
+        return faiss.IndexIVFPQ(quantizer, dim, nlist, config.pq_m, config.pq_nbits)
+    return faiss.IndexFlatL2(dim)
+
+def configure_search(index: faiss.Index, config: Optional[IndexConfig] = None) -> None:
+    """Apply query-time knobs (nprobe / efSearch) to a built or loaded index."""
+    config = config or IndexConfig.from_settings()
+    params = faiss.ParameterSpace()
+    if faiss.try_extract_index_ivf(index) is not None:
+        params.set_index_parameter(index, "nprobe", config.ivf_nprobe)
+    if isinstance(faiss.downcast_index(index), faiss.IndexHNSW):
+        params.set_index_parameter(index, "efSearch", config.hnsw_ef_search)
+
+def build_index(vectors: np.ndarray, config: Optional[IndexConfig] = None) -> faiss.Index:
+    """Build (and train on a sample, when the type needs it) an index over ``vectors``."""
+    config = config or IndexConfig.from_settings()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    n_train = min(n, config.train_sample)
+    index = _create_index(dim, n_train, config)
+
+    if not index.is_trained:
+        sample = vectors
+        if n > n_train:
+            rows = np.random.default_rng(0).choice(n, size=n_train, replace=False)
+            sample = vectors[np.sort(rows)]
+        logger.info(f"Training {config.index_type} index on {len(sample)} vectors")
+        index.train(sample)
+
+    for start in range(0, n, 100_000):
+        index.add(vectors[start:start + 100_000])
+    configure_search(index, config)
+    logger.info(f"Built {config.index_type} index with {index.ntotal} vectors")
+    return index
+
+def faiss_store_from_texts(
+    texts: List[str],
+    embeddings: Embeddings,
+    metadatas: Optional[List[Dict[str, Any]]] = None,
+    config: Optional[IndexConfig] = None,
+    ids: Optional[List[str]] = None,
+) -> FAISS:
+    """Drop-in for ``FAISS.from_texts`` that honours the configured index type.
+
+    With streaming embeddings and an index that needs no training, vectors
+    are added as each embedding batch completes instead of after the last.
+    """
+    config = config or IndexConfig.from_settings()
+    if supports_streaming(embeddings) and config.index_type in ("flat", "hnsw") and texts:
+        return _streamed_store(texts, embeddings, metadatas, config, ids)
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    return faiss_store_from_vectors(texts, vectors, embeddings, metadatas, config, ids)
+
+def _streamed_store(
+    texts: List[str],
+    embeddings: Embeddings,
+    metadatas: Optional[List[Dict[str, Any]]],
+    config: IndexConfig,
+    ids: Optional[List[str]],
+) -> FAISS:
+    metadatas = metadatas or [{} for _ in texts]
+    ids = ids or [str(uuid.uuid4()) for _ in texts]
+    index: Optional[faiss.Index] = None
+    order: List[int] = []
+    for positions, vectors in embeddings.iter_embeddings(texts):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if index is None:
+            index = _create_index(vectors.shape[1], 0, config)
+        index.add(vectors)
+        order.extend(positions)
+    configure_search(index, config)
+    logger.info(f"Built {config.index_type} index with {index.ntotal} vectors")
+    # Rows were added in completion order; map each back to its text.
+    docstore = InMemoryDocstore({
+        ids[i]: Document(page_content=texts[i], metadata=metadatas[i]) for i in order
+    })
+    return FAISS(embeddings, index, docstore, {row: ids[i] for row, i in enumerate(order)})
+
+def faiss_store_from_vectors(
+    texts: List[str],
+    vectors: np.ndarray,
+    embeddings: Embeddings,
+    metadatas: Optional[List[Dict[str, Any]]] = None,
+    config: Optional[IndexConfig] = None,
+    ids: Optional[List[str]] = None,
+) -> FAISS:
+    """Like ``faiss_store_from_texts`` for texts that are already embedded."""
+    index = build_index(vectors, config)
+    metadatas = metadatas or [{} for _ in texts]
+    ids = ids or [str(uuid.uuid4()) for _ in texts]
+    docstore = InMemoryDocstore({
+        id_: Document(page_content=text, metadata=metadata)
+        for id_, text, metadata in zip(ids, texts, metadatas)
+    })
+    return FAISS(embeddings, index, docstore, dict(enumerate(ids)))
@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from common.logger import logger
+
+__all__ = ["IngestManifest"]
+
+class IngestManifest:
+    """Record of which papers are ingested, at which content digest.
+
+    Maps paper id -> ``{"digest": ..., "chunks": [...]}`` so a re-run can skip
+    unchanged papers and knows which chunk ids to retire when one changes.
+    Persisted as JSON, written to a temp file and renamed into place.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path) as f:
+                self._entries = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._entries
+
+    def is_current(self, paper_id: str, digest: str) -> bool:
+        entry = self._entries.get(paper_id)
+        return entry is not None and entry["digest"] == digest
+
+    def chunk_ids(self, paper_id: str) -> List[str]:
+        entry = self._entries.get(paper_id)
+        return list(entry["chunks"]) if entry else []
+
+    def record(self, paper_id: str, digest: str, chunk_ids: Optional[List[str]] = None) -> None:
+        with self._lock:
+            self._entries[paper_id] = {"digest": digest, "chunks": list(chunk_ids or [])}
+
+    def forget(self, paper_id: str) -> None:
+        with self._lock:
+            self._entries.pop(paper_id, None)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with self._lock:
+            with open(tmp, "w") as f:
+                json.dump(self._entries, f)
+        os.replace(tmp, self.path)
+        logger.info(f"Saved ingest manifest ({len(self._entries)} papers) to {self.path}")
@@ -0,0 +1,171 @@
+import json
+import shutil
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+import faiss
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from common.logger import logger
+
+__all__ = ["SQLiteDocstore", "save_mmap", "load_mmap", "load_in_memory", "is_mmap_store"]
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.sqlite"
+
+# Zero-copy mapping of flat codes needs a recent FAISS; older builds only
+# know the generic mmap flag.
+_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+class SQLiteDocstore(Docstore):
+    """Read-only docstore with random access by FAISS row or document id.
+
+    Replaces the pickled ``(InMemoryDocstore, index_to_docstore_id)`` pair so
+    a process only pages in the documents it actually returns.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # One read-only connection per thread; the file is never written here.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def search(self, search: str) -> Union[str, Document]:
+        row = self._conn.execute(
+            "SELECT page_content, metadata FROM docs WHERE doc_id = ?", (search,)
+        ).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def index_mapping(self) -> "_RowMapping":
+        """Lazy ``index_to_docstore_id`` mapping backed by the same file."""
+        return _RowMapping(self)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    @staticmethod
+    def write(path: Path, docstore: Docstore, index_to_docstore_id: Dict[int, str]) -> None:
+        """Serialize a docstore in FAISS row order.
+
+        If the file already holds a prefix of the rows, as after a checkpoint
+        that only appended, just the new rows are inserted. Otherwise (e.g. a
+        delete renumbered rows) the file is rewritten and swapped in, so
+        readers of the old file keep a view that matches the old index.
+        """
+        path = Path(path)
+        if path.exists():
+            conn = sqlite3.connect(str(path))
+            try:
+                stored = dict(conn.execute("SELECT row, doc_id FROM docs"))
+                if all(index_to_docstore_id.get(row) == doc_id for row, doc_id in stored.items()):
+                    new = sorted((row, doc_id) for row, doc_id in index_to_docstore_id.items() if row not in stored)
+                    conn.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)", _rows(docstore, new))
+                    conn.commit()
+                    return
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"Rewriting docstore {path}: {str(e)}")
+            finally:
+                conn.close()
+        tmp_path = Path(f"{path}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        conn = sqlite3.connect(str(tmp_path))
+        try:
+            conn.execute(
+                "CREATE TABLE docs (row INTEGER PRIMARY KEY, doc_id TEXT NOT NULL UNIQUE, "
+                "page_content TEXT NOT NULL, metadata TEXT NOT NULL)"
+            )
+            conn.executemany("INSERT INTO docs VALUES (?, ?, ?, ?)", _rows(docstore, sorted(index_to_docstore_id.items())))
+            conn.commit()
+        finally:
+            conn.close()
+        tmp_path.replace(path)
+
+def _rows(docstore: Docstore, rows: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str, str, str]]:
+    for row, doc_id in rows:
+        doc = docstore.search(doc_id)
+        yield row, doc_id, doc.page_content, json.dumps(doc.metadata, default=str)
+
+class _RowMapping(Mapping):
+    """FAISS row -> docstore id, resolved on demand instead of held in a dict."""
+
+    def __init__(self, docstore: SQLiteDocstore):
+        self._docstore = docstore
+
+    def __getitem__(self, row: int) -> str:
+        found = self._docstore._conn.execute("SELECT doc_id FROM docs WHERE row = ?", (int(row),)).fetchone()
+        if found is None:
+            raise KeyError(row)
+        return found[0]
+
+    def __iter__(self) -> Iterator[int]:
+        for (row,) in self._docstore._conn.execute("SELECT row FROM docs ORDER BY row"):
+            yield row
+
+    # One query for the whole table instead of Mapping's lookup per row.
+    def items(self) -> List[Tuple[int, str]]:
+        return self._docstore._conn.execute("SELECT row, doc_id FROM docs ORDER BY row").fetchall()
+
+    def values(self) -> List[str]:
+        return [doc_id for (doc_id,) in self._docstore._conn.execute("SELECT doc_id FROM docs ORDER BY row")]
+
+    def __len__(self) -> int:
+        return len(self._docstore)
+
+def is_mmap_store(path: Path) -> bool:
+    return (Path(path) / DOCSTORE_FILE).exists()
+
+def save_mmap(store: FAISS, path: Path) -> None:
+    """Persist ``store`` as a FAISS index file plus an SQLite docstore."""
+    path = Path(path)
+    if isinstance(store.docstore, SQLiteDocstore) and store.docstore.path.resolve() == (path / DOCSTORE_FILE).resolve():
+        # Mapped from these very files and read-only since, so nothing changed.
+        return
+    path.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename so workers that still map the old files keep a valid view.
+    tmp_index = path / f"{INDEX_FILE}.tmp"
+    faiss.write_index(store.index, str(tmp_index))
+    tmp_index.replace(path / INDEX_FILE)
+    if isinstance(store.docstore, SQLiteDocstore):
+        shutil.copyfile(store.docstore.path, path / DOCSTORE_FILE)
+    else:
+        SQLiteDocstore.write(path / DOCSTORE_FILE, store.docstore, dict(store.index_to_docstore_id))
+
+def load_mmap(path: Path, embeddings: Embeddings) -> FAISS:
+    """Open a saved store memory-mapped and read-only.
+
+    Index pages come from the OS page cache, so every worker mapping the same
+    file shares them instead of holding a private copy.
+    """
+    path = Path(path)
+    index = faiss.read_index(str(path / INDEX_FILE), _MMAP_FLAGS)
+    docstore = SQLiteDocstore(path / DOCSTORE_FILE)
+    logger.info(f"Memory-mapped vector store from {path} ({index.ntotal} vectors)")
+    return FAISS(embeddings, index, docstore, docstore.index_mapping())
+
+def load_in_memory(path: Path, embeddings: Embeddings) -> FAISS:
+    """Load a saved store into private, writable memory (needed for ``add``)."""
+    path = Path(path)
+    index = faiss.read_index(str(path / INDEX_FILE))
+    docstore = SQLiteDocstore(path / DOCSTORE_FILE)
+    docs: Dict[str, Document] = {}
+    mapping: Dict[int, str] = {}
+    for row, doc_id, content, metadata in docstore._conn.execute(
+        "SELECT row, doc_id, page_content, metadata FROM docs ORDER BY row"
+    ):
+        docs[doc_id] = Document(page_content=content, metadata=json.loads(metadata))
+        mapping[row] = doc_id
+    return FAISS(embeddings, index, InMemoryDocstore(docs), mapping)
@@ -1,19 +1,58 @@
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from pathlib import Path
+import numpy as np
+import faiss
 from langchain_core.documents import Document
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from common.config import settings
 from common.logger import logger
 from common.interfaces import VectorStore
+from common.ids import paper_id, content_digest, chunk_id
+from generation.chunker import chunker_from_settings
+from rag_common.keyword_index import BM25Index
+from rag_common.near_duplicates import DedupePlan, NearDuplicateIndex
+from rag_common.query_cache import QueryEmbeddingCache
+from storage.embedding_cache import EmbeddingCache, CachedEmbeddings
+from storage.embedding_providers import HashingEmbeddings, embeddings_from_settings
+from storage.index_factory import build_index, configure_search, faiss_store_from_texts, faiss_store_from_vectors
+from storage.mmap_store import INDEX_FILE, SQLiteDocstore, save_mmap, load_mmap, load_in_memory, is_mmap_store
+
+# Lives in the vector store directory, so it goes away with the store it describes.
+NEAR_DUPLICATES_FILE = "near_duplicates.sqlite"
+
+def search_many(store: FAISS, queries: List[str], k: int = 5) -> List[List[Tuple[Document, float]]]:
+    """Embed all queries in one request and scan the index once for the batch."""
+    if not queries:
+        return []
+    vectors = np.asarray(store.embeddings.embed_documents(queries), dtype=np.float32)
+    if store._normalize_L2:
+        faiss.normalize_L2(vectors)
+    scores, indices = store.index.search(vectors, k)
+
+    docs = {}
+    results = []
+    for row_scores, row_indices in zip(scores, indices):
+        hits = []
+        for score, i in zip(row_scores, row_indices):
+            if i == -1:
+                # Fewer than k vectors in the index.
+                continue
+            if i not in docs:
+                docs[i] = store.docstore.search(store.index_to_docstore_id[i])
+            hits.append((docs[i], float(score)))
+        results.append(hits)
+    return results
 
 class FAISSVectorStore(VectorStore):
     """Concrete implementation of VectorStore using FAISS."""
     
     def __init__(self, embeddings_model: Optional[str] = None):
-        self.embeddings = OpenAIEmbeddings(model=embeddings_model)
+        self.embeddings = embeddings_from_settings(embeddings_model)
         self.vector_store: Optional[FAISS] = None
+        self.path: Optional[Path] = None
+        # Bumped on every content change; used to invalidate cached results.
+        self.version = 0
     
     def build(self, documents: List[Document]) -> None:
         """Build the vector store from documents."""
@@ -21,11 +60,12 @@ class FAISSVectorStore(VectorStore):
             texts = [doc.content for doc in documents]
             metadatas = [doc.metadata for doc in documents]
             
-            self.vector_store = FAISS.from_texts(
+            self.vector_store = faiss_store_from_texts(
                 texts=texts,
-                embedding=self.embeddings,
+                embeddings=self.embeddings,
                 metadatas=metadatas
             )
+            self.version += 1
             logger.info(f"Built vector store with {len(documents)} documents")
         except Exception as e:
             raise Exception(f"Error building vector store: {str(e)}")
@@ -36,7 +76,11 @@ class FAISSVectorStore(VectorStore):
             raise Exception("Vector store not initialized")
         
         try:
-            self.vector_store.save_local(str(path))
+            if settings.vector_mmap:
+                save_mmap(self.vector_store, path)
+            else:
+                self.vector_store.save_local(str(path))
+            self.path = Path(path)
             logger.info(f"Saved vector store to {path}")
         except Exception as e:
             raise Exception(f"Error saving vector store: {str(e)}")
@@ -44,10 +88,17 @@ class FAISSVectorStore(VectorStore):
     def load(self, path: Path) -> None:
         """Load the vector store from disk."""
         try:
-            self.vector_store = FAISS.load_local(
-                str(path),
-                embeddings=self.embeddings
-            )
+            if is_mmap_store(path):
+                loader = load_mmap if settings.vector_mmap else load_in_memory
+                self.vector_store = loader(path, self.embeddings)
+            else:
+                self.vector_store = FAISS.load_local(
+                    str(path),
+                    embeddings=self.embeddings
+                )
+            configure_search(self.vector_store.index)
+            self.path = Path(path)
+            self.version += 1
             logger.info(f"Loaded vector store from {path}")
         except Exception as e:
             raise Exception(f"Error loading vector store: {str(e)}")
@@ -66,12 +117,26 @@ class FAISSVectorStore(VectorStore):
         except Exception as e:
             raise Exception(f"Error searching vector store: {str(e)}")
     
+    def search_many(self, queries: List[str], k: int = 5) -> List[List[Tuple[Document, float]]]:
+        """Search several queries with one embedding call and one index scan."""
+        if not self.vector_store:
+            raise Exception("Vector store not initialized")
+        
+        try:
+            return search_many(self.vector_store, queries, k=k)
+        except Exception as e:
+            raise Exception(f"Error searching vector store: {str(e)}")
+    
     def add_documents(self, documents: List[Document]) -> None:
         """Add new documents to the vector store."""
         if not self.vector_store:
             raise Exception("Vector store not initialized")
         
         try:
+            if isinstance(self.vector_store.docstore, SQLiteDocstore):
+                # Memory-mapped stores are read-only; writers take a private copy.
+                self.vector_store = load_in_memory(self.path, self.embeddings)
+            
             texts = [doc.content for doc in documents]
             metadatas = [doc.metadata for doc in documents]
             
@@ -79,6 +144,7 @@ class FAISSVectorStore(VectorStore):
                 texts=texts,
                 metadatas=metadatas
             )
+            self.version += 1
             logger.info(f"Added {len(documents)} documents to vector store")
         except Exception as e:
             raise Exception(f"Error adding documents to vector store: {str(e)}")
@@ -87,38 +153,292 @@ class VectorStoreManager:
     """Creates / loads FAISS vector store with automatic chunking & embeddings."""
 
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings(model=settings.embedding_model, api_key=settings.openai_api_key)
+        embeddings = embeddings_from_settings()
+        self.embedding_cache: EmbeddingCache | None = None
+        # Local hashing is cheaper to recompute than to look up.
+        if settings.embedding_cache_enabled and not isinstance(embeddings, HashingEmbeddings):
+            self.embedding_cache = EmbeddingCache(settings.embedding_cache_path, settings.embedding_cache_max_bytes)
+            embeddings = CachedEmbeddings(
+                embeddings,
+                self.embedding_cache,
+                model=settings.embedding_model,
+                dimensions=settings.embedding_dimensions,
+            )
+        self.embeddings = embeddings
         self.store: FAISS | None = None
+        self.keyword_index: BM25Index | None = None
+        self.near_duplicates: NearDuplicateIndex | None = None
+        # Papers whose merged near-duplicate chunks lost their kept copy; see take_orphaned_papers.
+        self.orphaned_papers: Set[str] = set()
+        # Bumped on every content change; used to invalidate cached results.
+        self.version = 0
+        self.query_cache = QueryEmbeddingCache(
+            max_entries=settings.query_embedding_cache_size,
+            semantic_threshold=settings.semantic_cache_threshold,
+            semantic_window=settings.semantic_cache_window,
+        )
 
     def _chunk_documents(self, docs: List[Document]) -> List[Document]:
-        splitter = RecursiveCharacterTextSplitter(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
-        chunked = splitter.split_documents(docs)
+        chunked = chunker_from_settings().split_documents(docs)
         logger.info(f"Chunked {len(docs)} docs into {len(chunked)} chunks")
         return chunked
 
-    def build(self, docs: List[Document]) -> None:
+    def _near_duplicate_index(self) -> NearDuplicateIndex:
+        if self.near_duplicates is None:
+            self.near_duplicates = NearDuplicateIndex(
+                settings.vector_path / NEAR_DUPLICATES_FILE,
+                threshold=settings.near_dup_threshold,
+                num_perm=settings.near_dup_num_perm,
+                bands=settings.near_dup_bands,
+            )
+            if self.store is None:
+                # Signatures left over from a store that no longer exists.
+                self.near_duplicates.clear()
+        return self.near_duplicates
+
+    def drop_near_duplicates(self, chunks: List[Document], ids: List[str], pending: Sequence[DedupePlan] = ()
+                             ) -> Tuple[List[Document], List[str], Optional[DedupePlan]]:
+        """Drop chunks that nearly duplicate an indexed (or ``pending``) chunk of another paper.
+
+        Nothing is recorded yet: once the kept chunks are stored, pass the
+        returned plan to ``record_near_duplicates``, so a failed write does
+        not leave signatures behind that would drop a later copy of the text.
+        """
+        if not settings.near_dup_enabled or not chunks:
+            return chunks, ids, None
+        plan = self._near_duplicate_index().plan(chunks, ids, [c.metadata["paper_id"] for c in chunks], pending)
+        return [chunks[i] for i in plan.keep], [ids[i] for i in plan.keep], plan
+
+    def record_near_duplicates(self, plans: Sequence[Optional[DedupePlan]], stored: Iterable[str]) -> None:
+        """Index the ``stored`` chunks kept by ``plans`` and record the merges into them.
+
+        Dropped chunks are then listed by ``merged_sources``.
+        """
+        plans = [plan for plan in plans if plan is not None]
+        if not plans:
+            return
+        stored = set(stored)
+        for plan in plans:
+            self._near_duplicate_index().apply(plan, stored=stored)
+
+    def merged_sources(self, chunk_id: str) -> List[Dict[str, Any]]:
+        """Provenance of the near-duplicate chunks merged into ``chunk_id``."""
+        if not settings.near_dup_enabled:
+            return []
+        return self._near_duplicate_index().sources(chunk_id)
+
+    def take_orphaned_papers(self) -> Set[str]:
+        """Papers to re-ingest because the chunk their duplicates merged into was removed."""
+        orphaned, self.orphaned_papers = self.orphaned_papers, set()
+        return orphaned
+
+    @staticmethod
+    def _assign_chunk_ids(chunks: List[Document]) -> List[str]:
+        """Stamp each chunk with its paper id and a deterministic docstore id.
+
+        Callers may pre-set ``paper_id`` and ``paper_digest`` metadata (the
+        ingest node does, per paper); otherwise both are derived here.
+        """
+        counters = defaultdict(int)
+        ids = []
+        for chunk in chunks:
+            meta = chunk.metadata
+            paper = meta.setdefault("paper_id", paper_id(meta, chunk.page_content))
+            digest = meta.get("paper_digest") or content_digest(chunk.page_content)
+            meta["chunk_id"] = chunk_id(paper, digest, counters[paper])
+            counters[paper] += 1
+            ids.append(meta["chunk_id"])
+        return ids
+
+    def build(self, docs: List[Document]) -> List[str]:
         chunked_docs = self._chunk_documents(docs)
-        logger.info("Building new FAISS index")
-        self.store = FAISS.from_documents(chunked_docs, self.embeddings)
+        ids = self._assign_chunk_ids(chunked_docs)
+        self.store = None
+        if settings.near_dup_enabled:
+            self._near_duplicate_index().clear()
+        kept_docs, kept_ids, plan = self.drop_near_duplicates(chunked_docs, ids)
+        logger.info(f"Building new FAISS index ({settings.vector_index_type})")
+        self.store = faiss_store_from_texts(
+            [d.page_content for d in kept_docs],
+            self.embeddings,
+            [d.metadata for d in kept_docs],
+            ids=kept_ids,
+        )
+        self.record_near_duplicates([plan], kept_ids)
+        if settings.keyword_index_enabled:
+            self.keyword_index = BM25Index(k1=settings.bm25_k1, b=settings.bm25_b)
+            self.keyword_index.add(kept_ids, (d.page_content for d in kept_docs))
+        self.version += 1
+        self._log_cache_stats()
         self.save()
+        return ids
+
+    def add(self, docs: List[Document], replace: Sequence[str] = ()) -> List[str]:
+        """Add documents, retiring the chunk ids in ``replace`` first.
 
-    def add(self, docs: List[Document]) -> None:
+        Chunks whose deterministic id is already stored are skipped, so adding
+        the same paper twice is a no-op. Returns the ids of all chunks of
+        ``docs``, whether newly added or already present.
+        """
         if not self.store:
-            self.build(docs)
-            return
+            return self.build(docs)
+        if isinstance(self.store.docstore, SQLiteDocstore):
+            # Memory-mapped stores are read-only; writers take a private copy.
+            self.store = load_in_memory(settings.vector_path, self.embeddings)
         chunked_docs = self._chunk_documents(docs)
-        self.store.add_documents(chunked_docs)
+        ids = self._assign_chunk_ids(chunked_docs)
+        if replace:
+            self._remove(replace)
+        existing = set(self.store.index_to_docstore_id.values())
+        fresh = [(i, d) for i, d in zip(ids, chunked_docs) if i not in existing]
+        new_docs, new_ids, plan = self.drop_near_duplicates([d for _, d in fresh], [i for i, _ in fresh])
+        if new_ids:
+            self.store.add_documents(new_docs, ids=new_ids)
+            if self.keyword_index is not None:
+                self.keyword_index.add(new_ids, (d.page_content for d in new_docs))
+        self.record_near_duplicates([plan], new_ids)
+        logger.info(
+            f"Added {len(new_ids)} chunks ({len(ids) - len(fresh)} already indexed, "
+            f"{len(fresh) - len(new_ids)} near-duplicates)"
+        )
+        if fresh or replace:
+            self.version += 1
+            self._log_cache_stats()
+            self.save()
+        return ids
+
+    # --- Incremental writes, used by the streaming ingest pipeline ---
+    def prepare(self, docs: List[Document]) -> Tuple[List[Document], List[str]]:
+        """Chunk documents and assign their chunk ids, without embedding them."""
+        chunks = self._chunk_documents(docs)
+        return chunks, self._assign_chunk_ids(chunks)
+
+    def embed(self, chunks: List[Document]) -> np.ndarray:
+        return np.asarray(self.embeddings.embed_documents([c.page_content for c in chunks]), dtype=np.float32)
+
+    def indexed_ids(self) -> set:
+        return set(self.store.index_to_docstore_id.values()) if self.store else set()
+
+    def add_embedded(self, chunks: List[Document], ids: List[str], vectors: np.ndarray,
+                     replace: Sequence[str] = ()) -> None:
+        """Write already-embedded chunks without saving; ``commit`` persists them."""
+        texts = [c.page_content for c in chunks]
+        metadatas = [c.metadata for c in chunks]
+        if not self.store:
+            logger.info(f"Building new FAISS index ({settings.vector_index_type})")
+            self.store = faiss_store_from_vectors(texts, vectors, self.embeddings, metadatas, ids=ids)
+            if settings.keyword_index_enabled:
+                self.keyword_index = BM25Index(k1=settings.bm25_k1, b=settings.bm25_b)
+        else:
+            if isinstance(self.store.docstore, SQLiteDocstore):
+                self.store = load_in_memory(settings.vector_path, self.embeddings)
+            if replace:
+                self._remove(replace)
+            if ids:
+                self.store.add_embeddings(zip(texts, np.asarray(vectors, dtype=np.float32)), metadatas, ids=ids)
+        if self.keyword_index is not None:
+            self.keyword_index.add(ids, texts)
+
+    def commit(self) -> None:
+        """Persist incremental writes and invalidate cached results."""
+        self.version += 1
+        self._log_cache_stats()
+        self.save()
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Delete chunks by id (e.g. those of a paper whose source file is gone)."""
+        if not self.store:
+            return
+        if isinstance(self.store.docstore, SQLiteDocstore):
+            self.store = load_in_memory(settings.vector_path, self.embeddings)
+        self._remove(ids)
+        self.version += 1
         self.save()
 
+    def _remove(self, ids: Sequence[str]) -> None:
+        present = set(self.store.index_to_docstore_id.values())
+        stale = [i for i in ids if i in present]
+        if stale:
+            try:
+                self.store.delete(stale)
+            except RuntimeError:
+                # HNSW indexes cannot remove vectors in place.
+                self._rebuild_without(stale)
+        if self.keyword_index is not None:
+            self.keyword_index.remove(ids)
+        if settings.near_dup_enabled:
+            self.orphaned_papers |= self._near_duplicate_index().forget(ids)
+
+    def _rebuild_without(self, ids: Sequence[str]) -> None:
+        """Rebuild the index from its own vectors, minus those of ``ids``."""
+        drop = set(ids)
+        mapping = self.store.index_to_docstore_id
+        rows = [row for row in sorted(mapping) if mapping[row] not in drop]
+        vectors = self.store.index.reconstruct_batch(np.asarray(rows, dtype=np.int64)) if rows \
+            else np.zeros((0, self.store.index.d), dtype=np.float32)
+        logger.info(f"Rebuilding vector index without {len(drop)} removed chunks ({len(rows)} kept)")
+        self.store.index = build_index(vectors)
+        self.store.index_to_docstore_id = {i: mapping[row] for i, row in enumerate(rows)}
+        self.store.docstore.delete(list(drop))
+
+    def _log_cache_stats(self) -> None:
+        if self.embedding_cache:
+            stats = self.embedding_cache.stats()
+            logger.info(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+
+    def similarity_search(self, query: str, k: int = 5) -> List[Document]:
+        """Vector search that reuses cached query embeddings (and, optionally, results)."""
+        if not self.store:
+            raise RuntimeError("Vector store is empty, cannot search")
+        vector = self.query_cache.embed(query, self.embeddings.embed_query)
+        docs = self.query_cache.similar_results(vector, k, self.version)
+        if docs is None:
+            docs = self.store.similarity_search_by_vector(vector, k=k)
+            self.query_cache.remember_results(vector, k, self.version, docs)
+        return docs
+
+    def search_many(self, queries: List[str], k: int = 5) -> List[List[Tuple[Document, float]]]:
+        if not self.store:
+            raise RuntimeError("Vector store is empty, cannot search")
+        return search_many(self.store, queries, k=k)
+
+    def keyword_search(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        """BM25 search over chunk text; returns ``(document, score)`` pairs."""
+        if not self.store or self.keyword_index is None:
+            return []
+        return [(self.store.docstore.search(doc_id), score) for doc_id, score in self.keyword_index.search(query, k=k)]
+
     def save(self) -> None:
         if not self.store:
             raise RuntimeError("Vector store is empty, cannot save")
-        self.store.save_local(str(settings.vector_path))
+        if settings.vector_mmap:
+            save_mmap(self.store, settings.vector_path)
+        else:
+            self.store.save_local(str(settings.vector_path))
+        if self.keyword_index is not None:
+            self.keyword_index.save(settings.vector_path / "keyword")
         logger.info(f"Saved vector store to {settings.vector_path}")
 
     def load(self) -> None:
         path: Path = settings.vector_path
-        if not path.exists():
+        if not (path / INDEX_FILE).exists():
             raise FileNotFoundError(path)
-        self.store = FAISS.load_local(str(path), self.embeddings, allow_dangerous_deserialization=True)
+        if is_mmap_store(path):
+            loader = load_mmap if settings.vector_mmap else load_in_memory
+            self.store = loader(path, self.embeddings)
+        else:
+            self.store = FAISS.load_local(str(path), self.embeddings, allow_dangerous_deserialization=True)
+        dimensions = getattr(self.embeddings, "dimensions", None)
+        if dimensions and self.store.index.d != dimensions:
+            raise RuntimeError(
+                f"Vector store at {path} holds {self.store.index.d}-d vectors but the "
+                f"{settings.embedding_provider} embeddings are {dimensions}-d; rebuild it or switch providers"
+            )
+        configure_search(self.store.index)
+        if settings.keyword_index_enabled:
+            try:
+                self.keyword_index = BM25Index.load(path / "keyword")
+            except FileNotFoundError:
+                logger.warning(f"No keyword index under {path}; keyword search disabled until the next build")
+        self.version += 1
         logger.info(f"Loaded vector store from {path}")
\ No newline at end of file
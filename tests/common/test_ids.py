@@ -0,0 +1,28 @@
+from common.ids import author_id, chunk_id, paper_id, parse_arxiv_id, reference_id
+
+def test_arxiv_id_parsing():
+    """Test that ids, URLs and versions normalize to one arXiv id."""
+    assert parse_arxiv_id("http://arxiv.org/abs/2401.01234v2") == "2401.01234"
+    assert parse_arxiv_id("https://arxiv.org/pdf/2401.01234") == "2401.01234"
+    assert parse_arxiv_id("cs/0112017v1") == "cs/0112017"
+    assert parse_arxiv_id("not an id") is None
+
+def test_paper_id_is_stable_and_normalized():
+    """Test that paper ids ignore versions, case and punctuation."""
+    assert paper_id({"id": "http://arxiv.org/abs/2401.01234v1"}) == paper_id({"id": "2401.01234v3"})
+    assert paper_id({"title": "Attention Is All You Need."}) == paper_id({"title": "attention  is all you need"})
+    assert paper_id({"title": "A"}) != paper_id({"title": "B"})
+    assert reference_id("2401.01234") == paper_id({"id": "http://arxiv.org/abs/2401.01234v1"})
+    assert reference_id("Attention is all you need") == paper_id({"title": "Attention Is All You Need"})
+
+def test_author_id_normalization():
+    """Test that name order, case and accents do not change the author id."""
+    assert author_id("Jane Doe") == author_id("Doe, Jane") == author_id("JANE DOE")
+    assert author_id("José Álvarez") == author_id("Jose Alvarez")
+    assert author_id("Jane Doe") != author_id("John Doe")
+
+def test_chunk_id_depends_on_digest():
+    """Test that a changed paper gets fresh chunk ids."""
+    pid = paper_id({"title": "Paper"})
+    assert chunk_id(pid, "a" * 64, 0) != chunk_id(pid, "b" * 64, 0)
+    assert chunk_id(pid, "a" * 64, 0).startswith(pid + ":")
@@ -0,0 +1,133 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from langchain_core.documents import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from common.config import settings
+from common.ids import paper_id
+from core.ingest_pipeline import IngestPipeline
+from storage.csr_graph import CSRGraphStore
+from storage.ingest_manifest import IngestManifest
+from storage.vector_store_manager import VectorStoreManager
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that record how many requests run at once."""
+    active: int = 0
+    peak: int = 0
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        with _lock:
+            self.active += 1
+            self.calls += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        try:
+            return super().embed_documents(texts)
+        finally:
+            with _lock:
+                self.active -= 1
+
+_lock = threading.Lock()
+
+@pytest.fixture
+def vsm(temp_dir):
+    with patch.object(settings, 'vector_path', temp_dir / "vectors"), patch.object(settings, 'vector_mmap', False), \
+            patch.object(settings, 'embedding_cache_enabled', False), patch.object(settings, 'chunk_size', 40), \
+            patch.object(settings, 'chunk_overlap', 0):
+        vsm = VectorStoreManager()
+        vsm.embeddings = CountingEmbeddings(size=16)
+        yield vsm
+
+def _paper(i, version=""):
+    text = f"Paper {i} studies graph retrieval {version}. " * 3
+    return [Document(page_content=text, metadata={"title": f"Paper {i}", "source": f"{i}.pdf"})]
+
+async def _stream(papers):
+    for pages in papers:
+        for page in pages:
+            yield page
+
+@pytest.mark.asyncio
+async def test_pipeline_ingests_and_checkpoints(vsm, temp_dir):
+    """Test every paper lands in index, graph and manifest across several checkpoints."""
+    gm = CSRGraphStore()
+    manifest = IngestManifest(temp_dir / "manifest.json")
+    pipeline = IngestPipeline(vsm, gm, manifest, embed_workers=3, queue_size=2, checkpoint_chunks=10)
+
+    stats = await pipeline.run(_stream([_paper(i) for i in range(12)]))
+
+    assert stats["papers"] == 12 and stats["checkpoints"] > 1
+    assert len(vsm.store.index_to_docstore_id) == stats["chunks"] > 12
+    assert len(IngestManifest(temp_dir / "manifest.json")) == 12
+    assert len(gm.fulltext_search("graph retrieval", k=20)) == 12
+    assert 1 < vsm.embeddings.peak <= 3
+
+@pytest.mark.asyncio
+async def test_pipeline_skips_unchanged_and_replaces_changed_papers(vsm, temp_dir):
+    """Test a re-run only embeds changed papers and retires their old chunks."""
+    manifest = IngestManifest(temp_dir / "manifest.json")
+    await IngestPipeline(vsm, CSRGraphStore(), manifest).run(_stream([_paper(0), _paper(1)]))
+    revised = _paper(0, "revised")
+    pid = paper_id(revised[0].metadata, revised[0].page_content)
+    old_ids = manifest.chunk_ids(pid)
+    calls = vsm.embeddings.calls
+
+    pipeline = IngestPipeline(vsm, CSRGraphStore(), manifest)
+    stats = await pipeline.run(_stream([revised, _paper(1)]))
+
+    indexed = set(vsm.store.index_to_docstore_id.values())
+    assert stats["unchanged"] == 1 and stats["papers"] == 1
+    assert vsm.embeddings.calls == calls + 1
+    assert len(pipeline.seen) == 2 and pid in pipeline.seen
+    assert old_ids and not set(old_ids) & indexed
+    assert set(manifest.chunk_ids(pid)) <= indexed
+
+@pytest.mark.asyncio
+async def test_pipeline_propagates_stage_errors(vsm, temp_dir):
+    """Test a failing stage cancels the pipeline and surfaces the error."""
+    pipeline = IngestPipeline(vsm, CSRGraphStore(), IngestManifest(temp_dir / "manifest.json"), queue_size=1)
+    with patch.object(VectorStoreManager, 'embed', side_effect=RuntimeError("rate limited")):
+        with pytest.raises(RuntimeError, match="rate limited"):
+            await pipeline.run(_stream([_paper(i) for i in range(5)]))
+    assert len(IngestManifest(temp_dir / "manifest.json")) == 0
+
+@pytest.mark.asyncio
+async def test_pipeline_drops_near_duplicate_copies(temp_dir):
+    """Test a mirror copy under another paper id is recorded but not embedded again."""
+    text = " ".join(f"finding {i} about sparse graph retrieval and citation walks" for i in range(12))
+    original = [Document(page_content=text, metadata={"title": "Sparse graph retrieval"})]
+    mirror = [Document(page_content=text + " (mirror)", metadata={"source": "mirror/sparse.pdf"})]
+    with patch.object(settings, 'vector_path', temp_dir / "vectors"), patch.object(settings, 'vector_mmap', False), \
+            patch.object(settings, 'embedding_cache_enabled', False):
+        vsm = VectorStoreManager()
+        vsm.embeddings = CountingEmbeddings(size=16)
+        manifest = IngestManifest(temp_dir / "manifest.json")
+
+        stats = await IngestPipeline(vsm, CSRGraphStore(), manifest).run(_stream([original, mirror]))
+
+    assert stats["papers"] == 2
+    assert stats["near_duplicates"] > 0
+    assert len(vsm.store.index_to_docstore_id) == stats["chunks"]
+    assert len(manifest) == 2
+
+@pytest.mark.asyncio
+async def test_failed_checkpoint_does_not_drop_a_later_copy(temp_dir):
+    """Test a mirror is indexed when the checkpoint holding the original failed."""
+    text = " ".join(f"finding {i} about sparse graph retrieval and citation walks" for i in range(12))
+    original = [Document(page_content=text, metadata={"title": "Sparse graph retrieval"})]
+    mirror = [Document(page_content=text + " (mirror)", metadata={"source": "mirror/sparse.pdf"})]
+    with patch.object(settings, 'vector_path', temp_dir / "vectors"), patch.object(settings, 'vector_mmap', False), \
+            patch.object(settings, 'embedding_cache_enabled', False):
+        vsm = VectorStoreManager()
+        vsm.embeddings = CountingEmbeddings(size=16)
+        manifest = IngestManifest(temp_dir / "manifest.json")
+
+        with patch.object(vsm, 'add_embedded', side_effect=RuntimeError("disk full")):
+            with pytest.raises(RuntimeError):
+                await IngestPipeline(vsm, CSRGraphStore(), manifest).run(_stream([original]))
+        stats = await IngestPipeline(vsm, CSRGraphStore(), manifest).run(_stream([mirror]))
+
+    assert stats["near_duplicates"] == 0
+    assert len(vsm.store.index_to_docstore_id) == stats["chunks"] > 0
@@ -0,0 +1,31 @@
+import pytest
+from unittest.mock import Mock, patch
+from core.resources import ResourceRegistry
+
+@pytest.fixture
+def patched_clients():
+    with patch('core.resources.VectorStoreManager') as mock_vsm, \
+         patch('core.resources.create_graph_store') as mock_gm, \
+         patch('core.resources.ChatOpenAI') as mock_llm, \
+         patch('core.resources.LongAnswerGenerator') as mock_generator:
+        yield mock_vsm, mock_gm, mock_llm, mock_generator
+
+def test_registry_loads_index_once(patched_clients):
+    """Test that the registry loads the vector store at creation time."""
+    mock_vsm, mock_gm, _, _ = patched_clients
+    registry = ResourceRegistry.create()
+
+    assert mock_vsm.return_value.load.call_count == 1
+    assert mock_gm.call_count == 1
+    assert registry.retriever.vsm is registry.vsm
+    assert registry.retriever.gm is registry.gm
+
+def test_registry_without_index(patched_clients):
+    """Test that a missing index does not prevent startup."""
+    mock_vsm, _, _, _ = patched_clients
+    mock_vsm.return_value.load.side_effect = FileNotFoundError("vector_store")
+    mock_vsm.return_value.store = None
+
+    registry = ResourceRegistry.create()
+
+    assert registry.vector_store_ready is False
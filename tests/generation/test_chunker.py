@@ -0,0 +1,60 @@
+import random
+import pytest
+from unittest.mock import patch
+from langchain_core.documents import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from common.config import settings
+from generation.chunker import OffsetChunker, chunk_text
+
+PIECES = ["a", "word", "  ", "\n", "\n\n", " ", "\t", ".  ", "\n \n", "unbreakable" * 8]
+
+def _random_text(rng):
+    return "".join(rng.choices(PIECES, k=rng.randint(0, 400)))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_recursive_character_text_splitter(seed):
+    """Test chunk-for-chunk parity with LangChain's splitter on random texts and sizes."""
+    rng = random.Random(seed)
+    for _ in range(200):
+        text = _random_text(rng)
+        chunk_size = rng.randint(1, 120)
+        chunk_overlap = rng.randint(0, chunk_size)
+        expected = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap).split_text(text)
+
+        assert OffsetChunker(chunk_size, chunk_overlap).split_text(text) == expected
+
+def test_spans_are_offsets_into_the_source():
+    """Test that spans slice the original text without copying it."""
+    text = "First paragraph here.\n\nSecond paragraph, which is a bit longer.\n\nThird."
+    chunker = OffsetChunker(chunk_size=30, chunk_overlap=0)
+
+    spans = chunker.spans(text)
+
+    assert [text[start:end] for start, end in spans] == chunker.split_text(text)
+    assert all(0 <= start < end <= len(text) for start, end in spans)
+
+def test_split_documents_shallow_copies_metadata():
+    """Test that chunks get their own metadata dict but share nested values."""
+    authors = ["Ada", "Grace"]
+    doc = Document(page_content="alpha beta gamma delta " * 20, metadata={"title": "T", "authors": authors})
+
+    chunks = OffsetChunker(chunk_size=50, chunk_overlap=10).split_documents([doc])
+
+    assert len(chunks) > 1
+    chunks[0].metadata["chunk_id"] = "x"
+    assert "chunk_id" not in chunks[1].metadata and "chunk_id" not in doc.metadata
+    assert all(chunk.metadata["authors"] is authors for chunk in chunks)
+
+def test_overlap_larger_than_chunk_is_rejected():
+    """Test argument validation."""
+    with pytest.raises(ValueError):
+        OffsetChunker(chunk_size=10, chunk_overlap=20)
+
+def test_chunk_text_uses_settings():
+    """Test that chunk_text honours the configured chunk size."""
+    text = "one two three four five six seven eight nine ten"
+    with patch.object(settings, 'chunk_size', 20), patch.object(settings, 'chunk_overlap', 0):
+        chunks = chunk_text(text)
+
+    assert chunks == RecursiveCharacterTextSplitter(chunk_size=20, chunk_overlap=0).split_text(text)
+    assert len(chunks) == 3 and all(len(chunk) <= 20 for chunk in chunks)
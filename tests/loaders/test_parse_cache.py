@@ -0,0 +1,111 @@
+import os
+import pytest
+from langchain_core.documents import Document
+from loaders.parse_cache import ParseCache
+from loaders.pdf_parser import PDFParseEngine
+
+PARSER = "test-parser(mode='single')"
+
+@pytest.fixture
+def cache(temp_dir):
+    cache = ParseCache(temp_dir / "cache" / "parse.sqlite")
+    yield cache
+    cache.close()
+
+def _docs(text):
+    return [Document(page_content=text, metadata={"total_pages": 1, "title": "T"})]
+
+def test_fingerprint_hits_and_misses(cache, temp_dir):
+    """Test unchanged, touched and copied files hit while edited files miss."""
+    pdf = temp_dir / "a.pdf"
+    pdf.write_bytes(b"version one")
+    assert cache.get(pdf, PARSER) is None
+    cache.put(pdf, PARSER, _docs("page text"))
+
+    assert cache.get(pdf, PARSER)[0].page_content == "page text"
+    assert cache.get(pdf, "other-parser") is None
+
+    os.utime(pdf, ns=(1, 1))  # same bytes, new mtime
+    assert cache.get(pdf, PARSER)[0].metadata["title"] == "T"
+
+    copy = temp_dir / "mirror.pdf"
+    copy.write_bytes(b"version one")
+    assert cache.get(copy, PARSER)[0].page_content == "page text"
+
+    pdf.write_bytes(b"version two, longer")
+    assert cache.get(pdf, PARSER) is None
+
+def test_deleted_files_are_reported_with_their_documents(cache, temp_dir):
+    """Test files removed from the directory are listed and can be forgotten."""
+    keep, gone = temp_dir / "keep.pdf", temp_dir / "gone.pdf"
+    for path in (keep, gone):
+        path.write_bytes(path.name.encode())
+        cache.put(path, PARSER, _docs(path.name))
+    gone.unlink()
+
+    deleted = cache.deleted(temp_dir)
+
+    assert [(path.name, docs[0].page_content) for path, docs in deleted] == [("gone.pdf", "gone.pdf")]
+    cache.forget([path for path, _ in deleted])
+    assert cache.deleted(temp_dir) == []
+    assert cache.stats()["entries"] == 1
+
+@pytest.mark.asyncio
+async def test_engine_serves_unchanged_files_from_cache(cache, temp_dir):
+    """Test a second parse run only parses the file that changed."""
+    calls = []
+
+    def parse(file_path, **kwargs):
+        calls.append(file_path)
+        return _docs(open(file_path).read())
+
+    paths = [temp_dir / f"{i}.pdf" for i in range(3)]
+    for path in paths:
+        path.write_text(f"paper {path.stem}")
+    with PDFParseEngine(executor="thread", workers=2, parse=parse, cache=cache) as engine:
+        first = [r async for r in engine.parse(paths)]
+        paths[1].write_text("paper 1, revised")
+        second = [r async for r in engine.parse(paths)]
+
+    assert len(calls) == 4 and calls[-1] == str(paths[1])
+    assert not any(r.cached for r in first)
+    assert sorted((r.path.name, r.cached) for r in second) == [("0.pdf", True), ("1.pdf", False), ("2.pdf", True)]
+    assert {r.documents[0].page_content for r in second} == {"paper 0", "paper 1, revised", "paper 2"}
+
+def test_copy_hit_names_the_requested_path(cache, temp_dir):
+    """Test that text cached for one file is served for its copy with the copy's path."""
+    pdf, copy = temp_dir / "a.pdf", temp_dir / "mirror.pdf"
+    for path in (pdf, copy):
+        path.write_bytes(b"same bytes")
+    cache.put(pdf, PARSER, [Document(page_content="text", metadata={"source": str(pdf), "file_path": str(pdf)})])
+
+    docs = cache.get(copy, PARSER)
+
+    assert docs[0].metadata == {"source": str(copy), "file_path": str(copy)}
+    assert cache.get(pdf, PARSER)[0].metadata["source"] == str(pdf)
+
+def test_parsers_have_separate_entries(cache, temp_dir):
+    """Test that parses of one file by two parser versions do not evict each other."""
+    pdf = temp_dir / "a.pdf"
+    pdf.write_bytes(b"bytes")
+    cache.put(pdf, PARSER, _docs("single"))
+    cache.put(pdf, "test-parser(mode='page')", _docs("page 1") + _docs("page 2"))
+
+    assert [d.page_content for d in cache.get(pdf, PARSER)] == ["single"]
+    assert len(cache.get(pdf, "test-parser(mode='page')")) == 2
+    assert cache.stats()["entries"] == 2
+
+@pytest.mark.asyncio
+async def test_failed_parse_discards_pending_digest(cache, temp_dir):
+    """Test that a miss whose parse fails leaves no state behind."""
+    def parse(file_path, **kwargs):
+        raise ValueError("malformed")
+
+    pdf = temp_dir / "bad.pdf"
+    pdf.write_bytes(b"garbage")
+    with PDFParseEngine(executor="thread", workers=1, parse=parse, cache=cache) as engine:
+        results = [r async for r in engine.parse([pdf])]
+
+    assert not results[0].ok
+    assert cache._pending == {}
+    assert cache.stats()["entries"] == 0
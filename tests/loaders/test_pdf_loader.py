@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from pathlib import Path
 from unittest.mock import patch
@@ -47,4 +48,58 @@ async def test_process_pdf_directory_multiple_files(temp_dir, sample_pdf_path):
         ]
         result = await process_pdf_directory(temp_dir)
         assert len(result) == 2
-        assert all(doc['page_content'].startswith('Test content') for doc in result) 
\ No newline at end of file
+        assert all(doc['page_content'].startswith('Test content') for doc in result) 
+
+def _fake_parse(file_path, **kwargs):
+    from langchain_core.documents import Document
+    if Path(file_path).name.startswith("broken"):
+        raise ValueError("cannot open broken document")
+    return [Document(page_content=f"page {i}", metadata={"page": i, "total_pages": 2}) for i in range(2)]
+
+@pytest.mark.asyncio
+async def test_pdf_document_loader_reports_failed_files(temp_dir):
+    """Test directory loads skip bad files and list them in a structured report."""
+    from loaders.pdf_loader import PDFDocumentLoader
+    from loaders.pdf_parser import PDFParseEngine
+    for name in ("a.pdf", "b.pdf", "broken.pdf"):
+        (temp_dir / name).write_bytes(b"%PDF-1.4\n%EOF")
+    loader = PDFDocumentLoader(engine=PDFParseEngine(executor="thread", workers=2, parse=_fake_parse))
+
+    docs, report = await loader.load_with_report(temp_dir)
+
+    assert len(docs) == 4
+    assert {doc.metadata["source"] for doc in docs} == {str(temp_dir / "a.pdf"), str(temp_dir / "b.pdf")}
+    assert report.pages == 4 and len(report.parsed) == 2
+    assert list(report.failed) == [temp_dir / "broken.pdf"]
+    assert "cannot open broken document" in report.to_dict()["failed"][0]["error"]
+
+@pytest.mark.asyncio
+async def test_pdf_document_loader_reports_are_per_call(temp_dir):
+    """Test concurrent loads on one loader each get the report of their own files."""
+    from loaders.pdf_loader import PDFDocumentLoader
+    from loaders.pdf_parser import PDFParseEngine
+    for folder, names in (("one", ("a.pdf",)), ("two", ("b.pdf", "broken.pdf"))):
+        (temp_dir / folder).mkdir()
+        for name in names:
+            (temp_dir / folder / name).write_bytes(b"%PDF-1.4\n%EOF")
+    loader = PDFDocumentLoader(engine=PDFParseEngine(executor="thread", workers=2, parse=_fake_parse))
+
+    (_, first), (_, second) = await asyncio.gather(
+        loader.load_with_report(temp_dir / "one"), loader.load_with_report(temp_dir / "two")
+    )
+
+    assert list(first.parsed) == [temp_dir / "one" / "a.pdf"] and not first.failed
+    assert list(second.parsed) == [temp_dir / "two" / "b.pdf"]
+    assert list(second.failed) == [temp_dir / "two" / "broken.pdf"]
+
+@pytest.mark.asyncio
+async def test_pdf_document_loader_single_file_error_raises(temp_dir):
+    """Test loading one unreadable file raises with the parser's error."""
+    from loaders.pdf_loader import PDFDocumentLoader
+    from loaders.pdf_parser import PDFParseEngine
+    broken = temp_dir / "broken.pdf"
+    broken.write_bytes(b"junk")
+    loader = PDFDocumentLoader(engine=PDFParseEngine(executor="thread", parse=_fake_parse))
+
+    with pytest.raises(Exception, match="Error loading PDF"):
+        await loader.load(broken)
@@ -0,0 +1,67 @@
+import threading
+import time
+import pytest
+from pathlib import Path
+from langchain_core.documents import Document
+from loaders.pdf_parser import PDFParseEngine
+
+class SlowParser:
+    """Fake parser that records how many files are parsed at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __call__(self, file_path: str, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            name = Path(file_path).name
+            if name.startswith("bad"):
+                raise ValueError("not a PDF")
+            # Later files finish first, so completion order differs from input order.
+            time.sleep(0.05 if name == "0.pdf" else 0.01)
+            return [Document(page_content=name, metadata={"source": file_path, "total_pages": 3})]
+        finally:
+            with self.lock:
+                self.active -= 1
+
+@pytest.mark.asyncio
+async def test_engine_streams_results_with_bounded_concurrency():
+    """Test results arrive as files finish and no more than max_in_flight run at once."""
+    parser = SlowParser()
+    paths = [Path(f"{i}.pdf") for i in range(8)]
+    with PDFParseEngine(executor="thread", workers=4, max_in_flight=2, parse=parser) as engine:
+        results = [result async for result in engine.parse(paths)]
+
+    assert sorted(r.path for r in results) == sorted(paths)
+    assert results[0].path != Path("0.pdf")
+    assert parser.peak <= 2
+    assert sum(r.pages for r in results) == 24
+
+@pytest.mark.asyncio
+async def test_engine_reports_failures_without_aborting():
+    """Test a failing file yields an error result and the rest still parse."""
+    with PDFParseEngine(executor="thread", workers=2, parse=SlowParser()) as engine:
+        results = {r.path.name: r async for r in engine.parse([Path("bad.pdf"), Path("1.pdf")])}
+
+    assert not results["bad.pdf"].ok
+    assert "not a PDF" in results["bad.pdf"].error
+    assert results["1.pdf"].ok and results["1.pdf"].documents[0].page_content == "1.pdf"
+
+@pytest.mark.asyncio
+async def test_process_pool_returns_errors_for_invalid_pdfs(temp_dir):
+    """Test the default process-pool parser reports unreadable files per file."""
+    invalid = temp_dir / "invalid.pdf"
+    invalid.write_bytes(b"Not a PDF file")
+    with PDFParseEngine(executor="process", workers=1) as engine:
+        results = [r async for r in engine.parse([invalid])]
+
+    assert len(results) == 1 and not results[0].ok
+
+def test_unknown_executor_is_rejected():
+    """Test an unsupported executor name fails fast."""
+    with pytest.raises(ValueError):
+        PDFParseEngine(executor="gpu")
@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import Mock, patch
+from langchain_core.documents import Document
+from retrieval.cache import QueryResultCache, normalize_query
+from retrieval.retriever import KnowledgeRetriever
+
+def test_normalize_query():
+    """Test that case and whitespace do not split cache entries."""
+    assert normalize_query("  What is  RAG?\n") == normalize_query("what is rag?")
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted at capacity."""
+    cache = QueryResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiry():
+    """Test that entries older than the TTL are not served."""
+    cache = QueryResultCache(ttl_s=10)
+    with patch("retrieval.cache.time.monotonic", return_value=100.0):
+        cache.put("a", 1)
+    with patch("retrieval.cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_memory_cap():
+    """Test that the byte budget evicts entries."""
+    doc = Document(page_content="x" * 10_000)
+    cache = QueryResultCache(max_bytes=25_000)
+    cache.put("a", [doc])
+    cache.put("b", [doc])
+    cache.put("c", [doc])
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] <= 25_000
+
+def test_hybrid_served_from_cache_until_index_changes():
+    """Test that hybrid() reuses results and bumping the version invalidates them."""
+    vsm = Mock()
+    vsm.version = 1
+    vsm.similarity_search.return_value = [Document(page_content="a", metadata={"title": "A"})]
+    vsm.keyword_search.return_value = []
+    gm = Mock()
+    gm.expand.side_effect = lambda seeds, **kwargs: {seed: [] for seed in seeds}
+    retriever = KnowledgeRetriever(vsm, gm, cache=QueryResultCache())
+
+    first = retriever.hybrid("What is RAG?", k=2)
+    second = retriever.hybrid("what is  rag?", k=2)
+    assert second is first
+    assert vsm.similarity_search.call_count == 1
+
+    vsm.version = 2
+    retriever.hybrid("What is RAG?", k=2)
+    assert vsm.similarity_search.call_count == 2
+    assert retriever.cache.stats()["hits"] == 1
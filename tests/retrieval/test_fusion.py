@@ -0,0 +1,116 @@
+import time
+import pytest
+from unittest.mock import Mock, patch
+from langchain_core.documents import Document
+from retrieval.fusion import reciprocal_rank_fusion, weighted_score_fusion, prior_boost
+from retrieval.retriever import HybridRetriever
+
+def _doc(name):
+    return Document(page_content=f"content {name}", metadata={"id": name})
+
+def test_rrf_rewards_agreement():
+    """Test that documents ranked by several backends rise to the top."""
+    fused = reciprocal_rank_fusion({
+        "vector": [_doc("a"), _doc("b"), _doc("c")],
+        "keyword": [_doc("b")],
+    })
+    assert [d.metadata["id"] for d, _ in fused] == ["b", "a", "c"]
+
+def test_rrf_keeps_chunks_of_one_paper_apart():
+    """Test that chunks sharing a paper id are fused by their chunk id."""
+    first = Document(page_content="intro", metadata={"id": "2401.00001", "chunk_id": "paper_x:abc:0"})
+    second = Document(page_content="results", metadata={"id": "2401.00001", "chunk_id": "paper_x:abc:1"})
+    fused = reciprocal_rank_fusion({"vector": [first, second], "keyword": [second]})
+
+    assert [d.page_content for d, _ in fused] == ["results", "intro"]
+
+def test_weighted_fusion_inverts_distances():
+    """Test that L2 distances are treated as lower-is-better."""
+    fused = weighted_score_fusion(
+        {"vector": [(_doc("a"), 0.1), (_doc("b"), 0.9)], "keyword": [(_doc("b"), 3.0)]},
+        weights={"vector": 1.0, "keyword": 0.5},
+        lower_is_better=("vector",),
+    )
+    assert fused[0][0].metadata["id"] == "a"
+    assert fused[0][1] == pytest.approx(1.0)
+    assert fused[1][1] == pytest.approx(0.5)
+
+@pytest.fixture
+def backends():
+    vector_store = Mock()
+    vector_store.search.return_value = [(_doc("a"), 0.2), (_doc("b"), 0.4)]
+    graph_store = Mock()
+    graph_store.fulltext_search.return_value = [{"n": {"id": "b", "content": "content b", "title": "B"}, "score": 2.0}]
+    keyword_store = Mock()
+    keyword_store.keyword_search.return_value = [(_doc("b"), 7.0)]
+    return vector_store, graph_store, keyword_store
+
+def test_retrieve_fuses_all_backends(backends):
+    """Test that the fused list merges hits from every backend."""
+    retriever = HybridRetriever(*backends)
+    result = retriever.retrieve("query", k=2)
+
+    assert set(result["latency_ms"]) == {"vector", "graph", "keyword"}
+    assert result["fused"][0][0].metadata["id"] == "b"
+    assert result["errors"] == {}
+
+@pytest.mark.asyncio
+async def test_retrieve_refuses_running_event_loop(backends):
+    """Test that the sync API points coroutines at aretrieve instead of blocking the loop."""
+    retriever = HybridRetriever(*backends)
+    with pytest.raises(RuntimeError, match="aretrieve"):
+        retriever.retrieve("query", k=2)
+
+    result = await retriever.aretrieve("query", k=2)
+    assert result["fused"][0][0].metadata["id"] == "b"
+
+def test_retrieve_runs_backends_concurrently(backends):
+    """Test that latency is the slowest backend, not the sum."""
+    vector_store, graph_store, keyword_store = backends
+    def slow(result):
+        def run(*args, **kwargs):
+            time.sleep(0.2)
+            return result
+        return run
+    vector_store.search.side_effect = slow(vector_store.search.return_value)
+    graph_store.fulltext_search.side_effect = slow(graph_store.fulltext_search.return_value)
+    keyword_store.keyword_search.side_effect = slow(keyword_store.keyword_search.return_value)
+
+    start = time.perf_counter()
+    HybridRetriever(vector_store, graph_store, keyword_store).retrieve("query")
+    assert time.perf_counter() - start < 0.5
+
+def test_retrieve_tolerates_slow_backend(backends):
+    """Test that a backend past its timeout is dropped, not fatal."""
+    vector_store, graph_store, keyword_store = backends
+    graph_store.fulltext_search.side_effect = lambda *args, **kwargs: time.sleep(0.5) or []
+
+    with patch("retrieval.retriever.settings") as mock_settings:
+        mock_settings.vector_timeout_s = 1.0
+        mock_settings.keyword_timeout_s = 1.0
+        mock_settings.graph_timeout_s = 0.05
+        mock_settings.retrieval_fusion = "rrf"
+        mock_settings.rrf_k = 60
+        mock_settings.fusion_weights = {}
+        result = HybridRetriever(vector_store, graph_store, keyword_store).retrieve("query")
+
+    assert result["graph"] == []
+    assert "graph" in result["errors"]
+    assert len(result["fused"]) == 2
+
+def test_retrieve_fails_when_every_backend_fails(backends):
+    """Test that total failure is still reported as an error."""
+    vector_store, graph_store, _ = backends
+    vector_store.search.side_effect = Exception("Vector store error")
+    graph_store.fulltext_search.side_effect = Exception("Graph error")
+
+    with pytest.raises(Exception):
+        HybridRetriever(vector_store, graph_store).retrieve("query")
+
+def test_prior_boost_reorders_by_weight():
+    """Test that a strong prior can lift a lower-scored document."""
+    a, b = Document(page_content="a"), Document(page_content="b")
+    scored = [(a, 1.0), (b, 0.9)]
+
+    assert [d.page_content for d, _ in prior_boost(scored, [0.0, 1.0], weight=0.0)] == ["a", "b"]
+    assert [d.page_content for d, _ in prior_boost(scored, [0.0, 1.0], weight=0.5)] == ["b", "a"]
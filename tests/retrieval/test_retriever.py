@@ -79,4 +79,84 @@ def test_hybrid_retrieval_ranking(mock_retriever_components):
     retriever = KnowledgeRetriever(vector_store, graph_manager)
     result = retriever.hybrid("test query", k=2)
     
-    assert result['vector'][0]['metadata']['score'] > result['vector'][1]['metadata']['score'] 
\ No newline at end of file
+    assert result['vector'][0]['metadata']['score'] > result['vector'][1]['metadata']['score'] 
+
+def test_hybrid_expands_all_seeds_in_one_batched_call():
+    """Test multi-seed expansion: one query, merged neighbors, per-seed cache."""
+    from langchain_core.documents import Document
+    from retrieval.cache import QueryResultCache
+
+    vsm = Mock(version=1)
+    vsm.similarity_search.return_value = [
+        Document(page_content="a", metadata={"paper_id": "p1"}),
+        Document(page_content="b", metadata={"paper_id": "p2"}),
+    ]
+    vsm.keyword_search.return_value = []
+    neighborhoods = {
+        "p1": [{"id": "n1", "title": "N1", "published": "", "hops": 1}, {"id": "n2", "title": "N2", "published": "", "hops": 2}],
+        "p2": [{"id": "n2", "title": "N2", "published": "", "hops": 1}],
+        "p3": [{"id": "n3", "title": "N3", "published": "", "hops": 1}],
+    }
+    gm = Mock()
+    gm.expand.side_effect = lambda seeds, **kwargs: {seed: neighborhoods[seed] for seed in seeds}
+    retriever = KnowledgeRetriever(vsm, gm, cache=QueryResultCache())
+
+    graph = retriever.hybrid("query one", k=2)["graph"]
+
+    assert gm.expand.call_count == 1
+    assert gm.expand.call_args[0][0] == ["p1", "p2"]
+    assert [(n["id"], n["hops"], n["seeds"]) for n in graph] == [("n2", 1, 2), ("n1", 1, 1)]
+
+    vsm.similarity_search.return_value = [
+        Document(page_content="b", metadata={"paper_id": "p2"}),
+        Document(page_content="c", metadata={"paper_id": "p3"}),
+    ]
+    retriever.hybrid("query two", k=2)
+
+    assert gm.expand.call_count == 2
+    assert gm.expand.call_args[0][0] == ["p3"]
+
+def test_hybrid_ppr_strategy_skips_cypher_expansion():
+    """Test the PPR strategy ranks related papers from the in-memory citation graph."""
+    import numpy as np
+    from langchain_core.documents import Document
+    from common.config import settings
+    from storage.citation_graph import CitationGraph
+
+    vsm = Mock(version=1)
+    vsm.similarity_search.return_value = [Document(page_content="a", metadata={"paper_id": "p0"})]
+    vsm.keyword_search.return_value = []
+    gm = Mock()
+    citation_graph = CitationGraph.from_edges(
+        ["p0", "p1", "p2"], ["P0", "P1", "P2"], np.array([0, 1]), np.array([1, 2])
+    )
+    retriever = KnowledgeRetriever(vsm, gm, cache=None, citation_graph=citation_graph)
+
+    with patch.object(settings, "graph_strategy", "ppr"):
+        graph = retriever.hybrid("query", k=1)["graph"]
+
+    gm.expand.assert_not_called()
+    assert [n["id"] for n in graph] == ["p1", "p2"]
+    assert graph[0]["title"] == "P1" and graph[0]["score"] > graph[1]["score"]
+
+def test_related_papers_on_the_embedded_graph():
+    """Test related-paper lookup by id and by title without Cypher."""
+    from common.models import GraphDocument, GraphNode, GraphRelationship
+    from storage.csr_graph import CSRGraphStore
+
+    def paper(node_id, title, cites=()):
+        return GraphDocument(
+            nodes=[GraphNode(id=node_id, type="Paper", properties={"title": title, "published": "2024"})],
+            relationships=[GraphRelationship(source=node_id, target=c, type="CITES", properties={}) for c in cites],
+        )
+
+    gm = CSRGraphStore()
+    gm.ingest([paper("p1", "Graph retrieval", cites=["p2"]), paper("p2", "Dense retrieval", cites=["p3"]),
+               paper("p3", "Sparse retrieval"), paper("p4", "Unrelated")])
+    retriever = KnowledgeRetriever(Mock(version=1), gm, cache=None)
+
+    assert {p["id"] for p in retriever.related_papers(paper_id="p1")} == {"p2", "p3"}
+    by_title = retriever.related_papers(title="Dense retrieval")
+    assert {p["id"] for p in by_title} == {"p1", "p3"}
+    assert {"id": "p1", "title": "Graph retrieval", "published": "2024"} in by_title
+    assert retriever.related_papers(title="Missing paper") == []
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from storage.centrality import CentralityTable, pagerank
+
+@pytest.fixture
+def citations():
+    # p0 and p1 both cite p2 and p3; p3 cites p2; p4 is isolated.
+    ids = ["p0", "p1", "p2", "p3", "p4"]
+    src = np.array([0, 0, 1, 1, 3])
+    dst = np.array([2, 3, 2, 3, 2])
+    return ids, src, dst
+
+def test_pagerank_sums_to_one_and_favours_cited_papers(citations):
+    """Test PageRank is a distribution and the most cited paper ranks first."""
+    ids, src, dst = citations
+    adjacency = sp.csr_matrix((np.ones(len(src)), (src, dst)), shape=(5, 5))
+    rank = pagerank(adjacency)
+
+    assert rank.sum() == pytest.approx(1.0)
+    assert rank.argmax() == 2
+    assert rank[4] < rank[3]
+
+def test_cocitation_and_coupling(citations):
+    """Test co-citation and coupling scores pick out the right papers."""
+    table = CentralityTable.compute(*citations)
+
+    # p2 and p3 are co-cited by p0 and p1; p0 and p1 share both references.
+    assert table.cocitation[[2, 3]].min() > table.cocitation[[0, 1, 4]].max()
+    assert table.coupling[[0, 1]].min() > table.coupling[[2, 4]].max()
+    assert table.prior_of("p2") == pytest.approx(table.prior.max())
+    assert table.prior_of("unknown") == 0.0
+    assert 0.0 <= table.prior.min() and table.prior.max() <= 1.0
+
+def test_warm_started_update_matches_full_recompute(citations):
+    """Test a warm-started update converges to the same scores as a cold run."""
+    ids, src, dst = citations
+    table = CentralityTable.compute(ids, src, dst)
+    ids = ids + ["p5"]
+    src, dst = np.append(src, 5), np.append(dst, 3)
+
+    updated = table.update(ids, src, dst)
+    fresh = CentralityTable.compute(ids, src, dst)
+    np.testing.assert_allclose(updated.prior, fresh.prior, atol=1e-5)
+
+def test_save_load_round_trip(temp_dir, citations):
+    """Test persistence of the lookup table."""
+    table = CentralityTable.compute(*citations)
+    table.save(temp_dir)
+    loaded = CentralityTable.load(temp_dir)
+
+    assert loaded.ids == table.ids
+    np.testing.assert_array_equal(loaded.prior, table.prior)
+    with pytest.raises(FileNotFoundError):
+        CentralityTable.load(temp_dir / "missing")
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from storage.citation_graph import CitationGraph
+
+@pytest.fixture
+def graph():
+    # Two clusters joined by a single citation p3 -> p4; p7 is isolated.
+    ids = [f"p{i}" for i in range(8)]
+    src = np.array([0, 0, 1, 2, 3, 4, 4, 5])
+    dst = np.array([1, 2, 2, 3, 4, 5, 6, 6])
+    return CitationGraph.from_edges(ids, [f"Paper {i}" for i in range(8)], src, dst)
+
+def test_ppr_ranks_local_neighbors_first(graph):
+    """Test PPR favours the seed's own cluster and excludes the seeds."""
+    ranked = [pid for pid, _ in graph.personalized_pagerank(["p0"], k=10, max_iter=50, budget_ms=1000)]
+
+    assert "p0" not in ranked
+    assert set(ranked[:2]) == {"p1", "p2"}
+    assert ranked.index("p3") < ranked.index("p5")
+    assert "p7" not in ranked
+
+def test_ppr_seed_weights_and_unknown_seeds(graph):
+    """Test seed weights shift the mass and unknown seeds are ignored."""
+    left = graph.personalized_pagerank(["p0", "p6"], seed_weights=[10.0, 1.0], k=3, max_iter=50, budget_ms=1000)
+    right = graph.personalized_pagerank(["p0", "p6"], seed_weights=[1.0, 10.0], k=3, max_iter=50, budget_ms=1000)
+
+    assert left[0][0] in {"p1", "p2"}
+    assert right[0][0] in {"p4", "p5"}
+    assert graph.personalized_pagerank(["missing"]) == []
+
+def test_ppr_respects_iteration_and_time_budget(graph):
+    """Test a zero budget still returns the first step's neighbors."""
+    ranked = graph.personalized_pagerank(["p0"], budget_ms=0.0)
+
+    assert {pid for pid, _ in ranked} == {"p1", "p2"}
+
+def test_ppr_mass_is_conserved_with_isolated_seeds():
+    """Test that mass reaching uncited papers teleports back instead of also staying put."""
+    graph = CitationGraph.from_edges(["a", "b", "c", "d"], [None] * 4, np.array([0, 1]), np.array([1, 2]))
+
+    ranked = graph.personalized_pagerank(["a", "d"], k=10, max_iter=50, budget_ms=1000)
+
+    assert [pid for pid, _ in ranked] == ["b", "c"]
+    assert sum(score for _, score in ranked) <= 1.0
+
+def test_save_and_load_round_trip(graph, tmp_path):
+    """Test a saved graph reloads with the same ids, titles and scores."""
+    graph.save(tmp_path / "citations")
+    loaded = CitationGraph.load(tmp_path / "citations")
+
+    assert loaded.title("p3") == "Paper 3"
+    assert loaded.personalized_pagerank(["p0"]) == graph.personalized_pagerank(["p0"])
+    with pytest.raises(FileNotFoundError):
+        CitationGraph.load(tmp_path / "missing")
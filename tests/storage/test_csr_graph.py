@@ -0,0 +1,82 @@
+import pytest
+from common.models import GraphNode, GraphRelationship, GraphDocument
+from storage.csr_graph import CSRGraphStore
+
+def paper(node_id, title, cites=()):
+    return GraphDocument(
+        nodes=[GraphNode(id=node_id, type="Paper", properties={"title": title, "content": f"{title} content"}),
+               GraphNode(id="author_1", type="Author", properties={"name": "Jane Doe"})],
+        relationships=[GraphRelationship(source=node_id, target="author_1", type="WRITTEN_BY", properties={})]
+        + [GraphRelationship(source=node_id, target=cited, type="CITES", properties={}) for cited in cites],
+    )
+
+@pytest.fixture
+def store():
+    store = CSRGraphStore()
+    # p1 -> p2 -> p3 -> p4, p5 -> p2
+    store.ingest([
+        paper("p4", "Graph neural networks"),
+        paper("p3", "Attention models", cites=["p4"]),
+        paper("p2", "Retrieval augmented generation", cites=["p3"]),
+        paper("p1", "Hybrid retrieval", cites=["p2"]),
+        paper("p5", "Dense passage retrieval", cites=["p2"]),
+    ])
+    return store
+
+def test_expand_hops_follow_citations_in_both_directions(store):
+    """Test 1-2 hop neighborhoods ignore author edges and exclude the seed."""
+    result = store.expand(["p2", "missing"], max_hops=2)
+
+    assert {n["id"]: n["hops"] for n in result["p2"]} == {"p1": 1, "p3": 1, "p5": 1, "p4": 2}
+    assert result["missing"] == []
+    assert [n["hops"] for n in store.expand(["p1"], max_hops=2, per_seed=2)["p1"]] == [1, 2]
+
+def test_ingest_is_idempotent_and_keeps_stubs(store):
+    """Test re-ingesting merges nodes and edges, and unknown citations become stubs."""
+    nodes, edges = len(store), store.n_edges
+    store.ingest([paper("p1", "Hybrid retrieval v2", cites=["p2", "p9"])])
+
+    assert len(store) == nodes + 1
+    assert store.n_edges == edges + 1
+    assert store.properties[store.index["p1"]]["title"] == "Hybrid retrieval v2"
+    assert {n["id"] for n in store.expand(["p9"], max_hops=1)["p9"]} == {"p1"}
+
+def test_fulltext_search_ranks_papers(store):
+    """Test text search returns node records with scores."""
+    hits = store.fulltext_search("attention", k=3)
+
+    assert hits[0]["n"]["id"] == "p3"
+    assert hits[0]["score"] > 0
+
+def test_save_load_round_trip(temp_dir, store):
+    """Test persistence of nodes, edges and the text index."""
+    store.save(temp_dir)
+    loaded = CSRGraphStore.load(temp_dir)
+
+    assert loaded.expand(["p2"]) == store.expand(["p2"])
+    assert loaded.fulltext_search("attention", k=1)[0]["n"]["id"] == "p3"
+    with pytest.raises(FileNotFoundError):
+        CSRGraphStore.load(temp_dir / "missing")
+    assert len(CSRGraphStore.open(temp_dir / "missing")) == 0
+
+def test_citation_edges_cover_papers_only(store):
+    """Test the citation export skips authors and authorship edges."""
+    ids, titles, src, dst = store.citation_edges()
+
+    assert titles[ids.index("p3")] == "Attention models"
+    assert sorted(ids) == ["p1", "p2", "p3", "p4", "p5"]
+    assert sorted((ids[s], ids[d]) for s, d in zip(src, dst)) == [("p1", "p2"), ("p2", "p3"), ("p3", "p4"), ("p5", "p2")]
+
+def test_ingest_is_saved_on_commit(temp_dir):
+    """Test that ingests stay in memory until commit or close writes them."""
+    store = CSRGraphStore(temp_dir)
+    store.ingest([paper("p1", "Hybrid retrieval", cites=["p2"])])
+    store.ingest([paper("p2", "Dense retrieval")])
+    assert not (temp_dir / "nodes.json").exists()
+
+    store.commit()
+    assert set(CSRGraphStore.load(temp_dir).index) == {"p1", "p2", "author_1"}
+
+    store.ingest([paper("p3", "Attention")])
+    store.close()
+    assert "p3" in CSRGraphStore.load(temp_dir).index
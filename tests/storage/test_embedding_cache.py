@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+from unittest.mock import Mock
+from storage.embedding_cache import EmbeddingCache, CachedEmbeddings, text_digest
+
+@pytest.fixture
+def cache(temp_dir):
+    cache = EmbeddingCache(temp_dir / "embeddings.sqlite")
+    yield cache
+    cache.close()
+
+@pytest.fixture
+def inner_embeddings():
+    embeddings = Mock()
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(t)), 1.0, 2.0] for t in texts]
+    return embeddings
+
+def test_cache_round_trip(cache):
+    """Test that stored vectors come back as float32."""
+    digests = [text_digest("a"), text_digest("b")]
+    cache.put_many("model", 3, digests, [[1, 2, 3], [4, 5, 6]])
+
+    result = cache.get_many("model", 3, digests + [text_digest("c")])
+
+    assert result[0].dtype == np.float32
+    assert result[1].tolist() == [4.0, 5.0, 6.0]
+    assert result[2] is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+def test_cache_key_includes_model_and_dims(cache):
+    """Test that the same text under another model or size is a miss."""
+    digest = text_digest("chunk")
+    cache.put_many("model-a", 3, [digest], [[1, 2, 3]])
+
+    assert cache.get_many("model-b", 3, [digest]) == [None]
+    assert cache.get_many("model-a", 256, [digest]) == [None]
+
+def test_cache_evicts_least_recently_used(temp_dir):
+    """Test size-bounded eviction."""
+    cache = EmbeddingCache(temp_dir / "small.sqlite", max_bytes=2 * 3 * 4)
+    cache.put_many("m", 3, ["old"], [[1, 2, 3]])
+    cache.put_many("m", 3, ["mid"], [[1, 2, 3]])
+    cache.get_many("m", 3, ["old"])
+    cache.put_many("m", 3, ["new"], [[1, 2, 3]])
+
+    result = cache.get_many("m", 3, ["old", "mid", "new"])
+
+    assert result[1] is None
+    assert result[0] is not None and result[2] is not None
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+def test_cache_persists_across_instances(temp_dir):
+    """Test that entries survive reopening the cache file."""
+    path = temp_dir / "embeddings.sqlite"
+    first = EmbeddingCache(path)
+    first.put_many("m", 3, ["d"], [[1, 2, 3]])
+    first.close()
+
+    second = EmbeddingCache(path)
+    assert second.get_many("m", 3, ["d"])[0].tolist() == [1.0, 2.0, 3.0]
+    assert second.stats()["bytes"] == 12
+    second.close()
+
+def test_cached_embeddings_only_embeds_misses(cache, inner_embeddings):
+    """Test that unchanged chunks are not re-embedded."""
+    embeddings = CachedEmbeddings(inner_embeddings, cache, model="m")
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    second = embeddings.embed_documents(["alpha", "gamma"])
+
+    assert first[0] == first[2]
+    assert second[0] == first[0]
+    assert inner_embeddings.embed_documents.call_args_list[0][0][0] == ["alpha", "beta"]
+    assert inner_embeddings.embed_documents.call_args_list[1][0][0] == ["gamma"]
@@ -0,0 +1,176 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pytest
+from storage.embedding_executor import EmbeddingExecutor, TokenBudget, pack_batches
+from storage.embedding_cache import EmbeddingCache, CachedEmbeddings
+
+class StandInServer:
+    """Minimal OpenAI-compatible ``POST /v1/embeddings`` endpoint."""
+
+    def __init__(self, throttle_first=0, delay=0.0):
+        self.requests = []
+        self.throttle_first = throttle_first
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server.lock:
+                    server.requests.append(body["input"])
+                    throttled = len(server.requests) <= server.throttle_first
+                    server.active += 1
+                    server.peak = max(server.peak, server.active)
+                try:
+                    time.sleep(server.delay)
+                    if throttled:
+                        payload = json.dumps({"error": {"message": "slow down", "type": "rate_limit"}}).encode()
+                        self.send_response(429)
+                        self.send_header("Retry-After", "0.05")
+                    else:
+                        data = [
+                            {"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0, 0.0]}
+                            for i, text in enumerate(body["input"])
+                        ]
+                        tokens = sum(len(text) // 4 + 1 for text in body["input"])
+                        payload = json.dumps({
+                            "object": "list", "data": data, "model": body["model"],
+                            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                        }).encode()
+                        self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def make_executor():
+    created = []
+
+    def make(server_kwargs=None, **kwargs):
+        server = StandInServer(**(server_kwargs or {}))
+        executor = EmbeddingExecutor(model="text-embedding-3-small", api_key="test", base_url=server.url, **kwargs)
+        created.append((server, executor))
+        return server, executor
+
+    yield make
+    for server, executor in created:
+        executor.close()
+        server.close()
+
+def test_pack_batches_respects_token_and_input_limits():
+    """Test greedy packing by tokens and by input count."""
+    assert pack_batches([40, 40, 40, 10], max_tokens=100, max_inputs=10) == [[0, 1], [2, 3]]
+    assert pack_batches([1] * 5, max_tokens=100, max_inputs=2) == [[0, 1], [2, 3], [4]]
+    # An input larger than the budget still gets a batch of its own.
+    assert pack_batches([500, 1], max_tokens=100, max_inputs=10) == [[0], [1]]
+
+def test_token_budget_blocks_during_hold():
+    """Test that hold() delays every acquire."""
+    budget = TokenBudget(tokens_per_minute=6_000_000)
+    budget.hold(0.1)
+    start = time.monotonic()
+    budget.acquire(10)
+    assert time.monotonic() - start >= 0.09
+
+def test_embed_documents_preserves_order(make_executor):
+    """Test that vectors come back in input order across packed requests."""
+    server, executor = make_executor(batch_tokens=20, max_concurrency=3)
+    texts = [f"text number {i} " * (i % 3 + 1) for i in range(30)]
+
+    vectors = executor.embed_documents(texts)
+
+    assert [v[0] for v in vectors] == [float(len(t)) for t in texts]
+    assert len(server.requests) > 1
+    assert sorted(t for batch in server.requests for t in batch) == sorted(texts)
+
+def test_concurrency_is_capped(make_executor):
+    """Test that no more than max_concurrency requests are in flight."""
+    server, executor = make_executor({"delay": 0.05}, batch_inputs=1, max_concurrency=2)
+
+    executor.embed_documents([f"t{i}" for i in range(8)])
+
+    assert server.peak == 2
+
+def test_rate_limited_batch_is_retried(make_executor):
+    """Test that a 429 retries only its own batch, honouring Retry-After."""
+    server, executor = make_executor({"throttle_first": 1}, batch_inputs=2, max_concurrency=1)
+    texts = ["a", "bb", "ccc", "dddd"]
+
+    vectors = executor.embed_documents(texts)
+
+    assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0]
+    assert len(server.requests) == 3
+    assert executor.stats()["retries"] == 1
+
+def test_gives_up_after_max_retries(make_executor):
+    """Test that persistent throttling surfaces as an error."""
+    server, executor = make_executor({"throttle_first": 100}, max_retries=1)
+
+    with pytest.raises(Exception, match="Error embedding batch"):
+        executor.embed_documents(["a"])
+    assert len(server.requests) == 2
+
+def test_stats_report_tokens_per_second(make_executor):
+    """Test throughput accounting from the usage the server reports."""
+    server, executor = make_executor({"delay": 0.01})
+
+    executor.embed_documents(["x" * 40, "y" * 40])
+
+    stats = executor.stats()
+    assert stats["tokens"] == 22
+    assert stats["requests"] == 1
+    assert stats["tokens_per_sec"] > 0
+
+def test_cached_embeddings_streams_batches(make_executor, temp_dir):
+    """Test that hits are yielded first and each embedded batch is cached as it arrives."""
+    server, executor = make_executor(batch_inputs=1)
+    cache = EmbeddingCache(temp_dir / "embeddings.sqlite")
+    cached = CachedEmbeddings(executor, cache, model="m", dimensions=3)
+    cached.embed_documents(["warm"])
+
+    batches = list(cached.iter_embeddings(["new", "warm", "new", "other"]))
+
+    assert batches[0][0] == [1]
+    out = {}
+    for positions, vectors in batches:
+        for position, vector in zip(positions, vectors):
+            out[position] = vector[0]
+    assert out == {0: 3.0, 1: 4.0, 2: 3.0, 3: 5.0}
+    # "new" is requested once although it appears twice.
+    assert sorted(server.requests[1:]) == [["new"], ["other"]]
+    cache.close()
+
+def test_streamed_faiss_build_maps_rows_to_texts(make_executor):
+    """Test that an index built from completion-ordered batches finds the right text."""
+    from storage.index_factory import IndexConfig, faiss_store_from_texts
+
+    server, executor = make_executor({"delay": 0.01}, batch_inputs=1, max_concurrency=4)
+    texts = ["a" * n for n in range(1, 9)]
+
+    store = faiss_store_from_texts(texts, executor, ids=[f"id{n}" for n in range(1, 9)], config=IndexConfig(index_type="flat"))
+
+    assert store.index.ntotal == 8
+    for row, doc_id in store.index_to_docstore_id.items():
+        vector = store.index.reconstruct(row)
+        assert store.docstore.search(doc_id).page_content == "a" * int(vector[0])
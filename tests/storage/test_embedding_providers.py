@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from langchain_core.documents import Document
+from common.config import settings
+from storage.embedding_executor import EmbeddingExecutor
+from storage.embedding_providers import HashingEmbeddings, embeddings_from_settings
+from storage.vector_store_manager import VectorStoreManager
+
+TEXTS = [
+    "Graph neural networks for citation retrieval",
+    "graph neural networks for retrieval of citations",
+    "A recipe for banana bread",
+    "",
+]
+
+def test_hashing_embeddings_are_deterministic_and_normalized():
+    """Test that vectors repeat across instances and have unit norm (zero for empty text)."""
+    vectors = np.asarray(HashingEmbeddings(dimensions=64).embed_documents(TEXTS))
+
+    assert vectors.shape == (4, 64)
+    assert np.allclose(vectors, HashingEmbeddings(dimensions=64).embed_documents(TEXTS))
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0, atol=1e-5)
+    assert not vectors[3].any()
+    assert HashingEmbeddings(dimensions=64, seed=1).embed_query(TEXTS[0]) != pytest.approx(vectors[0].tolist())
+
+def test_hashing_embeddings_rank_related_text_higher():
+    """Test that overlapping vocabulary means higher cosine similarity."""
+    a, b, c, _ = HashingEmbeddings().embed_array(TEXTS)
+
+    assert a @ b > 0.5
+    assert a @ b > a @ c
+
+def test_batching_does_not_change_vectors():
+    """Test that batch boundaries (and n-grams across them) do not leak between texts."""
+    texts = [f"paper {i} on sparse attention and dense retrieval" for i in range(10)]
+    whole = HashingEmbeddings(batch_size=100).embed_array(texts)
+    batched = HashingEmbeddings(batch_size=3)
+
+    assert np.allclose(batched.embed_array(texts), whole)
+    assert np.allclose(batched.embed_query(texts[4]), whole[4])
+    streamed = list(batched.iter_embeddings(texts))
+    assert [positions for positions, _ in streamed][1] == [3, 4, 5]
+    assert np.allclose(np.concatenate([vectors for _, vectors in streamed]), whole)
+
+def test_provider_selected_by_settings():
+    """Test the settings switch and the unknown-provider error."""
+    with patch.object(settings, 'embedding_provider', 'hashing'), \
+            patch.object(settings, 'hashing_embedding_dimensions', 32):
+        embeddings = embeddings_from_settings()
+        assert isinstance(embeddings, HashingEmbeddings)
+        assert embeddings.dimensions == 32
+    with patch.object(settings, 'embedding_provider', 'openai'):
+        assert isinstance(embeddings_from_settings(), EmbeddingExecutor)
+    with patch.object(settings, 'embedding_provider', 'nope'), pytest.raises(ValueError):
+        embeddings_from_settings()
+
+def test_vector_store_manager_runs_offline(temp_dir):
+    """Test that a hashing-backed store builds, searches and rejects a mismatched reload."""
+    with patch.object(settings, 'vector_path', temp_dir), patch.object(settings, 'vector_mmap', False), \
+            patch.object(settings, 'embedding_provider', 'hashing'), \
+            patch.object(settings, 'hashing_embedding_dimensions', 64):
+        vsm = VectorStoreManager()
+        assert vsm.embedding_cache is None
+        vsm.build([Document(page_content=text, metadata={"title": text}) for text in TEXTS[:3]])
+
+        hits = vsm.similarity_search("citation graph retrieval", k=1)
+        assert hits[0].metadata["title"] == TEXTS[0]
+
+        with patch.object(settings, 'hashing_embedding_dimensions', 128), pytest.raises(RuntimeError, match="64-d"):
+            VectorStoreManager().load()
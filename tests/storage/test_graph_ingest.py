@@ -0,0 +1,122 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from common.models import GraphNode, GraphRelationship, GraphDocument
+from storage.graph_manager import Neo4jGraphStore
+
+class RecordingSession:
+    def __init__(self, calls):
+        self.calls = calls
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def run(self, statement, parameters=None, **params):
+        self.calls.append((statement, {**(parameters or {}), **params}))
+        return MagicMock()
+    
+    def execute_write(self, fn):
+        return fn(self)
+
+@pytest.fixture
+def store():
+    calls = []
+    with patch('storage.graph_manager.GraphDatabase') as mock_db:
+        mock_db.driver.return_value.session.side_effect = lambda: RecordingSession(calls)
+        store = Neo4jGraphStore("bolt://test", "neo4j", "password")
+    calls.clear()
+    store.calls = calls
+    return store
+
+def graph_docs(n_papers):
+    docs = []
+    for i in range(n_papers):
+        paper = GraphNode(id=f"p{i}", type="Paper", properties={"title": f"Paper {i}"})
+        author = GraphNode(id=f"a{i % 3}", type="Author", properties={"name": f"Author {i % 3}"})
+        rels = [GraphRelationship(source=paper.id, target=author.id, type="WRITTEN_BY", properties={})]
+        if i:
+            rels.append(GraphRelationship(source=paper.id, target=f"p{i - 1}", type="CITES", properties={}))
+        docs.append(GraphDocument(nodes=[paper, author], relationships=rels))
+    return docs
+
+def test_ingest_batches_by_type(store):
+    """Test nodes and relationships are written as UNWIND batches grouped by type."""
+    stats = store.ingest(graph_docs(10), batch_size=4, workers=1)
+    
+    assert all("UNWIND $rows" in statement for statement, _ in store.calls)
+    node_calls = [(s, p) for s, p in store.calls if "MERGE (n:" in s]
+    rel_calls = [p for s, p in store.calls if "MERGE (source)" in s]
+    # 10 papers -> 3 batches, 3 distinct authors -> 1 batch
+    assert len(node_calls) == 4
+    assert sum("MERGE (n:`Paper`" in s for s, _ in node_calls) == 3
+    assert sum("MERGE (n:`Author`" in s for s, _ in node_calls) == 1
+    node_calls = [p for _, p in node_calls]
+    assert sum(len(p['rows']) for p in rel_calls) == 19
+    assert all(len(p['rows']) <= 4 for p in node_calls + rel_calls)
+    assert stats['nodes'] == 13 and stats['relationships'] == 19
+    # Nodes are written before any relationship
+    first_rel = next(i for i, (s, _) in enumerate(store.calls) if "MERGE (source)" in s)
+    assert all("MERGE (n:" in s for s, _ in store.calls[:first_rel])
+
+def test_ingest_parallel_writers_cover_all_rows(store):
+    """Test parallel writer sessions write every row exactly once."""
+    stats = store.ingest(graph_docs(50), batch_size=7, workers=4)
+    
+    paper_ids = [row['id'] for s, p in store.calls if "MERGE (n:`Paper`" in s for row in p['rows']]
+    assert sorted(paper_ids) == sorted(f"p{i}" for i in range(50))
+    assert stats['relationships'] == 99
+
+def test_relationships_use_typed_labels(store):
+    """Test relationships are typed and endpoints matched by label."""
+    store.ingest(graph_docs(3), workers=1)
+    
+    rel_statements = {s for s, _ in store.calls if "MERGE (source)" in s}
+    assert any("[r:`CITES`]" in s and "(target:`Paper`" in s for s in rel_statements)
+    assert any("[r:`WRITTEN_BY`]" in s and "(target:`Author`" in s for s in rel_statements)
+    assert not any("RELATIONSHIP" in s or ":Node" in s for s, _ in store.calls)
+
+def test_schema_statements():
+    """Test constraints and indexes cover ids, titles and arXiv ids."""
+    from storage.graph_schema import GraphSchema, quote_identifier
+    statements = GraphSchema().statements()
+    
+    assert any("(n:`Paper`) REQUIRE n.id IS UNIQUE" in s for s in statements)
+    assert any("(n:`Author`) REQUIRE n.id IS UNIQUE" in s for s in statements)
+    assert any("ON (n.`title`)" in s for s in statements)
+    assert any("ON (n.`arxiv_id`)" in s for s in statements)
+    assert all("IF NOT EXISTS" in s for s in statements)
+    with pytest.raises(ValueError):
+        quote_identifier("Paper`) DETACH DELETE n //")
+
+def test_fulltext_search_is_parameterized(store):
+    """Test full-text lookup passes escaped user text as a parameter."""
+    store.fulltext_search("O'Brien's \"RAG\" (v2) AND graphs", k=3)
+    
+    statement, params = store.calls[-1]
+    assert "db.index.fulltext.queryNodes($index, $query" in statement
+    assert "O'Brien" not in statement
+    assert params['k'] == 3
+    assert params['query'] == 'o\'brien\'s \\"rag\\" \\(v2\\) and graphs'
+
+def test_fulltext_index_uses_configured_analyzer():
+    """Test the full-text index DDL carries the analyzer and rejects bad names."""
+    from storage.graph_schema import GraphSchema
+    statement = GraphSchema(fulltext_analyzer="standard-no-stop-words").fulltext_statement("paper_text")
+    
+    assert "CREATE FULLTEXT INDEX `paper_text` IF NOT EXISTS" in statement
+    assert "ON EACH [n.`title`, n.`content`]" in statement
+    assert "'standard-no-stop-words'" in statement
+    with pytest.raises(ValueError):
+        GraphSchema(fulltext_analyzer="x'}} DROP").fulltext_statement("paper_text")
+
+def test_expand_batches_all_seeds(store):
+    """Test neighborhood expansion sends every seed in a single query."""
+    result = store.expand(["p1", "p2"], max_hops=3, per_seed=10)
+    
+    statement, params = store.calls[-1]
+    assert len(store.calls) == 1
+    assert "UNWIND $seeds AS seed" in statement and "*1..3" in statement
+    assert params == {'seeds': ["p1", "p2"], 'per_seed': 10}
+    assert result == {"p1": [], "p2": []}
@@ -0,0 +1,55 @@
+import pytest
+import faiss
+import numpy as np
+from langchain_community.embeddings import FakeEmbeddings
+from storage.index_factory import IndexConfig, build_index, configure_search, faiss_store_from_texts
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).random((2000, 32), dtype=np.float32)
+
+@pytest.mark.parametrize("index_type,expected", [
+    ("flat", faiss.IndexFlatL2),
+    ("hnsw", faiss.IndexHNSWFlat),
+    ("ivf_flat", faiss.IndexIVFFlat),
+    ("ivf_pq", faiss.IndexIVFPQ),
+    ("sq8", faiss.IndexScalarQuantizer),
+])
+def test_build_index_types(vectors, index_type, expected):
+    """Test that every configured type trains, adds and searches."""
+    config = IndexConfig(index_type=index_type, ivf_nlist=16, pq_m=8, hnsw_m=8)
+    index = build_index(vectors, config)
+
+    assert isinstance(index, expected)
+    assert index.ntotal == len(vectors)
+    _, ids = index.search(vectors[:5], 1)
+    assert ids.shape == (5, 1)
+
+def test_ivf_nlist_clamped_to_corpus(vectors):
+    """Test that small corpora do not request more centroids than they can train."""
+    index = build_index(vectors, IndexConfig(index_type="ivf_flat", ivf_nlist=4096))
+    assert index.nlist <= len(vectors) // 39
+
+def test_configure_search_sets_query_knobs(vectors):
+    """Test that nprobe and efSearch are applied at query time."""
+    ivf = build_index(vectors, IndexConfig(index_type="ivf_flat", ivf_nlist=16, ivf_nprobe=4))
+    hnsw = build_index(vectors, IndexConfig(index_type="hnsw", hnsw_m=8, hnsw_ef_search=40))
+
+    assert ivf.nprobe == 4
+    assert hnsw.hnsw.efSearch == 40
+    configure_search(ivf, IndexConfig(ivf_nprobe=8))
+    assert ivf.nprobe == 8
+
+def test_unknown_index_type(vectors):
+    """Test that a misconfigured index type is rejected."""
+    with pytest.raises(ValueError):
+        build_index(vectors, IndexConfig(index_type="annoy"))
+
+def test_store_from_texts():
+    """Test the FAISS.from_texts replacement keeps texts and metadata."""
+    store = faiss_store_from_texts(
+        ["alpha", "beta"], FakeEmbeddings(size=16), [{"source": "a"}, {"source": "b"}],
+        IndexConfig(index_type="sq8"),
+    )
+    assert store.index.ntotal == 2
+    assert store.docstore.search(store.index_to_docstore_id[1]).metadata == {"source": "b"}
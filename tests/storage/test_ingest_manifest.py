@@ -0,0 +1,29 @@
+from storage.ingest_manifest import IngestManifest
+
+def test_manifest_round_trip(temp_dir):
+    """Test recording papers and reloading the manifest."""
+    manifest = IngestManifest(temp_dir / "manifest.json")
+    manifest.record("paper_1", "digest-1", ["paper_1:abc:0", "paper_1:abc:1"])
+    manifest.save()
+
+    loaded = IngestManifest(temp_dir / "manifest.json")
+    assert "paper_1" in loaded
+    assert loaded.is_current("paper_1", "digest-1")
+    assert not loaded.is_current("paper_1", "digest-2")
+    assert not loaded.is_current("paper_2", "digest-1")
+    assert loaded.chunk_ids("paper_1") == ["paper_1:abc:0", "paper_1:abc:1"]
+    assert loaded.chunk_ids("paper_2") == []
+
+def test_missing_manifest_is_empty(temp_dir):
+    """Test that a missing file starts an empty manifest."""
+    assert len(IngestManifest(temp_dir / "missing" / "manifest.json")) == 0
+
+def test_forget_removes_a_paper(temp_dir):
+    """Test forgetting a paper drops its digest and chunk ids."""
+    manifest = IngestManifest(temp_dir / "manifest.json")
+    manifest.record("paper_1", "digest-1", ["paper_1:abc:0"])
+    manifest.forget("paper_1")
+    manifest.forget("never_recorded")
+
+    assert "paper_1" not in manifest
+    assert manifest.chunk_ids("paper_1") == []
@@ -0,0 +1,105 @@
+import pytest
+from rag_common.keyword_index import BM25Index, tokenize
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.add(
+        ["a", "b", "c"],
+        [
+            "Retrieval augmented generation with dense retrievers",
+            "We fine-tune llama-2-7b on arXiv 2401.01234 abstracts",
+            "Graph neural networks for citation graphs",
+        ],
+    )
+    return index
+
+def test_tokenize_keeps_identifiers():
+    """Test that model names and arXiv ids survive tokenization."""
+    tokens = tokenize("GPT-4o beats llama-2-7b on 2401.01234")
+    assert "gpt-4o" in tokens
+    assert "llama-2-7b" in tokens
+    assert "2401.01234" in tokens
+    assert "llama" in tokens
+
+def test_search_exact_identifier(index):
+    """Test that exact identifiers rank their document first."""
+    assert index.search("2401.01234", k=2)[0][0] == "b"
+    assert index.search("llama-2-7b", k=2)[0][0] == "b"
+
+def test_search_ranks_by_bm25(index):
+    """Test that term frequency raises the score."""
+    results = index.search("graph", k=3)
+    assert [doc_id for doc_id, _ in results] == ["c"]
+    assert results[0][1] > 0
+
+def test_search_unknown_terms(index):
+    """Test that queries without known terms return nothing."""
+    assert index.search("transformer", k=3) == []
+    assert BM25Index().search("graph") == []
+
+def test_incremental_add_and_merge(index):
+    """Test that later segments are searchable and merge correctly."""
+    index.max_segments = 1
+    index.add(["d"], ["Dense retrieval for open-domain question answering"])
+    index.add(["e"], ["Sparse retrieval baselines"])
+
+    assert len(index.segments) == 1
+    ids = [doc_id for doc_id, _ in index.search("retrieval", k=5)]
+    assert set(ids) == {"a", "d", "e"}
+
+def test_save_load_round_trip(temp_dir, index):
+    """Test persistence of postings and vocabulary."""
+    index.add(["d"], ["Dense retrieval"])
+    index.save(temp_dir)
+    loaded = BM25Index.load(temp_dir)
+
+    assert len(loaded) == 4
+    assert loaded.search("retrieval", k=5) == pytest.approx(index.search("retrieval", k=5))
+    loaded.add(["e"], ["retrieval retrieval"])
+    assert loaded.search("retrieval", k=1)[0][0] == "e"
+
+def test_load_missing(temp_dir):
+    """Test that a missing index raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        BM25Index.load(temp_dir / "missing")
+
+def test_remove_hides_documents(temp_dir, index):
+    """Test that removed documents stay hidden, including after reload."""
+    assert index.remove(["a", "missing"]) == 1
+    assert "a" not in [doc_id for doc_id, _ in index.search("retrieval", k=5)]
+    index.save(temp_dir)
+    assert "a" not in [doc_id for doc_id, _ in BM25Index.load(temp_dir).search("retrieval", k=5)]
+
+def test_remove_updates_statistics(index):
+    """Test that removed documents no longer count towards df and document length."""
+    index.remove(["c"])
+    fresh = BM25Index()
+    fresh.add(["a", "b"], [
+        "Retrieval augmented generation with dense retrievers",
+        "We fine-tune llama-2-7b on arXiv 2401.01234 abstracts",
+    ])
+
+    assert len(index) == 2
+    assert index.search("retrieval", k=5) == pytest.approx(fresh.search("retrieval", k=5))
+
+def test_readding_replaces_and_compacts(index):
+    """Test that re-adding an id replaces its text without growing the postings."""
+    for round_ in range(20):
+        index.add(["c"], [f"Graph neural networks round {round_}"])
+
+    assert len(index) == 3
+    assert len(index.doc_keys) <= 4
+    assert [doc_id for doc_id, _ in index.search("graph", k=5)] == ["c"]
+    assert index.search("citation", k=5) == []
+
+def test_save_persists_compacted_state(temp_dir, index):
+    """Test that saving drops removed documents from disk."""
+    index.remove(["a"])
+    index.save(temp_dir)
+    loaded = BM25Index.load(temp_dir)
+
+    assert loaded.doc_keys == ["b", "c"]
+    assert not loaded.deleted
+    assert "augmented" not in loaded.vocab
+    assert loaded.search("graph", k=5) == pytest.approx(index.search("graph", k=5))
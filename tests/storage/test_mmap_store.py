@@ -0,0 +1,80 @@
+import pytest
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from storage.mmap_store import SQLiteDocstore, save_mmap, load_mmap, load_in_memory, is_mmap_store
+
+@pytest.fixture
+def embeddings():
+    return FakeEmbeddings(size=16)
+
+@pytest.fixture
+def saved_store(temp_dir, embeddings):
+    docs = [Document(page_content=f"chunk {i}", metadata={"source": f"doc{i}", "page": i}) for i in range(20)]
+    store = FAISS.from_documents(docs, embeddings)
+    save_mmap(store, temp_dir)
+    return store
+
+def test_save_writes_random_access_docstore(temp_dir, saved_store):
+    """Test that saving produces an index file and an SQLite docstore."""
+    assert is_mmap_store(temp_dir)
+    assert (temp_dir / "index.faiss").exists()
+    assert not (temp_dir / "index.pkl").exists()
+
+    docstore = SQLiteDocstore(temp_dir / "docstore.sqlite")
+    assert len(docstore) == 20
+    doc_id = saved_store.index_to_docstore_id[3]
+    assert docstore.search(doc_id).metadata == {"source": "doc3", "page": 3}
+    assert docstore.index_mapping()[3] == doc_id
+
+def test_mmap_load_matches_in_memory_search(temp_dir, saved_store, embeddings):
+    """Test that a memory-mapped store returns the same hits as the original."""
+    mapped = load_mmap(temp_dir, embeddings)
+    vector = saved_store.index.reconstruct(5).tolist()
+
+    expected = saved_store.similarity_search_by_vector(vector, k=3)
+    result = mapped.similarity_search_by_vector(vector, k=3)
+
+    assert [d.page_content for d in result] == [d.page_content for d in expected]
+    assert isinstance(mapped.docstore, SQLiteDocstore)
+
+def test_load_in_memory_is_writable(temp_dir, saved_store, embeddings):
+    """Test that the private copy accepts new documents and saves back."""
+    store = load_in_memory(temp_dir, embeddings)
+    store.add_documents([Document(page_content="new chunk", metadata={})])
+    save_mmap(store, temp_dir)
+
+    assert len(SQLiteDocstore(temp_dir / "docstore.sqlite")) == 21
+    assert load_mmap(temp_dir, embeddings).index.ntotal == 21
+
+def test_append_updates_docstore_in_place(temp_dir, saved_store, embeddings):
+    """Test that a save after appends only inserts the new rows."""
+    path = temp_dir / "docstore.sqlite"
+    inode = path.stat().st_ino
+    store = load_in_memory(temp_dir, embeddings)
+    [new_id] = store.add_documents([Document(page_content="new chunk", metadata={})])
+    save_mmap(store, temp_dir)
+
+    assert path.stat().st_ino == inode
+    assert SQLiteDocstore(path).index_mapping()[20] == new_id
+    assert load_mmap(temp_dir, embeddings).index.ntotal == 21
+
+def test_delete_rewrites_docstore(temp_dir, saved_store, embeddings):
+    """Test that renumbered rows are written to a fresh file."""
+    path = temp_dir / "docstore.sqlite"
+    inode = path.stat().st_ino
+    store = load_in_memory(temp_dir, embeddings)
+    store.delete([store.index_to_docstore_id[0]])
+    save_mmap(store, temp_dir)
+
+    assert path.stat().st_ino != inode
+    assert dict(SQLiteDocstore(path).index_mapping().items()) == store.index_to_docstore_id
+
+def test_row_mapping_values_use_one_query(temp_dir, saved_store):
+    """Test that listing every docstore id does not query row by row."""
+    docstore = SQLiteDocstore(temp_dir / "docstore.sqlite")
+    statements = []
+    docstore._conn.set_trace_callback(statements.append)
+
+    assert set(docstore.index_mapping().values()) == set(saved_store.index_to_docstore_id.values())
+    assert len(statements) == 1
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from langchain_core.documents import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from common.config import settings
+from rag_common.near_duplicates import NearDuplicateIndex
+from storage.vector_store_manager import VectorStoreManager
+
+ABSTRACT = (
+    "We introduce a retrieval augmented generation method that walks the citation graph "
+    "with personalized pagerank to select supporting passages and improves answer faithfulness "
+    "on three scientific question answering benchmarks while reducing latency. The walk is "
+    "seeded with the top dense retrieval hits and pruned to a fixed budget, so queries stay "
+    "fast on graphs with millions of papers and edges"
+)
+
+@pytest.fixture
+def index(temp_dir):
+    index = NearDuplicateIndex(temp_dir / "near.sqlite")
+    yield index
+    index.close()
+
+def _chunk(text, source):
+    return Document(page_content=text, metadata={"source": source})
+
+def test_signature_similarity_tracks_jaccard(index):
+    """Test that identical texts share a signature and unrelated ones barely agree."""
+    a, b, c = index.signatures([ABSTRACT, ABSTRACT, "banana bread recipe with walnuts and a pinch of salt"])
+
+    assert (a == b).all()
+    assert np.mean(a == c) < 0.1
+    assert index.signatures([""])[0].min() == np.iinfo(np.uint32).max
+
+def test_near_duplicates_of_other_groups_are_merged(index):
+    """Test that a lightly edited copy from another paper is dropped with provenance."""
+    edited = ABSTRACT.replace("three", "four")
+    chunks = [_chunk(ABSTRACT, "arxiv"), _chunk(edited, "mirror/2401.pdf"), _chunk("unrelated text about cooking pasta", "x")]
+
+    keep = index.dedupe(chunks, ["a:0", "b:0", "b:1"], ["a", "b", "b"])
+
+    assert keep == [0, 2]
+    sources = index.sources("a:0")
+    assert [(s["chunk_id"], s["group"], s["source"]) for s in sources] == [("b:0", "b", "mirror/2401.pdf")]
+    assert sources[0]["similarity"] >= 0.8
+
+def test_same_group_is_never_merged(index):
+    """Test that repeated text within one paper is kept."""
+    keep = index.dedupe([_chunk(ABSTRACT, "p"), _chunk(ABSTRACT, "p")], ["a:0", "a:1"], ["a", "a"])
+
+    assert keep == [0, 1]
+
+def test_index_persists_and_forget_reports_orphans(temp_dir):
+    """Test reopening the index and forgetting a kept chunk."""
+    first = NearDuplicateIndex(temp_dir / "near.sqlite")
+    first.dedupe([_chunk(ABSTRACT, "a")], ["a:0"], ["a"])
+    first.close()
+
+    index = NearDuplicateIndex(temp_dir / "near.sqlite")
+    assert index.dedupe([_chunk(ABSTRACT, "b")], ["b:0"], ["b"]) == []
+    assert index.stats() == {"indexed": 1, "merged": 1}
+
+    assert index.forget(["a:0"]) == {"b"}
+    assert index.stats() == {"indexed": 0, "merged": 0}
+    assert index.dedupe([_chunk(ABSTRACT, "b")], ["b:0"], ["b"]) == [0]
+    index.close()
+
+def test_vector_store_manager_skips_near_duplicate_papers(temp_dir):
+    """Test that a mirror copy of a paper under another id is not embedded again."""
+    with patch.object(settings, 'vector_path', temp_dir), patch.object(settings, 'vector_mmap', False), \
+            patch.object(settings, 'embedding_cache_enabled', False), patch.object(settings, 'near_dup_enabled', True):
+        vsm = VectorStoreManager()
+        vsm.embeddings = DeterministicFakeEmbedding(size=16)
+
+        kept = vsm.add([Document(page_content=ABSTRACT, metadata={"title": "PPR for RAG"})])
+        mirror = vsm.add([Document(page_content=ABSTRACT + " v2", metadata={"source": "mirror/ppr.pdf"})])
+
+        assert list(vsm.store.index_to_docstore_id.values()) == kept
+        assert [s["chunk_id"] for s in vsm.merged_sources(kept[0])] == mirror
+
+        vsm.remove(kept)
+        assert vsm.take_orphaned_papers() == {mirror[0].split(":")[0]}
+        assert vsm.take_orphaned_papers() == set()
+
+def test_signatures_do_not_depend_on_batch_size(temp_dir):
+    """Test that batched hashing gives the same signatures as one pass."""
+    texts = [f"{ABSTRACT} variant {i}" for i in range(7)] + ["", "two words"]
+    batched = NearDuplicateIndex(temp_dir / "batched.sqlite", batch_size=2)
+    whole = NearDuplicateIndex(temp_dir / "whole.sqlite", batch_size=100)
+
+    assert np.array_equal(batched.signatures(texts), whole.signatures(texts))
+    batched.close()
+    whole.close()
+
+def test_plan_is_only_persisted_for_stored_chunks(index):
+    """Test that a failed add leaves nothing behind to match against."""
+    chunks = [_chunk(ABSTRACT, "a"), _chunk(ABSTRACT, "b")]
+    plan = index.plan(chunks, ["a:0", "b:0"], ["a", "b"])
+    assert plan.keep == [0]
+
+    index.apply(plan, stored=[])
+    assert index.stats() == {"indexed": 0, "merged": 0}
+    assert index.dedupe([_chunk(ABSTRACT, "b")], ["b:0"], ["b"]) == [0]
+
+def test_failed_add_does_not_drop_a_later_copy(temp_dir):
+    """Test that chunks which never reached the store are not matched against."""
+    with patch.object(settings, 'vector_path', temp_dir), patch.object(settings, 'vector_mmap', False), \
+            patch.object(settings, 'embedding_cache_enabled', False), patch.object(settings, 'near_dup_enabled', True):
+        vsm = VectorStoreManager()
+        vsm.embeddings = DeterministicFakeEmbedding(size=16)
+        vsm.add([Document(page_content="unrelated text about cooking pasta", metadata={"title": "Pasta"})])
+
+        with patch.object(vsm.store, 'add_documents', side_effect=RuntimeError("disk full")):
+            with pytest.raises(RuntimeError):
+                vsm.add([Document(page_content=ABSTRACT, metadata={"title": "PPR for RAG"})])
+        mirror = vsm.add([Document(page_content=ABSTRACT + " v2", metadata={"source": "mirror/ppr.pdf"})])
+
+        assert set(mirror) <= vsm.indexed_ids()
+        assert vsm.merged_sources(mirror[0]) == []
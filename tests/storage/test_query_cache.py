@@ -0,0 +1,48 @@
+import numpy as np
+from unittest.mock import Mock
+from rag_common.query_cache import QueryEmbeddingCache
+
+def test_repeated_query_skips_embedding():
+    """Test that normalized repeats are served from the LRU."""
+    embed = Mock(return_value=[1.0, 0.0])
+    cache = QueryEmbeddingCache()
+
+    cache.embed("What is RAG?", embed)
+    cache.embed("  what is rag? ", embed)
+
+    assert embed.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+def test_lru_bound():
+    """Test that the cache never exceeds max_entries."""
+    cache = QueryEmbeddingCache(max_entries=2)
+    for query in ["a", "b", "c"]:
+        cache.embed(query, lambda q: [1.0])
+    assert cache.stats()["entries"] == 2
+
+def test_semantic_reuse_disabled_by_default():
+    """Test that results are not reused without a threshold."""
+    cache = QueryEmbeddingCache()
+    cache.remember_results([1.0, 0.0], 5, 1, ["doc"])
+    assert cache.similar_results([1.0, 0.0], 5, 1) is None
+
+def test_semantic_reuse_above_threshold():
+    """Test that near-identical queries reuse results for the same k and version."""
+    cache = QueryEmbeddingCache(semantic_threshold=0.99, semantic_window=4)
+    cache.remember_results([1.0, 0.0, 0.0], 5, 1, ["doc"])
+
+    assert cache.similar_results([1.0, 0.01, 0.0], 5, 1) == ["doc"]
+    assert cache.similar_results([0.5, 0.5, 0.0], 5, 1) is None
+    assert cache.similar_results([1.0, 0.0, 0.0], 10, 1) is None
+    assert cache.similar_results([1.0, 0.0, 0.0], 5, 2) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+def test_semantic_window_wraps():
+    """Test that only the most recent searches are kept."""
+    cache = QueryEmbeddingCache(semantic_threshold=0.99, semantic_window=2)
+    vectors = np.eye(3).tolist()
+    for i, vector in enumerate(vectors):
+        cache.remember_results(vector, 5, 1, [i])
+
+    assert cache.similar_results(vectors[0], 5, 1) is None
+    assert cache.similar_results(vectors[2], 5, 1) == [2]
@@ -2,6 +2,14 @@ import pytest
 from unittest.mock import Mock, patch
 from storage.vector_store_manager import VectorStoreManager
 
+@pytest.fixture(autouse=True)
+def embedding_cache_in_temp_dir(temp_dir):
+    """Keep the embedding cache VectorStoreManager opens out of the working tree."""
+    from common.config import settings
+
+    with patch.object(settings, 'embedding_cache_path', temp_dir / "cache" / "embeddings.sqlite"):
+        yield
+
 @pytest.fixture
 def sample_documents():
     return [
@@ -11,11 +19,11 @@ def sample_documents():
 
 def test_vector_store_build(sample_documents):
     """Test building the vector store."""
-    with patch('storage.vector_store_manager.FAISS') as mock_faiss:
+    with patch('storage.vector_store_manager.faiss_store_from_texts') as mock_build:
         vsm = VectorStoreManager()
         vsm.build(sample_documents)
-        assert mock_faiss.from_documents.called
-        assert len(mock_faiss.from_documents.call_args[0][0]) == 2
+        assert mock_build.called
+        assert len(mock_build.call_args[0][0]) == 2
 
 def test_vector_store_save_load(temp_dir, sample_documents):
     """Test saving and loading the vector store."""
@@ -52,4 +60,70 @@ def test_vector_store_error_handling():
         vsm.load("nonexistent_path")
     
     with pytest.raises(Exception):
-        vsm.search("test query") 
\ No newline at end of file
+        vsm.search("test query") 
+
+def test_search_many_matches_single_search():
+    """Test that batched search returns the same hits as one query at a time."""
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    from langchain_community.vectorstores import FAISS
+    from storage.vector_store_manager import search_many
+
+    embeddings = DeterministicFakeEmbedding(size=16)
+    store = FAISS.from_texts([f"chunk {i}" for i in range(30)], embeddings)
+
+    queries = ["chunk 3", "chunk 17", "chunk 29"]
+    with patch.object(DeterministicFakeEmbedding, 'embed_documents', autospec=True,
+                      side_effect=DeterministicFakeEmbedding.embed_documents) as spy:
+        results = search_many(store, queries, k=3)
+
+    assert spy.call_count == 1
+    assert len(results) == 3
+    for query, hits in zip(queries, results):
+        expected = store.similarity_search_with_score(query, k=3)
+        assert [d.page_content for d, _ in hits] == [d.page_content for d, _ in expected]
+        assert hits[0][0].page_content == query
+        assert hits[0][1] == pytest.approx(expected[0][1])
+
+def test_add_is_idempotent_and_replaces_stale_chunks(temp_dir):
+    """Test deterministic chunk ids: re-adding is a no-op, replace retires old chunks."""
+    from langchain_core.documents import Document
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    from common.config import settings
+
+    with patch.object(settings, 'vector_path', temp_dir), patch.object(settings, 'vector_mmap', False), \
+            patch.object(settings, 'keyword_index_enabled', True), \
+            patch.object(settings, 'embedding_cache_enabled', False):
+        vsm = VectorStoreManager()
+        vsm.embeddings = DeterministicFakeEmbedding(size=16)
+
+        first = vsm.add([Document(page_content="graph retrieval", metadata={"title": "Paper A"})])
+        again = vsm.add([Document(page_content="graph retrieval", metadata={"title": "Paper A"})])
+        assert again == first
+        assert len(vsm.store.index_to_docstore_id) == 1
+
+        updated = vsm.add([Document(page_content="graph retrieval v2", metadata={"title": "Paper A"})], replace=first)
+        assert updated != first
+        assert list(vsm.store.index_to_docstore_id.values()) == updated
+        assert [doc_id for doc_id, _ in vsm.keyword_index.search("graph", k=5)] == updated
+
+def test_removed_chunks_leave_hnsw_search_results(temp_dir):
+    """Test that removal from an HNSW index (no in-place delete) takes effect."""
+    from langchain_core.documents import Document
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    from common.config import settings
+
+    with patch.object(settings, 'vector_path', temp_dir), patch.object(settings, 'vector_mmap', False), \
+            patch.object(settings, 'vector_index_type', 'hnsw'), \
+            patch.object(settings, 'embedding_cache_enabled', False):
+        vsm = VectorStoreManager()
+        vsm.embeddings = DeterministicFakeEmbedding(size=16)
+        kept = vsm.add([Document(page_content="dense retrieval", metadata={"title": "Paper A"})])
+        removed = vsm.add([Document(page_content="graph retrieval", metadata={"title": "Paper B"})])
+
+        vsm.remove(removed)
+
+        assert vsm.indexed_ids() == set(kept) and vsm.store.index.ntotal == 1
+        assert [d.metadata["chunk_id"] for d in vsm.similarity_search("graph retrieval", k=2)] == kept
+        assert [d.metadata["chunk_id"] for d, _ in vsm.search_many(["graph retrieval"], k=2)[0]] == kept
+        vsm.load()
+        assert vsm.store.index.ntotal == 1